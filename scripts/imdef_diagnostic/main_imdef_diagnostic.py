@@ -173,7 +173,8 @@ def main() -> None:
      image_mask,
      input_im,
      disp_x,
-     disp_y) = sid.preprocess(input_im,
+     disp_y,
+     spline_coeffs) = sid.preprocess(input_im,
                                 coords,
                                 disp_x,
                                 disp_y,
@@ -210,7 +211,8 @@ def main() -> None:
                                     coords,
                                     np.array((disp_x[:,ff],disp_y[:,ff])).T,
                                     image_mask=image_mask,
-                                    print_on=True)
+                                    print_on=True,
+                                    spline_coeffs=spline_coeffs)
 
         if ff == (DIAG_FRAME-1):
             (subpx_grid_xm,subpx_grid_ym) = sid.get_subpixel_grid(camera,
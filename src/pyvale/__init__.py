@@ -25,9 +25,16 @@ from pyvale.core.fieldscalar import *
 from pyvale.core.fieldvector import *
 from pyvale.core.fieldtensor import *
 from pyvale.core.fieldconverter import *
+from pyvale.core.fieldinterp import *
+from pyvale.core.fieldsampleplan import *
+from pyvale.core.fieldsampler import *
+from pyvale.core.meshregistry import *
+from pyvale.core.diskcache import *
+from pyvale.core.hashtools import *
 from pyvale.core.fieldtransform import *
 
 from pyvale.core.integratorspatial import *
+from pyvale.core.integratorrules import *
 from pyvale.core.integratorquadrature import *
 from pyvale.core.integratorrectangle import *
 from pyvale.core.integratorfactory import *
@@ -38,6 +45,7 @@ from pyvale.core.sensorarray import *
 from pyvale.core.sensorarrayfactory import *
 from pyvale.core.sensorarraypoint import *
 from pyvale.core.sensordata import *
+from pyvale.core.measurementwindow import *
 
 from pyvale.core.camera import *
 from pyvale.core.cameradata import *
@@ -64,4 +72,5 @@ from pyvale.core.analyticmeshgen import *
 from pyvale.core.analyticsimdatagenerator import *
 from pyvale.core.analyticsimdatafactory import *
 
+from pyvale.core.statsstreaming import *
 from pyvale.core.experimentsimulator import *
@@ -5,12 +5,15 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
+from collections.abc import Iterator
 import numpy as np
 from pyvale.core.field import IField
 from pyvale.core.sensorarray import ISensorArray
 from pyvale.core.errorintegrator import ErrIntegrator
 from pyvale.core.sensordescriptor import SensorDescriptor
-from pyvale.core.fieldsampler import sample_field_with_sensor_data
+from pyvale.core.fieldsampler import sample_field_with_sensor_mask
+from pyvale.core.measurementwindow import (MeasurementWindow,
+                                           iter_measurement_windows)
 from pyvale.core.cameradata import CameraData2D
 from pyvale.core.cameratools import build_sensor_data_from_camera
 
@@ -20,12 +23,14 @@ from pyvale.core.cameratools import build_sensor_data_from_camera
 
 class CameraBasic2D(ISensorArray):
     __slots__ = ("_cam_data","_field","_error_integrator","_descriptor",
-                 "_sensor_data","_truth","_measurements")
+                 "_sensor_data","_truth","_valid_mask","_measurements",
+                 "_dtype")
 
     def __init__(self,
                  cam_data: CameraData2D,
                  field: IField,
                  descriptor: SensorDescriptor | None = None,
+                 dtype: np.dtype | type = np.float64,
                  ) -> None:
 
         self._cam_data = cam_data
@@ -38,7 +43,10 @@ class CameraBasic2D(ISensorArray):
 
         self._sensor_data = build_sensor_data_from_camera(self._cam_data)
 
+        # Single precision halves the memory of full field measurements
+        self._dtype = np.dtype(dtype)
         self._truth = None
+        self._valid_mask = None
         self._measurements = None
 
     #---------------------------------------------------------------------------
@@ -62,6 +70,9 @@ class CameraBasic2D(ISensorArray):
                 len(self._field.get_all_components()),
                 self.get_sample_times().shape[0])
 
+    def get_dtype(self) -> np.dtype:
+        return self._dtype
+
     def get_field(self) -> IField:
         return self._field
 
@@ -71,8 +82,10 @@ class CameraBasic2D(ISensorArray):
     #---------------------------------------------------------------------------
     # Truth calculation from simulation
     def calc_truth_values(self) -> np.ndarray:
-        self._truth = sample_field_with_sensor_data(self._field,
-                                                    self._sensor_data)
+        (truth,self._valid_mask) = sample_field_with_sensor_mask(
+            self._field,
+            self._sensor_data)
+        self._truth = truth.astype(self._dtype,copy=False)
         #shape=(n_pixels,n_field_comps,n_time_steps)
         return self._truth
 
@@ -82,11 +95,21 @@ class CameraBasic2D(ISensorArray):
         #shape=(n_pixels,n_field_comps,n_time_steps)
         return self._truth
 
+    def get_valid_mask(self) -> np.ndarray:
+        if self._valid_mask is None:
+            self.calc_truth_values()
+        #shape=(n_pixels,)
+        return self._valid_mask
+
     #---------------------------------------------------------------------------
     # Errors
     def set_error_integrator(self, err_int: ErrIntegrator) -> None:
         self._error_integrator = err_int
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        if self._error_integrator is not None:
+            self._error_integrator.reseed(seed)
+
     def get_errors_systematic(self) -> np.ndarray | None:
         if self._error_integrator is None:
             return None
@@ -120,6 +143,24 @@ class CameraBasic2D(ISensorArray):
         #shape=(n_pixels,n_field_comps,n_time_steps)
         return self._measurements
 
+    def calc_measurements_batch(self, n_real: int) -> np.ndarray:
+        truth = self.get_truth()
+        if self._error_integrator is None:
+            return np.repeat(truth[np.newaxis,...],n_real,axis=0)
+
+        #shape=(n_real,n_pixels,n_field_comps,n_time_steps)
+        return truth + self._error_integrator.calc_errors_batch(truth,n_real)
+
+    def iter_measurements(self,
+                          chunk_steps: int) -> Iterator[MeasurementWindow]:
+        # Windows are (n_pixels,n_field_comps,n_window_steps), see
+        # get_image_measurements_shape() to reshape each window to images
+        yield from iter_measurement_windows(self._field,
+                                            self._sensor_data,
+                                            self._error_integrator,
+                                            self._dtype,
+                                            chunk_steps)
+
     def get_measurements(self) -> np.ndarray:
         if self._measurements is None:
             self._measurements = self.calc_measurements()
@@ -0,0 +1,174 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import os
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+import numpy as np
+
+
+class DiskCache:
+    """Content addressed on disk cache of numpy arrays. Used to store converted
+    simulation meshes and sample plans between processes so that repeated runs
+    with the same mesh and sensor layout skip the mesh conversion and point
+    location. Entries are keyed by a hash of their content (e.g. the mesh hash
+    and the hash of the sample points) and stored as uncompressed `.npz` files.
+
+    The total size of the cache is bounded: when an entry is saved the least
+    recently used entries are deleted until the cache is below the maximum
+    size. Loading an entry marks it as recently used.
+
+    Files are written to a temporary file and then renamed so that several
+    processes can share the same cache directory.
+    """
+    __slots__ = ("_cache_dir","_max_bytes","_lock")
+
+    def __init__(self,
+                 cache_dir: Path | str,
+                 max_bytes: int = 2**30) -> None:
+        """Initialiser for the `DiskCache` class.
+
+        Parameters
+        ----------
+        cache_dir : Path | str
+            Directory to store the cache entries in, created if it does not
+            exist.
+        max_bytes : int, optional
+            Maximum total size of the cache entries in bytes, by default 2**30
+            (1 GiB).
+        """
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True,exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def get_cache_dir(self) -> Path:
+        return self._cache_dir
+
+    def load(self, key: str) -> dict[str,np.ndarray] | None:
+        """Loads the arrays stored for the given key.
+
+        Parameters
+        ----------
+        key : str
+            Hash key identifying the cache entry.
+
+        Returns
+        -------
+        dict[str,np.ndarray] | None
+            Dictionary of the stored arrays or None if there is no entry for
+            this key.
+        """
+        entry_path = self._get_entry_path(key)
+
+        try:
+            with np.load(entry_path,allow_pickle=False) as entry:
+                arrays = {kk: entry[kk] for kk in entry.files}
+            # Modification time is used as the last access time for the LRU
+            os.utime(entry_path)
+        except (OSError,ValueError,zipfile.BadZipFile):
+            # Missing, evicted by another process or partially written
+            return None
+
+        return arrays
+
+    def save(self, key: str, arrays: dict[str,np.ndarray]) -> None:
+        """Saves the arrays for the given key and evicts the least recently
+        used entries if the cache is over the maximum size.
+
+        Parameters
+        ----------
+        key : str
+            Hash key identifying the cache entry.
+        arrays : dict[str,np.ndarray]
+            Dictionary of arrays to store.
+        """
+        (file_desc,temp_path) = tempfile.mkstemp(dir=self._cache_dir,
+                                                 suffix=".tmp")
+        try:
+            with os.fdopen(file_desc,"wb") as temp_file:
+                np.savez(temp_file,**arrays)
+            os.replace(temp_path,self._get_entry_path(key))
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._evict()
+
+    def clear(self) -> None:
+        """Deletes all entries in the cache.
+        """
+        with self._lock:
+            for ff in self._cache_dir.glob("*.npz"):
+                ff.unlink(missing_ok=True)
+
+    def get_size(self) -> int:
+        """Gets the total size of the cache entries in bytes.
+
+        Returns
+        -------
+        int
+            Total size of all entries in bytes.
+        """
+        return sum(ss.st_size for (_,ss) in self._get_entry_stats())
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self._cache_dir / f"{key}.npz"
+
+    def _get_entry_stats(self) -> list[tuple[Path,os.stat_result]]:
+        entry_stats = []
+        for ff in self._cache_dir.glob("*.npz"):
+            try:
+                entry_stats.append((ff,ff.stat()))
+            except OSError:
+                continue
+        return entry_stats
+
+    def _evict(self) -> None:
+        entry_stats = self._get_entry_stats()
+        total_bytes = sum(ss.st_size for (_,ss) in entry_stats)
+        if total_bytes <= self._max_bytes:
+            return
+
+        entry_stats.sort(key=lambda ee: ee[1].st_mtime)
+        for (ff,ss) in entry_stats:
+            if total_bytes <= self._max_bytes:
+                break
+            ff.unlink(missing_ok=True)
+            total_bytes -= ss.st_size
+
+
+# NOTE: the disk cache is off unless the user sets one
+_disk_cache = None
+
+
+def set_disk_cache(disk_cache: DiskCache | None) -> None:
+    """Sets the on disk cache used by all fields to store and load converted
+    meshes and sample plans. Once set the cache is used transparently by the
+    `MeshRegistry` and `SamplePlanCache`.
+
+    Parameters
+    ----------
+    disk_cache : DiskCache | None
+        The disk cache to use, if None then no disk cache is used.
+    """
+    global _disk_cache
+    _disk_cache = disk_cache
+
+
+def get_disk_cache() -> DiskCache | None:
+    """Gets the on disk cache used by all fields.
+
+    Returns
+    -------
+    DiskCache | None
+        The disk cache or None if no disk cache has been set.
+    """
+    return _disk_cache
@@ -79,22 +79,80 @@ class IErrCalculator(ABC):
             Enumeration definining RANDOM or SYSTEMATIC error types.
         """
 
+    @abstractmethod
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Abstract method for replacing the random generators used by the error
+        calculator with new generators seeded from the input seed. Calculators
+        with more than one random generator spawn an independent child seed for
+        each generator in a fixed order. Calculators that do not draw random
+        numbers do nothing.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generators. If None then fresh entropy is
+            used.
+        """
+        pass
+
+    @abstractmethod
+    def get_rng_state(self) -> list[dict]:
+        """Abstract method for getting the state of the random generators used
+        by the error calculator so the same errors can be drawn again.
+
+        Returns
+        -------
+        list[dict]
+            Bit generator states of the random generators in a fixed order.
+            Empty if the error calculator does not draw random numbers.
+        """
+        pass
+
+    @abstractmethod
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Abstract method for setting the state of the random generators used
+        by the error calculator to a state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            Bit generator states of the random generators in a fixed order.
+        """
+        pass
+
     @abstractmethod
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Abstract method that calculates the error array based on the input
         err_basis array. The output error array will be the same shape as the
         input err_basis array.
 
+        The error basis can have a leading realisation axis to calculate the
+        errors for a batch of independent simulated experiments in one call.
+        Random errors are then drawn independently for every element of the
+        batch and systematic errors are drawn once per realisation, sensor and
+        field component and broadcast over the time steps, so a batch of N
+        realisations is statistically identical to N separate calls.
+
         Parameters
         ----------
         err_basis : np.ndarray
-            Used as the base array for calculating the returned error
+            Used as the base array for calculating the returned error. shape=(
+            num_sensors,num_field_components,num_time_steps) or shape=(
+            num_real,num_sensors,num_field_components,num_time_steps) for a
+            batch of realisations.
         sens_data : SensorData
             Sensor data object holding the current sensor state before applying
-            this error calculation.
+            this error calculation. For a batch this can be the nominal sensor
+            state or a batch of sensor states (see `SensorData`).
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
+            Allows the error integrator to reuse preallocated buffers so that
+            repeated calls do not allocate.
 
         Returns
         -------
@@ -5,13 +5,13 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
-import copy
 from dataclasses import dataclass
 import numpy as np
 from pyvale.core.errorcalculator import (IErrCalculator,
                                         EErrType,
                                         EErrDependence)
-from pyvale.core.sensordata import SensorData
+from pyvale.core.sensordata import SensorData, freeze_sensor_data
+from pyvale.core.errorsysfield import ErrSysField
 
 
 @dataclass(slots=True)
@@ -41,6 +41,18 @@ class ErrIntOpts:
     measurement error. For large sensor arrays (>100 sensors)
     """
 
+    reuse_buffers: bool = False
+    """Reuses preallocated error arrays between calls if True. The total,
+    random and systematic error sums (and the by chain errors if
+    `store_all_errs=True`) are then accumulated in place in arrays owned by the
+    integrator and each error calculator writes directly into a preallocated
+    buffer using its `out` argument, so repeated calls with the same
+    measurement shape do not allocate. Note that the arrays returned by the
+    integrator are then overwritten by the next call so they must be copied if
+    they need to be kept. All error calculators in the chain must support the
+    `out` argument of `IErrCalculator.calc_errs` to use this option.
+    """
+
 
 class ErrIntegrator:
     """Class for managing sensor error integration. Takes a list of objects that
@@ -61,11 +73,16 @@ class ErrIntegrator:
 
     The user can control how the errors are calculated using the `ErrIntOpts`
     dataclass.
+
+    All error arrays use the floating point type of the ground truth array
+    passed to the integrator so single precision (float32) truth values give
+    single precision errors (see the `dtype` of the sensor arrays).
     """
     __slots__ = ("_err_chain","_meas_shape","_errs_by_chain",
                  "_errs_systematic","_errs_random","_errs_total",
                  "_sens_data_by_chain","_err_int_opts","_sens_data_accumulated",
-                 "_sens_data_initial")
+                 "_sens_data_initial","_err_buffer","_basis_buffer",
+                 "_window_rng_states")
 
     def __init__(self,
                  err_chain: list[IErrCalculator],
@@ -98,8 +115,8 @@ class ErrIntegrator:
         self.set_error_chain(err_chain)
         self._meas_shape = meas_shape
 
-        self._sens_data_initial = copy.deepcopy(sensor_data_initial)
-        self._sens_data_accumulated = copy.deepcopy(sensor_data_initial)
+        self._sens_data_initial = freeze_sensor_data(sensor_data_initial)
+        self._sens_data_accumulated = self._sens_data_initial
 
         if self._err_int_opts.store_all_errs:
             self._sens_data_by_chain = []
@@ -112,6 +129,9 @@ class ErrIntegrator:
         self._errs_systematic = np.zeros(meas_shape)
         self._errs_random = np.zeros(meas_shape)
         self._errs_total = np.zeros(meas_shape)
+        self._err_buffer = None
+        self._basis_buffer = None
+        self._window_rng_states = []
 
 
     def set_error_chain(self, err_chain: list[IErrCalculator]) -> None:
@@ -132,6 +152,23 @@ class ErrIntegrator:
                 ee.set_error_dep(EErrDependence.DEPENDENT)
 
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Reseeds the random generators of all errors in the chain. Each error
+        calculator is given an independent child of the input seed in chain
+        order so the errors are reproducible for a given seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the error chain. If None then fresh entropy is used.
+        """
+        if not isinstance(seed,np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+
+        for (ee,ss) in zip(self._err_chain,seed.spawn(len(self._err_chain))):
+            ee.reseed(ss)
+
+
     def calc_errors_from_chain(self, truth: np.ndarray) -> np.ndarray:
         """Calculates all errors by looping over the error chain. The total
          measurement error is summed as each error is calculated in order. Note
@@ -182,32 +219,7 @@ class ErrIntegrator:
             Array of total errors summed over all errors in the chain. shape=(
             num_sensors,num_field_components,num_time_steps).
         """
-        accumulated_error = np.zeros_like(truth)
-        self._errs_by_chain = np.zeros((len(self._err_chain),) + \
-                                           self._meas_shape)
-
-        for ii,ee in enumerate(self._err_chain):
-
-            if ee.get_error_dep() == EErrDependence.DEPENDENT:
-                (error_array,sens_data) = ee.calc_errs(truth+accumulated_error,
-                                                       self._sens_data_accumulated)
-                self._sens_data_accumulated = sens_data
-            else:
-                (error_array,sens_data) = ee.calc_errs(truth,
-                                                       self._sens_data_initial)
-
-            self._sens_data_by_chain.append(sens_data)
-
-            if ee.get_error_type() == EErrType.SYSTEMATIC:
-                self._errs_systematic = self._errs_systematic + error_array
-            else:
-                self._errs_random = self._errs_random + error_array
-
-            accumulated_error = accumulated_error + error_array
-            self._errs_by_chain[ii,:,:,:] = error_array
-
-        self._errs_total = accumulated_error
-        return self._errs_total
+        return self._calc_errors_in_buffers(truth,accumulate_all=False)
 
 
     def _calc_errors_mem_eff(self, truth: np.ndarray) -> np.ndarray:
@@ -230,31 +242,264 @@ class ErrIntegrator:
             Array of total errors summed over all errors in the chain. shape=(
             num_sensors,num_field_components,num_time_steps).
         """
-        accumulated_error = np.zeros_like(truth)
+        return self._calc_errors_in_buffers(truth,accumulate_all=True)
 
-        for ee in self._err_chain:
 
-            if ee.get_error_dep() == EErrDependence.DEPENDENT:
-                (error_array,sens_data) = ee.calc_errs(truth+accumulated_error,
-                                                       self._sens_data_accumulated)
-                self._sens_data_accumulated = sens_data
+    def calc_errors_batch(self, truth: np.ndarray, n_real: int) -> np.ndarray:
+        """Calculates the total errors for a batch of independent realisations
+        (simulated experiments) in one pass over the error chain. Every error
+        calculator is called once with a leading realisation axis on the error
+        basis (see `IErrCalculator.calc_errs`). Field based errors
+        (`ErrSysField`) draw a perturbed sensor state for every realisation up
+        front and then sample the field once for the stacked sensor states of
+        all realisations rather than once per realisation.
+
+        After calling this function the accumulated error arrays returned by
+        the getters have a leading realisation axis.
+
+        Parameters
+        ----------
+        truth : np.ndarray
+            Array of ground truth sensor measurements interpolated from the
+            simulated physical field. shape=(num_sensors,num_field_components,
+            num_time_steps).
+        n_real : int
+            Number of realisations to calculate errors for.
+
+        Returns
+        -------
+        np.ndarray
+            Array of total errors summed over all errors in the chain for each
+            realisation. shape=(num_real,num_sensors,num_field_components,
+            num_time_steps).
+        """
+        truth_batch = np.broadcast_to(truth,(n_real,)+truth.shape)
+        return self._calc_errors_in_buffers(truth_batch,accumulate_all=True)
+
+
+    def calc_errors_time_window(self,
+                                truth: np.ndarray,
+                                sens_data_window: SensorData,
+                                time_start: int) -> np.ndarray:
+        """Calculates the errors for a window of the sample times of one
+        simulated experiment so that long time series can be calculated in
+        chunks with bounded memory. Systematic errors are held constant over
+        all windows of the experiment: the state of the random generators of
+        the systematic errors is saved for the first window and restored for
+        every following window so the same sensor offsets, position and angle
+        perturbations are drawn for every window. Random errors and the random
+        perturbation of sampling times (`ErrFieldData.time_rand`) are drawn
+        independently for each time step so continue their streams. Drift is
+        calculated from the absolute sample times of the window so it is
+        continuous across window boundaries and the time offsets of field
+        errors (`ErrFieldData.time_offset`) are taken for the window.
+
+        NOTE: joining the windows reproduces the systematic errors of a full
+        `calc_errors_from_chain()` call with the same random generator states
+        but not the random errors. Random errors are drawn in window sized
+        blocks so they are different draws from the same distribution.
+
+        Parameters
+        ----------
+        truth : np.ndarray
+            Array of ground truth sensor measurements for the window. shape=(
+            num_sensors,num_field_components,num_window_time_steps).
+        sens_data_window : SensorData
+            Nominal sensor array parameters with the sample times of the
+            window.
+        time_start : int
+            Index of the first sample time of the window in the sample times of
+            the experiment. The first window (index 0) of a new simulated
+            experiment draws new systematic errors.
+
+        Returns
+        -------
+        np.ndarray
+            Array of total errors summed over all errors in the chain for the
+            window. shape=(num_sensors,num_field_components,
+            num_window_time_steps).
+        """
+        if time_start == 0:
+            self._window_rng_states = [
+                ee.get_rng_state()
+                if ee.get_error_type() == EErrType.SYSTEMATIC else None
+                for ee in self._err_chain]
+        else:
+            for (ee,state) in zip(self._err_chain,self._window_rng_states):
+                if state is not None:
+                    self._restore_held_rng_state(ee,state)
+
+        field_errs = [ee for ee in self._err_chain
+                      if isinstance(ee,ErrSysField)]
+        time_window = slice(time_start,time_start+truth.shape[-1])
+
+        sens_data_initial = self._sens_data_initial
+        self._sens_data_initial = sens_data_window
+        for ee in field_errs:
+            ee.set_time_window(time_window)
+        try:
+            errs_total = self.calc_errors_from_chain(truth)
+        finally:
+            self._sens_data_initial = sens_data_initial
+            for ee in field_errs:
+                ee.set_time_window(None)
+
+        return errs_total
+
+
+    def _restore_held_rng_state(self,
+                                err_calc: IErrCalculator,
+                                state: list[dict]) -> None:
+        """Helper function for restoring the random generator state of a
+        systematic error at the start of a new time window. The sampling time
+        jitter of field errors (`ErrFieldData.time_rand`) is drawn per time
+        step so it continues its stream instead of being restored.
+
+        Parameters
+        ----------
+        err_calc : IErrCalculator
+            Systematic error calculator from the error chain.
+        state : list[dict]
+            Random generator state of the error calculator saved at the start
+            of the first window.
+        """
+        time_rand = None
+        if isinstance(err_calc,ErrSysField):
+            time_rand = err_calc.get_field_err_data().time_rand
+
+        if time_rand is None:
+            err_calc.set_rng_state(state)
+            return
+
+        time_state = time_rand.get_rng_state()
+        err_calc.set_rng_state(state)
+        time_rand.set_rng_state(time_state)
+
+
+    def _calc_errors_in_buffers(self,
+                                truth: np.ndarray,
+                                accumulate_all: bool) -> np.ndarray:
+        """Helper function for looping over the error chain and summing the
+        errors in place into the total, random and systematic error arrays.
+
+        Parameters
+        ----------
+        truth : np.ndarray
+            Array of ground truth sensor measurements, can have a leading
+            realisation axis.
+        accumulate_all : bool
+            If True the accumulated sensor state is updated by every error in
+            the chain, otherwise only dependent errors update it.
+
+        Returns
+        -------
+        np.ndarray
+            Array of total errors summed over all errors in the chain with the
+            same shape as the truth array.
+        """
+        store_all_errs = self._err_int_opts.store_all_errs
+        reuse_buffers = self._err_int_opts.reuse_buffers
+        self._reset_accumulators(truth.shape,truth.dtype)
+
+        if store_all_errs:
+            self._sens_data_by_chain = []
+
+        for ii,ee in enumerate(self._err_chain):
+
+            out = None
+            if reuse_buffers:
+                if store_all_errs:
+                    out = self._errs_by_chain[ii]
+                else:
+                    out = self._err_buffer
+
+            dependent = ee.get_error_dep() == EErrDependence.DEPENDENT
+            if dependent:
+                # Basis buffer is None unless reusing so this allocates
+                err_basis = np.add(truth,self._errs_total,
+                                   out=self._basis_buffer)
+                sens_data_in = self._sens_data_accumulated
+            else:
+                err_basis = truth
+                sens_data_in = self._sens_data_initial
+
+            # Only pass the buffer when reusing so that user calculators
+            # written without the `out` argument still work by default
+            if reuse_buffers:
+                (error_array,sens_data) = ee.calc_errs(err_basis,
+                                                       sens_data_in,
+                                                       out=out)
             else:
-                (error_array,sens_data) = ee.calc_errs(truth,
-                                                       self._sens_data_initial)
+                (error_array,sens_data) = ee.calc_errs(err_basis,
+                                                       sens_data_in)
 
-            self._sens_data_accumulated = sens_data
+            if dependent or accumulate_all:
+                self._sens_data_accumulated = sens_data
+
+            if store_all_errs:
+                self._sens_data_by_chain.append(sens_data)
+                if error_array is not out:
+                    self._errs_by_chain[ii] = error_array
 
             if ee.get_error_type() == EErrType.SYSTEMATIC:
-                self._errs_systematic = self._errs_systematic + error_array
+                self._errs_systematic += error_array
             else:
-                self._errs_random = self._errs_random + error_array
+                self._errs_random += error_array
 
-            accumulated_error = accumulated_error + error_array
+            self._errs_total += error_array
 
-        self._errs_total = accumulated_error
         return self._errs_total
 
 
+    def _reset_accumulators(self,
+                            errs_shape: tuple[int,...],
+                            errs_dtype: np.dtype) -> None:
+        """Helper function for resetting the accumulated errors and sensor
+        state before calculating a new set of errors so that nothing carries
+        over from the previous call. If `reuse_buffers=True` in `ErrIntOpts`
+        the existing arrays are zeroed in place and only reallocated if the
+        shape or dtype of the errors has changed, otherwise new arrays are
+        allocated so previously returned errors are not modified.
+
+        Parameters
+        ----------
+        errs_shape : tuple[int,...]
+            Shape of the error arrays for this calculation.
+        errs_dtype : np.dtype
+            Floating point type of the error arrays, this follows the type of
+            the ground truth so the errors are summed at the same precision.
+        """
+        self._sens_data_accumulated = self._sens_data_initial
+        n_chain = len(self._err_chain)
+
+        if (not self._err_int_opts.reuse_buffers
+            or self._errs_total.shape != errs_shape
+            or self._errs_total.dtype != errs_dtype):
+            self._errs_total = np.zeros(errs_shape,dtype=errs_dtype)
+            self._errs_systematic = np.zeros(errs_shape,dtype=errs_dtype)
+            self._errs_random = np.zeros(errs_shape,dtype=errs_dtype)
+
+            if self._err_int_opts.store_all_errs:
+                self._errs_by_chain = np.zeros((n_chain,)+errs_shape,
+                                               dtype=errs_dtype)
+
+            if self._err_int_opts.reuse_buffers:
+                self._err_buffer = np.empty(errs_shape,dtype=errs_dtype)
+                self._basis_buffer = np.empty(errs_shape,dtype=errs_dtype)
+
+            return
+
+        self._errs_total.fill(0.0)
+        self._errs_systematic.fill(0.0)
+        self._errs_random.fill(0.0)
+
+        # Chain length can change via `set_error_chain`
+        if (self._err_int_opts.store_all_errs
+            and self._errs_by_chain.shape[0] != n_chain):
+            self._errs_by_chain = np.zeros((n_chain,)+errs_shape,
+                                           dtype=errs_dtype)
+
+
     def get_errs_by_chain(self) -> np.ndarray | None:
         """Gets the array of errors for each error in chain. If `store_all_errs`
         is False in `ErrIntOpts` then this will return None.
@@ -337,3 +582,4 @@ class ErrIntegrator:
         return self._errs_total
 
 
+
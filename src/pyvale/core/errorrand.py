@@ -95,9 +95,44 @@ class ErrRandUniform(IErrCalculator):
         """
         return EErrType.RANDOM
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self.rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self.rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -108,6 +143,9 @@ class ErrRandUniform(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -116,11 +154,15 @@ class ErrRandUniform(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        rand_errs = self.rng.uniform(low=self.low,
-                                     high=self.high,
-                                     size=err_basis.shape)
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
 
-        return (rand_errs,sens_data)
+        # Same draws as rng.uniform(low,high) without a temporary array
+        self.rng.random(out=out,dtype=out.dtype)
+        out *= self.high - self.low
+        out += self.low
+
+        return (out,sens_data)
 
 
 class ErrRandUnifPercent(IErrCalculator):
@@ -207,9 +249,44 @@ class ErrRandUnifPercent(IErrCalculator):
         """
         return EErrType.RANDOM
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self.rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self.rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -220,6 +297,9 @@ class ErrRandUnifPercent(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -228,11 +308,15 @@ class ErrRandUnifPercent(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        norm_rand = self.rng.uniform(low=self.low,
-                                    high=self.high,
-                                    size=err_basis.shape)
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        self.rng.random(out=out,dtype=out.dtype)
+        out *= self.high - self.low
+        out += self.low
+        out *= err_basis
 
-        return (err_basis*norm_rand,sens_data)
+        return (out,sens_data)
 
 
 class ErrRandNormal(IErrCalculator):
@@ -305,9 +389,44 @@ class ErrRandNormal(IErrCalculator):
         """
         return EErrType.RANDOM
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self.rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self.rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -318,6 +437,9 @@ class ErrRandNormal(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -326,11 +448,14 @@ class ErrRandNormal(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        rand_errs = self.rng.normal(loc=0.0,
-                                    scale=self.std,
-                                    size=err_basis.shape)
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
 
-        return (rand_errs,sens_data)
+        # Same draws as rng.normal(0.0,std) without a temporary array
+        self.rng.standard_normal(out=out,dtype=out.dtype)
+        out *= self.std
+
+        return (out,sens_data)
 
 
 class ErrRandNormPercent(IErrCalculator):
@@ -405,9 +530,44 @@ class ErrRandNormPercent(IErrCalculator):
         """
         return EErrType.RANDOM
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self._rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self._rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -418,6 +578,9 @@ class ErrRandNormPercent(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -426,11 +589,14 @@ class ErrRandNormPercent(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        norm_rand = self._rng.normal(loc=0.0,
-                                    scale=1.0,
-                                    size=err_basis.shape)
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        self._rng.standard_normal(out=out,dtype=out.dtype)
+        out *= err_basis
+        out *= self._std
 
-        return (err_basis*self._std*norm_rand,sens_data)
+        return (out,sens_data)
 
 
 class ErrRandGenerator(IErrCalculator):
@@ -496,9 +662,44 @@ class ErrRandGenerator(IErrCalculator):
         """
         return EErrType.RANDOM
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Reseeds the random generator (implementation of `IGeneratorRandom`)
+        used by this error calculator.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._generator.reseed(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator used by this error calculator
+        so the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the state of the random generator.
+        """
+        return [self._generator.get_rng_state()]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator used by this error calculator
+        to a state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the state of the random generator.
+        """
+        self._generator.set_rng_state(state[0])
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -509,6 +710,9 @@ class ErrRandGenerator(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -517,9 +721,12 @@ class ErrRandGenerator(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        rand_errs = self._generator.generate(size=err_basis.shape)
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        out[...] = self._generator.generate(size=err_basis.shape)
 
-        return (rand_errs,sens_data)
+        return (out,sens_data)
 
 
 class ErrRandGenPercent(IErrCalculator):
@@ -587,9 +794,44 @@ class ErrRandGenPercent(IErrCalculator):
         """
         return EErrType.RANDOM
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Reseeds the random generator (implementation of `IGeneratorRandom`)
+        used by this error calculator.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._generator.reseed(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator used by this error calculator
+        so the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the state of the random generator.
+        """
+        return [self._generator.get_rng_state()]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator used by this error calculator
+        to a state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the state of the random generator.
+        """
+        self._generator.set_rng_state(state[0])
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -600,6 +842,9 @@ class ErrRandGenPercent(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -608,7 +853,12 @@ class ErrRandGenPercent(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        rand_errs = err_basis \
-            * self._generator.generate(size=err_basis.shape)/100
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        np.multiply(err_basis,
+                    self._generator.generate(size=err_basis.shape),
+                    out=out)
+        out /= 100
 
-        return (rand_errs,sens_data)
+        return (out,sens_data)
@@ -107,9 +107,43 @@ class ErrSysRoundOff(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """This error calculator does not draw random numbers so there is
+        nothing to reseed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Not used.
+        """
+        pass
+
+    def get_rng_state(self) -> list[dict]:
+        """This error calculator does not draw random numbers so it has no
+        random generator state.
+
+        Returns
+        -------
+        list[dict]
+            Empty list.
+        """
+        return []
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """This error calculator does not draw random numbers so it has no
+        random generator state to set.
+
+        Parameters
+        ----------
+        state : list[dict]
+            Not used.
+        """
+        pass
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -120,6 +154,9 @@ class ErrSysRoundOff(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -128,9 +165,13 @@ class ErrSysRoundOff(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
         rounded_measurements = self._base*self._method(err_basis/self._base)
+        np.subtract(rounded_measurements,err_basis,out=out)
 
-        return (rounded_measurements - err_basis,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysDigitisation(IErrCalculator):
@@ -196,9 +237,43 @@ class ErrSysDigitisation(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """This error calculator does not draw random numbers so there is
+        nothing to reseed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Not used.
+        """
+        pass
+
+    def get_rng_state(self) -> list[dict]:
+        """This error calculator does not draw random numbers so it has no
+        random generator state.
+
+        Returns
+        -------
+        list[dict]
+            Empty list.
+        """
+        return []
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """This error calculator does not draw random numbers so it has no
+        random generator state to set.
+
+        Parameters
+        ----------
+        state : list[dict]
+            Not used.
+        """
+        pass
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -209,6 +284,9 @@ class ErrSysDigitisation(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -217,10 +295,14 @@ class ErrSysDigitisation(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
         rounded_measurements = self._units_per_bit*self._method(
             err_basis/self._units_per_bit)
+        np.subtract(rounded_measurements,err_basis,out=out)
 
-        return (rounded_measurements - err_basis,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysSaturation(IErrCalculator):
@@ -299,9 +381,43 @@ class ErrSysSaturation(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """This error calculator does not draw random numbers so there is
+        nothing to reseed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Not used.
+        """
+        pass
+
+    def get_rng_state(self) -> list[dict]:
+        """This error calculator does not draw random numbers so it has no
+        random generator state.
+
+        Returns
+        -------
+        list[dict]
+            Empty list.
+        """
+        return []
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """This error calculator does not draw random numbers so it has no
+        random generator state to set.
+
+        Parameters
+        ----------
+        state : list[dict]
+            Not used.
+        """
+        pass
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -312,6 +428,9 @@ class ErrSysSaturation(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -320,11 +439,13 @@ class ErrSysSaturation(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        saturated = np.copy(err_basis)
-        saturated[saturated > self._max] = self._max
-        saturated[saturated < self._min] = self._min
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        np.clip(err_basis,self._min,self._max,out=out)
+        out -= err_basis
 
-        return (saturated - err_basis,sens_data)
+        return (out,sens_data)
 
 
 
@@ -5,14 +5,16 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
-import copy
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import numpy as np
 from scipy.spatial.transform import Rotation
 
 from pyvale.core.field import IField
-from pyvale.core.fieldsampler import sample_field_with_sensor_data
-from pyvale.core.sensordata import SensorData
+from pyvale.core.fieldsampler import sample_field_with_sensor_mask
+from pyvale.core.integratorfactory import SpatialAveragerCache
+from pyvale.core.sensordata import (SensorData,
+                                    as_stacked_rotation,
+                                    tile_sensor_rotation)
 from pyvale.core.integratortype import EIntSpatialType
 from pyvale.core.errorcalculator import (IErrCalculator,
                                     EErrType,
@@ -43,7 +45,9 @@ class ErrFieldData:
 
     time_offset: np.ndarray | None = None
     """Array of offsets to apply to the sampling times for all sensors. shape=(
-    num_time_steps,). If None then no time offset is applied.
+    num_time_steps,). When the errors are calculated in windows of the sample
+    times only the offsets of the window are applied, see
+    `ErrSysField.set_time_window`. If None then no time offset is applied.
     """
 
     pos_rand_xyz: tuple[IGeneratorRandom | None,
@@ -99,7 +103,8 @@ class ErrSysField(IErrCalculator):
 
     Implements the `IErrCalculator` interface.
     """
-    __slots__ = ("_field","_sensor_data_perturbed","_field_err_data","_err_dep")
+    __slots__ = ("_field","_sensor_data_perturbed","_field_err_data","_err_dep",
+                 "_spatial_averager","_valid_mask","_time_window")
 
     def __init__(self,
                 field: IField,
@@ -124,6 +129,10 @@ class ErrSysField(IErrCalculator):
         self._field_err_data = field_err_data
         self._err_dep = err_dep
         self._sensor_data_perturbed = SensorData()
+        # The integrator is reused for every perturbed sensor state
+        self._spatial_averager = SpatialAveragerCache()
+        self._valid_mask = None
+        self._time_window = None
 
     def get_error_dep(self) -> EErrDependence:
         """Gets the error dependence state for this error calculator. An
@@ -161,67 +170,182 @@ class ErrSysField(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Reseeds the random generators perturbing the sensor positions,
+        angles and sampling times. Each generator is given an independent child
+        of the input seed in the order: positions (X, Y, Z), angles (Z, Y, X)
+        and then sampling times.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generators. If None then fresh entropy is
+            used.
+        """
+        generators = self._get_generators()
+        if not isinstance(seed,np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+
+        for (gg,ss) in zip(generators,seed.spawn(len(generators))):
+            gg.reseed(ss)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generators perturbing the sensor
+        positions, angles and sampling times so the same errors can be drawn
+        again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            States of the random generators in the same order as `reseed`.
+        """
+        return [gg.get_rng_state() for gg in self._get_generators()]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generators perturbing the sensor
+        positions, angles and sampling times to a state returned by
+        `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            States of the random generators in the same order as `reseed`.
+        """
+        for (gg,ss) in zip(self._get_generators(),state,strict=True):
+            gg.set_rng_state(ss)
+
+    def _get_generators(self) -> list[IGeneratorRandom]:
+        err_data = self._field_err_data
+        generators = [*(err_data.pos_rand_xyz or ()),
+                      *(err_data.ang_rand_zyx or ()),
+                      err_data.time_rand]
+        return [gg for gg in generators if gg is not None]
+
+    def get_field_err_data(self) -> ErrFieldData:
+        return self._field_err_data
+
     def get_perturbed_sensor_data(self) -> SensorData:
 
         return self._sensor_data_perturbed
 
+    def set_time_window(self, time_window: slice | None) -> None:
+        """Sets the window of the nominal sample times that the next errors
+        are calculated for so the time offsets of the window are applied, see
+        `ErrIntegrator.calc_errors_time_window`.
+
+        Parameters
+        ----------
+        time_window : slice | None
+            Slice of the nominal sample times in the window. If None then the
+            errors are calculated for all sample times.
+        """
+        self._time_window = time_window
+
+    def get_valid_mask(self) -> np.ndarray | None:
+        """Gets the mask of the perturbed sensor positions that were inside the
+        mesh when the errors were last calculated. Perturbed sensors outside
+        the mesh are sampled using the outside policy, see `EOutsidePolicy`.
+
+        Returns
+        -------
+        np.ndarray | None
+            Mask that is True for the perturbed sensors inside the mesh with
+            shape=(num_sensors,) or shape=(num_real,num_sensors) for a batch of
+            realisations. None if the errors have not been calculated.
+        """
+        return self._valid_mask
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input. First
         calculates the combined perturbed sensor state from all perturbations
         specified in the `ErrFieldData` object and then performs a single
         interpolation of the field to obtain the error array.
 
+        If the error basis has a leading realisation axis then a perturbed
+        sensor state is drawn for every realisation and the field is sampled
+        once for the stacked sensor states of all realisations.
+
         Parameters
         ----------
         err_basis : np.ndarray
             Array of values with the same dimensions as the sensor measurement
-            matrix.
+            matrix. shape=(num_sensors,num_field_components,num_time_steps) or
+            shape=(num_real,num_sensors,num_field_components,num_time_steps)
+            for a batch of realisations.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+            This can be the nominal sensor state or a batch of sensor states
+            with the same number of realisations as the error basis.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
         tuple[np.ndarray, SensorData]
-            Tuple containing the calculated error array and pass through of the
-            sensor data object as it is not modified by this class. The returned
-            error array has the same shape as the input error basis.
+            Tuple containing the calculated error array and the perturbed
+            sensor data object. The returned error array has the same shape as
+            the input error basis.
         """
-        self._sensor_data_perturbed = copy.deepcopy(sens_data)
-        self._sensor_data_perturbed.spatial_averager = \
-            self._field_err_data.spatial_averager
-        self._sensor_data_perturbed.spatial_dims = \
-            self._field_err_data.spatial_dims
-
-        self._sensor_data_perturbed.positions = _perturb_sensor_positions(
-            self._sensor_data_perturbed.positions,
-            self._field_err_data.pos_offset_xyz,
-            self._field_err_data.pos_rand_xyz,
+        n_real = None
+        if err_basis.ndim == 4:
+            n_real = err_basis.shape[0]
+
+        n_sensors = sens_data.positions.shape[-2]
+        sens_pos = sens_data.positions
+        if n_real is not None and sens_pos.ndim == 2:
+            sens_pos = np.broadcast_to(sens_pos,(n_real,)+sens_pos.shape)
+
+        time_offset = self._field_err_data.time_offset
+        if time_offset is not None and self._time_window is not None:
+            time_offset = time_offset[...,self._time_window]
+
+        # Overlay of the input sensor state, only the perturbed parameters are
+        # new arrays and everything else is shared with the input
+        self._sensor_data_perturbed = replace(
+            sens_data,
+            positions=_perturb_sensor_positions(
+                sens_pos,
+                self._field_err_data.pos_offset_xyz,
+                self._field_err_data.pos_rand_xyz,
+            ),
+            sample_times=_perturb_sample_times(
+                self._field.get_time_steps(),
+                sens_data.sample_times,
+                time_offset,
+                self._field_err_data.time_rand,
+                self._field_err_data.time_drift,
+                n_real,
+            ),
+            angles=_perturb_sensor_angles(
+                n_sensors,
+                sens_data.angles,
+                self._field_err_data.ang_offset_zyx,
+                self._field_err_data.ang_rand_zyx,
+                n_real,
+            ),
+            spatial_averager=self._field_err_data.spatial_averager,
+            spatial_dims=self._field_err_data.spatial_dims,
         )
 
-        self._sensor_data_perturbed.sample_times = _perturb_sample_times(
-            self._field.get_time_steps(),
-            self._sensor_data_perturbed.sample_times,
-            self._field_err_data.time_offset,
-            self._field_err_data.time_rand,
-            self._field_err_data.time_drift,
-        )
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
 
-        self._sensor_data_perturbed.angles = _perturb_sensor_angles(
-            sens_data.positions.shape[0],
-            self._sensor_data_perturbed.angles,
-            self._field_err_data.ang_offset_zyx,
-            self._field_err_data.ang_rand_zyx,
-        )
+        integrator = self._spatial_averager.get_integrator(
+            self._field,
+            self._sensor_data_perturbed)
 
-        sys_errs = sample_field_with_sensor_data(
+        (sample_vals,self._valid_mask) = sample_field_with_sensor_mask(
             self._field,
-            self._sensor_data_perturbed
-        ) - err_basis
+            self._sensor_data_perturbed,
+            integrator)
+        np.subtract(sample_vals,err_basis,out=out)
 
-        return (sys_errs,self._sensor_data_perturbed)
+        return (out,self._sensor_data_perturbed)
 
 
 def _perturb_sensor_positions(sens_pos_nominal: np.ndarray,
@@ -239,7 +363,8 @@ def _perturb_sensor_positions(sens_pos_nominal: np.ndarray,
     ----------
     sens_pos_nominal : np.ndarray
         Nominal sensor positions as an array with shape=(num_sensors,3) where
-        the columns represent the position in the X, Y and Z axes.
+        the columns represent the position in the X, Y and Z axes. For a batch
+        of realisations shape=(num_real,num_sensors,3).
     pos_offset_xyz : np.ndarray | None
         Offsets to apply to the sensor positions as an array with shape=
         (num_sensors,3) wherethe columns represent the position in the X, Y and
@@ -253,9 +378,17 @@ def _perturb_sensor_positions(sens_pos_nominal: np.ndarray,
     Returns
     -------
     np.ndarray
-        Array of perturbed sensors positions with shape=(num_sensors,3) where
-        the columns represent the position in the X, Y and Z axes.
+        Array of perturbed sensors positions with the same shape as the nominal
+        positions where the last axis is the position in the X, Y and Z axes.
+        If there are no perturbations the nominal array is returned without
+        copying.
     """
+    if pos_rand_xyz is not None and all(rr is None for rr in pos_rand_xyz):
+        pos_rand_xyz = None
+
+    if pos_offset_xyz is None and pos_rand_xyz is None:
+        return sens_pos_nominal
+
     sens_pos_perturbed = np.copy(sens_pos_nominal)
 
     if pos_offset_xyz is not None:
@@ -264,8 +397,8 @@ def _perturb_sensor_positions(sens_pos_nominal: np.ndarray,
     if pos_rand_xyz is not None:
         for ii,rng in enumerate(pos_rand_xyz):
             if rng is not None:
-                sens_pos_perturbed[:,ii] = sens_pos_perturbed[:,ii] + \
-                    rng.generate(size=sens_pos_perturbed.shape[0])
+                sens_pos_perturbed[...,ii] = sens_pos_perturbed[...,ii] + \
+                    rng.generate(size=sens_pos_perturbed.shape[:-1])
 
     return sens_pos_perturbed
 
@@ -274,7 +407,8 @@ def _perturb_sample_times(sim_time: np.ndarray,
                          time_nominal: np.ndarray | None,
                          time_offset: np.ndarray | None,
                          time_rand: IGeneratorRandom | None,
-                         time_drift: IDriftCalculator | None
+                         time_drift: IDriftCalculator | None,
+                         n_real: int | None = None,
                          ) -> np.ndarray | None:
     """Helper function for calculating perturbed sensor sampling times for the
     purpose of calculating field based systematic errors.
@@ -295,19 +429,27 @@ def _perturb_sample_times(sim_time: np.ndarray,
     time_drift : IDriftCalculator | None
         Drift function for calculating temporal sampling drift. If None then no
         temporal drift is applied.
+    n_real : int | None, optional
+        Number of realisations in a batch. If not None and the sampling times
+        are perturbed then each realisation gets its own perturbed sampling
+        times, by default None.
 
     Returns
     -------
     np.ndarray | None
-        Array of
+        Array of perturbed sampling times with shape=(num_time_steps,) or shape
+        =(num_real,num_time_steps) for a batch. If None then the sampling times
+        are the simulation time steps.
     """
+    if time_offset is None and time_rand is None and time_drift is None:
+        return time_nominal
+
     if time_nominal is None:
-        if (time_offset is not None
-            or time_rand is not None
-            or time_drift is not None):
-            time_nominal = sim_time
-        else:
-            return None
+        time_nominal = sim_time
+
+    if n_real is not None and time_nominal.ndim == 1:
+        time_nominal = np.broadcast_to(time_nominal,
+                                       (n_real,)+time_nominal.shape)
 
     time_perturbed = np.copy(time_nominal)
 
@@ -323,23 +465,27 @@ def _perturb_sample_times(sim_time: np.ndarray,
 
 
 def _perturb_sensor_angles(n_sensors: int,
-                          angles_nominal: tuple[Rotation,...] | None,
+                          angles_nominal: tuple[Rotation,...] | Rotation | None,
                           angle_offsets_zyx: np.ndarray | None,
                           rand_ang_zyx: tuple[IGeneratorRandom | None,
                                               IGeneratorRandom | None,
                                               IGeneratorRandom | None] | None,
-                          ) -> tuple[Rotation,...] | None:
+                          n_real: int | None = None,
+                          ) -> Rotation | None:
     """Helper function for perturbing sensor angles for the purpose of
-    calculating field based systematic errors.
+    calculating field based systematic errors. The perturbations for all
+    sensors are drawn with one generator call per axis and composed with the
+    nominal angles as a single stacked rotation.
 
     Parameters
     ----------
     n_sensors : int
         Number of sensors in the sensor array.
-    angles_nominal : tuple[Rotation,...] | None
-        The nominal angles of the sensors as a tuple of scipy Rotation objects.
-        This tuple should have length equal to the number of sensors. If None
-        then an initial orienation of [0,0,0] is assumed.
+    angles_nominal : tuple[Rotation,...] | Rotation | None
+        The nominal angles of the sensors as a tuple of scipy Rotation objects
+        or a stacked Rotation. This should have length equal to the number of
+        sensors or length 1 if all sensors have the same angle. If None then an
+        initial orienation of [0,0,0] is assumed.
     angle_offsets_zyx : np.ndarray | None
         Angle offsets to apply to the sensor array as an array with shape=(
         num_sensors,3) where the columns are the rotations about Z, Y and X in
@@ -350,37 +496,49 @@ def _perturb_sensor_angles(n_sensors: int,
         Random generators for perturbing sensor angles about the Z, Y and X axis
         respectively. If None then no random perturbation to the sensor angle
         occurs.
+    n_real : int | None, optional
+        Number of realisations in a batch. If not None then each realisation
+        gets its own perturbation and the returned rotation is stacked
+        realisation by realisation, by default None.
 
     Returns
     -------
-    tuple[Rotation,...] | None
-        Rotation object giving each sensors perturbed angle. If None then the
+    Rotation | None
+        Stacked rotation giving each sensors perturbed angle. If None then the
         no sensors have had their angles perturbed.
     """
-    if angles_nominal is None:
-        if angle_offsets_zyx is not None or rand_ang_zyx is not None:
-            angles_nominal = n_sensors * \
-                (Rotation.from_euler("zyx",[0,0,0], degrees=True),)
-        else:
-            return None
-
-    angles_perturbed = [Rotation.from_euler("zyx",[0,0,0], degrees=True)] * \
-        len(angles_nominal)
-    for ii,rot_nom in enumerate(angles_nominal): # loop over sensors
-        # NOTE: adding angles here might not be correct
-        sensor_rot_angs = np.zeros((3,))
+    if rand_ang_zyx is not None and all(rr is None for rr in rand_ang_zyx):
+        rand_ang_zyx = None
 
-        if angle_offsets_zyx is not None:
-            sensor_rot_angs = sensor_rot_angs + angle_offsets_zyx[ii,:]
-
-        if rand_ang_zyx is not None:
-            for jj,rand_ang in enumerate(rand_ang_zyx): # loop over components
-                if rand_ang is not None:
-                    sensor_rot_angs[jj] = sensor_rot_angs[jj] + \
-                        rand_ang.generate(size=1)
-
-        sensor_rot = Rotation.from_euler("zyx",sensor_rot_angs, degrees=True)
-        angles_perturbed[ii] = sensor_rot*rot_nom
-
-    return tuple(angles_perturbed)
+    if angle_offsets_zyx is None and rand_ang_zyx is None:
+        if angles_nominal is None:
+            return None
+        return as_stacked_rotation(angles_nominal)
 
+    if angles_nominal is None:
+        angles_nominal = Rotation.identity(n_sensors)
+
+    # NOTE: adding angles here might not be correct
+    # shape=(n_sens,3) or (n_real,n_sens,3) for a batch
+    rot_shape = (n_sensors,3)
+    if n_real is not None:
+        rot_shape = (n_real,) + rot_shape
+    sensor_rot_angs = np.zeros(rot_shape)
+
+    if angle_offsets_zyx is not None:
+        sensor_rot_angs = sensor_rot_angs + angle_offsets_zyx
+
+    if rand_ang_zyx is not None:
+        for ii,rand_ang in enumerate(rand_ang_zyx): # loop over components
+            if rand_ang is not None:
+                sensor_rot_angs[...,ii] = sensor_rot_angs[...,ii] + \
+                    rand_ang.generate(size=rot_shape[:-1])
+
+    # Nominal angles per sensor are repeated for each realisation
+    angles_nominal = tile_sensor_rotation(angles_nominal,
+                                          int(np.prod(rot_shape[:-1])))
+
+    # A single nominal rotation is broadcast over the stack of perturbations
+    sensor_rots = Rotation.from_euler("zyx",sensor_rot_angs.reshape((-1,3)),
+                                      degrees=True)
+    return sensor_rots*angles_nominal
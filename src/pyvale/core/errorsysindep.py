@@ -78,9 +78,43 @@ class ErrSysOffset(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """This error calculator does not draw random numbers so there is
+        nothing to reseed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Not used.
+        """
+        pass
+
+    def get_rng_state(self) -> list[dict]:
+        """This error calculator does not draw random numbers so it has no
+        random generator state.
+
+        Returns
+        -------
+        list[dict]
+            Empty list.
+        """
+        return []
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """This error calculator does not draw random numbers so it has no
+        random generator state to set.
+
+        Parameters
+        ----------
+        state : list[dict]
+            Not used.
+        """
+        pass
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -91,6 +125,9 @@ class ErrSysOffset(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -99,7 +136,12 @@ class ErrSysOffset(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        return (self._offset*np.ones(shape=err_basis.shape),sens_data)
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        out.fill(self._offset)
+
+        return (out,sens_data)
 
 
 class ErrSysOffsetPercent(IErrCalculator):
@@ -161,9 +203,43 @@ class ErrSysOffsetPercent(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """This error calculator does not draw random numbers so there is
+        nothing to reseed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Not used.
+        """
+        pass
+
+    def get_rng_state(self) -> list[dict]:
+        """This error calculator does not draw random numbers so it has no
+        random generator state.
+
+        Returns
+        -------
+        list[dict]
+            Empty list.
+        """
+        return []
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """This error calculator does not draw random numbers so it has no
+        random generator state to set.
+
+        Parameters
+        ----------
+        state : list[dict]
+            Not used.
+        """
+        pass
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -174,6 +250,9 @@ class ErrSysOffsetPercent(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -182,10 +261,12 @@ class ErrSysOffsetPercent(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        return (self._offset_percent/100 *
-                err_basis *
-                np.ones(shape=err_basis.shape),
-                sens_data)
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        np.multiply(self._offset_percent/100,err_basis,out=out)
+
+        return (out,sens_data)
 
 
 class ErrSysUniform(IErrCalculator):
@@ -263,9 +344,44 @@ class ErrSysUniform(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self._rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self._rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -276,6 +392,9 @@ class ErrSysUniform(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -290,11 +409,13 @@ class ErrSysUniform(IErrCalculator):
                                     high=self._high,
                                     size=err_shape)
 
-        tile_shape = np.array(err_basis.shape)
-        tile_shape[0:-1] = 1
-        sys_errs = np.tile(sys_errs,tuple(tile_shape))
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        # Broadcast the sensor errors over the time axis in place of a tile
+        np.copyto(out,sys_errs)
 
-        return (sys_errs,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysUniformPercent(IErrCalculator):
@@ -370,9 +491,44 @@ class ErrSysUniformPercent(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self._rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self._rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -383,6 +539,9 @@ class ErrSysUniformPercent(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -397,11 +556,12 @@ class ErrSysUniformPercent(IErrCalculator):
                                     high=self._high,
                                     size=err_shape)
 
-        tile_shape = np.array(err_basis.shape)
-        tile_shape[0:-1] = 1
-        sys_errs = np.tile(sys_errs,tuple(tile_shape))
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        np.multiply(err_basis,sys_errs,out=out)
 
-        return (err_basis*sys_errs,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysNormal(IErrCalculator):
@@ -478,9 +638,44 @@ class ErrSysNormal(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self._rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self._rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -491,6 +686,9 @@ class ErrSysNormal(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -505,11 +703,13 @@ class ErrSysNormal(IErrCalculator):
                                     scale=self._std,
                                     size=err_shape)
 
-        tile_shape = np.array(err_basis.shape)
-        tile_shape[0:-1] = 1
-        sys_errs = np.tile(sys_errs,tuple(tile_shape))
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        # Broadcast the sensor errors over the time axis in place of a tile
+        np.copyto(out,sys_errs)
 
-        return (sys_errs,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysNormPercent(IErrCalculator):
@@ -570,9 +770,44 @@ class ErrSysNormPercent(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Replaces the random generator of this error calculator with a new
+        generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator of this error calculator so
+        the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        return [self._rng.bit_generator.state]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator of this error calculator to a
+        state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the bit generator state of the random generator.
+        """
+        self._rng.bit_generator.state = state[0]
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
 
         err_shape = np.array(err_basis.shape)
@@ -589,6 +824,9 @@ class ErrSysNormPercent(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -597,11 +835,12 @@ class ErrSysNormPercent(IErrCalculator):
             sensor data object as it is not modified by this class. The returned
             error array has the same shape as the input error basis.
         """
-        tile_shape = np.array(err_basis.shape)
-        tile_shape[0:-1] = 1
-        sys_errs = np.tile(sys_errs,tuple(tile_shape))
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        np.multiply(err_basis,sys_errs,out=out)
 
-        return (err_basis*sys_errs,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysGenerator(IErrCalculator):
@@ -656,9 +895,44 @@ class ErrSysGenerator(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Reseeds the random generator (implementation of `IGeneratorRandom`)
+        used by this error calculator.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._generator.reseed(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator used by this error calculator
+        so the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the state of the random generator.
+        """
+        return [self._generator.get_rng_state()]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator used by this error calculator
+        to a state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the state of the random generator.
+        """
+        self._generator.set_rng_state(state[0])
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -669,6 +943,9 @@ class ErrSysGenerator(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -682,11 +959,13 @@ class ErrSysGenerator(IErrCalculator):
 
         sys_errs = self._generator.generate(size=err_shape)
 
-        tile_shape = np.array(err_basis.shape)
-        tile_shape[0:-1] = 1
-        sys_errs = np.tile(sys_errs,tuple(tile_shape))
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        # Broadcast the sensor errors over the time axis in place of a tile
+        np.copyto(out,sys_errs)
 
-        return (sys_errs,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysGenPercent(IErrCalculator):
@@ -747,9 +1026,44 @@ class ErrSysGenPercent(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Reseeds the random generator (implementation of `IGeneratorRandom`)
+        used by this error calculator.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        self._generator.reseed(seed)
+
+    def get_rng_state(self) -> list[dict]:
+        """Gets the state of the random generator used by this error calculator
+        so the same errors can be drawn again, see `set_rng_state`.
+
+        Returns
+        -------
+        list[dict]
+            List holding the state of the random generator.
+        """
+        return [self._generator.get_rng_state()]
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """Sets the state of the random generator used by this error calculator
+        to a state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : list[dict]
+            List holding the state of the random generator.
+        """
+        self._generator.set_rng_state(state[0])
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -760,6 +1074,9 @@ class ErrSysGenPercent(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -773,12 +1090,12 @@ class ErrSysGenPercent(IErrCalculator):
 
         sys_errs = self._generator.generate(size=err_shape)
 
-        tile_shape = np.array(err_basis.shape)
-        tile_shape[0:-1] = 1
-        sys_errs = np.tile(sys_errs,tuple(tile_shape))
-        sys_errs = err_basis * sys_errs
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        np.multiply(err_basis,sys_errs,out=out)
 
-        return (sys_errs,sens_data)
+        return (out,sens_data)
 
 
 class ErrSysCalibration(IErrCalculator):
@@ -868,9 +1185,43 @@ class ErrSysCalibration(IErrCalculator):
         """
         return EErrType.SYSTEMATIC
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """This error calculator does not draw random numbers so there is
+        nothing to reseed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Not used.
+        """
+        pass
+
+    def get_rng_state(self) -> list[dict]:
+        """This error calculator does not draw random numbers so it has no
+        random generator state.
+
+        Returns
+        -------
+        list[dict]
+            Empty list.
+        """
+        return []
+
+    def set_rng_state(self, state: list[dict]) -> None:
+        """This error calculator does not draw random numbers so it has no
+        random generator state to set.
+
+        Parameters
+        ----------
+        state : list[dict]
+            Not used.
+        """
+        pass
+
     def calc_errs(self,
                   err_basis: np.ndarray,
                   sens_data: SensorData,
+                  out: np.ndarray | None = None,
                   ) -> tuple[np.ndarray, SensorData]:
         """Calculates the error array based on the size of the input.
 
@@ -881,6 +1232,9 @@ class ErrSysCalibration(IErrCalculator):
             matrix.
         sens_data : SensorData
             The accumulated sensor state data for all errors prior to this one.
+        out : np.ndarray | None, optional
+            Array with the same shape as the error basis to write the errors
+            into, by default None. If None then a new array is allocated.
 
         Returns
         -------
@@ -896,9 +1250,12 @@ class ErrSysCalibration(IErrCalculator):
         # shape=(n_sens,n_comps,n_time_steps)
         field_from_assumed_calib = self._assumed_calib(signal_from_field)
 
-        sys_errs = field_from_assumed_calib - err_basis
+        if out is None:
+            out = np.empty(err_basis.shape,dtype=err_basis.dtype)
+
+        np.subtract(field_from_assumed_calib,err_basis,out=out)
 
-        return (sys_errs,sens_data)
+        return (out,sens_data)
 
 
 
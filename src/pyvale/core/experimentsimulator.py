@@ -5,9 +5,17 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
+import os
+import copy
+import enum
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
 from dataclasses import dataclass
 import numpy as np
 from pyvale.core.sensorarray import ISensorArray
+from pyvale.core.statsstreaming import StreamStats
 import mooseherder as mh
 
 # NOTE: This module is a feature under developement.
@@ -28,6 +36,76 @@ class ExperimentStats:
     mad: np.ndarray | None = None
 
 
+class EExpSimBackend(enum.Enum):
+    """Enumeration specifying how the experiments for each simulation are
+    executed by the `ExperimentSimulator`.
+
+    SERIAL
+        All experiments are run one after the other on the calling thread.
+
+    THREAD
+        Experiments are split into chunks which are run on a pool of threads
+        where each thread works on its own copy of the sensor array.
+
+    PROCESS
+        Experiments are split into chunks which are run on a pool of processes
+        that write their measurements into a shared memory block.
+    """
+    SERIAL = enum.auto()
+    THREAD = enum.auto()
+    PROCESS = enum.auto()
+
+
+@dataclass(slots=True)
+class ExpSimOpts:
+    """Experiment simulator options dataclass. Allows the user to control how
+    the experiments are split across workers and how the random number
+    generators are seeded.
+    """
+
+    backend: EExpSimBackend = EExpSimBackend.SERIAL
+    """Execution backend used to run the experiments, see `EExpSimBackend`.
+    """
+
+    workers: int | None = None
+    """Number of worker threads or processes. If None then the number of CPUs
+    reported by the operating system is used. Ignored for the serial backend.
+    """
+
+    seed: int | None = None
+    """Root seed for the experiments. If not None (or if a parallel backend is
+    used) then every chunk of experiments re-seeds all random generators in its
+    copy of the sensor array from an independent stream spawned from a
+    `np.random.SeedSequence` with this root seed. The stream only depends on the
+    sensor array, simulation and chunk index so results are the same for any
+    backend and number of workers. If None with the serial backend then the
+    random generators in the sensor arrays are used as is.
+    """
+
+    exps_per_chunk: int = 100
+    """Number of experiments in each chunk of work. Each chunk has its own
+    random stream so changing this changes the random draws. The measurements
+    of all experiments in a chunk are held in memory together so this also sets
+    the size of the arrays held in memory per worker.
+    """
+
+    stream_stats: bool = False
+    """Accumulates the summary statistics while the experiments are running
+    using streaming estimators (Welford mean/variance, min/max and P²
+    quantiles) if True. The quartiles, median and median absolute deviation
+    are then approximate. Otherwise the statistics are calculated exactly from
+    the stored experiment data by `calc_stats`.
+    """
+
+    store_exp_data: bool = True
+    """Stores the full experiment data array with shape=(n_sims,n_exps,n_sens,
+    n_comps,n_time_steps) for each sensor array if True. If False the
+    experiment data is never materialised and the statistics are streamed (as
+    if `stream_stats` were True) so memory use does not grow with the number
+    of experiments.
+    """
+
+
 class ExperimentSimulator:
     """An experiment simulator for running monte-carlo analysis by applying a
     list of sensor arrays to a list of simulations over a given number of user
@@ -35,19 +113,41 @@ class ExperimentSimulator:
     applied to each simulation.
     """
     __slots__ = ("sim_list","sensor_arrays","num_exp_per_sim","_exp_data",
-                 "_exp_stats")
+                 "_exp_stats","_exp_sim_opts","_stream_stats")
 
     def __init__(self,
                  sim_list: list[mh.SimData],
                  sensor_arrays: list[ISensorArray],
-                 num_exp_per_sim: int
+                 num_exp_per_sim: int,
+                 exp_sim_opts: ExpSimOpts | None = None
                  ) -> None:
+        """Initialiser for the `ExperimentSimulator` class.
+
+        Parameters
+        ----------
+        sim_list : list[mh.SimData]
+            List of simulations to apply the sensor arrays to.
+        sensor_arrays : list[ISensorArray]
+            List of sensor arrays to simulate experiments for.
+        num_exp_per_sim : int
+            Number of experiments to simulate for each sensor array applied to
+            each simulation.
+        exp_sim_opts : ExpSimOpts | None, optional
+            Options for controlling the execution backend and seeding of the
+            experiments, by default None. If None then the default options
+            dataclass is used which runs all experiments serially.
+        """
+        if exp_sim_opts is None:
+            self._exp_sim_opts = ExpSimOpts()
+        else:
+            self._exp_sim_opts = exp_sim_opts
 
         self.sim_list = sim_list
         self.sensor_arrays = sensor_arrays
         self.num_exp_per_sim = num_exp_per_sim
         self._exp_data = [None]*len(self.sensor_arrays)
         self._exp_stats = [None]*len(self.sensor_arrays)
+        self._stream_stats = [None]*len(self.sensor_arrays)
 
     def get_data(self) -> list[np.ndarray | None]:
         return self._exp_data
@@ -56,19 +156,73 @@ class ExperimentSimulator:
         return self._exp_stats
 
     def run_experiments(self) -> list[np.ndarray]:
+        """Runs the experiments for each sensor array applied to each
+        simulation using the execution backend specified in the options.
+
+        Returns
+        -------
+        list[np.ndarray]
+            List of measurement arrays where the list index is the sensor
+            array. shape=list[n_arrays](n_sims,n_exps,n_sens,n_comps,
+            n_time_steps). If the experiment data is not stored then the list
+            contains None for each sensor array.
+        """
+        opts = self._exp_sim_opts
         n_sims = len(self.sim_list)
         # shape=list[n_arrays](n_sims,n_exps,n_sens,n_comps,n_time_steps)
         self._exp_data = [None]*len(self.sensor_arrays)
+        self._stream_stats = [None]*len(self.sensor_arrays)
+
+        seed_seq = None
+        if opts.seed is not None or opts.backend != EExpSimBackend.SERIAL:
+            seed_seq = np.random.SeedSequence(opts.seed)
+
+        n_workers = opts.workers
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
 
         for ii,aa in enumerate(self.sensor_arrays):
-            meas_array = np.zeros((n_sims,self.num_exp_per_sim)+
-                                aa.get_measurement_shape())
+            meas_shape = ((n_sims,self.num_exp_per_sim)
+                          + aa.get_measurement_shape())
+            chunks = _get_exp_chunks(ii,
+                                     n_sims,
+                                     self.num_exp_per_sim,
+                                     opts.exps_per_chunk,
+                                     seed_seq)
+
+            stream_stats = None
+            if opts.stream_stats or not opts.store_exp_data:
+                stream_stats = [StreamStats(aa.get_measurement_shape())
+                                for _ in range(n_sims)]
+                self._stream_stats[ii] = stream_stats
+
+            if opts.backend == EExpSimBackend.PROCESS:
+                self._exp_data[ii] = _run_chunks_process(aa,
+                                                         self.sim_list,
+                                                         meas_shape,
+                                                         chunks,
+                                                         n_workers,
+                                                         opts.store_exp_data,
+                                                         stream_stats)
+                continue
 
-            for jj,ss in enumerate(self.sim_list):
-                aa.get_field().set_sim_data(ss)
+            meas_array = None
+            if opts.store_exp_data:
+                meas_array = np.zeros(meas_shape,dtype=aa.get_dtype())
 
-                for ee in range(self.num_exp_per_sim):
-                    meas_array[jj,ee,:,:,:] = aa.calc_measurements()
+            if opts.backend == EExpSimBackend.THREAD:
+                with ThreadPoolExecutor(max_workers=n_workers,
+                                        initializer=_init_worker,
+                                        initargs=(aa,self.sim_list,
+                                                  meas_array,True)) as pool:
+                    _run_chunks(pool,chunks,n_workers,meas_array,stream_stats)
+            else:
+                # Only copy the sensor array if we are going to re-seed it
+                _init_worker(aa,self.sim_list,meas_array,seed_seq is not None)
+                try:
+                    _run_chunks(None,chunks,1,meas_array,stream_stats)
+                finally:
+                    _clear_worker()
 
             self._exp_data[ii] = meas_array
 
@@ -76,9 +230,24 @@ class ExperimentSimulator:
 
 
     def calc_stats(self) -> list[ExperimentStats]:
+        """Calculates summary statistics over all experiments (axis=1 of the
+        experiment data) for each sensor array applied to each simulation. If
+        the statistics were streamed while running the experiments then the
+        streamed estimates are returned.
+
+        Returns
+        -------
+        list[ExperimentStats]
+            List of statistics where the list index is the sensor array. Each
+            statistic has shape=(n_sims,n_sens,n_comps,n_time_steps)
+        """
         # shape=list[n_arrays](n_sims,n_exps,n_sens,n_comps,n_time_steps)
         self._exp_stats = [None]*len(self.sensor_arrays)
         for ii,_ in enumerate(self.sensor_arrays):
+            if self._stream_stats[ii] is not None:
+                self._exp_stats[ii] = _get_stream_stats(self._stream_stats[ii])
+                continue
+
             array_stats = ExperimentStats()
             array_stats.max = np.max(self._exp_data[ii],axis=1)
             array_stats.min = np.min(self._exp_data[ii],axis=1)
@@ -94,6 +263,179 @@ class ExperimentSimulator:
         return self._exp_stats
 
 
+def _get_stream_stats(stream_stats: list[StreamStats]) -> ExperimentStats:
+    array_stats = ExperimentStats()
+    array_stats.max = np.stack([ss.get_max() for ss in stream_stats])
+    array_stats.min = np.stack([ss.get_min() for ss in stream_stats])
+    array_stats.mean = np.stack([ss.get_mean() for ss in stream_stats])
+    array_stats.std = np.stack([ss.get_std() for ss in stream_stats])
+    array_stats.med = np.stack([ss.get_median() for ss in stream_stats])
+    array_stats.q25 = np.stack([ss.get_q25() for ss in stream_stats])
+    array_stats.q75 = np.stack([ss.get_q75() for ss in stream_stats])
+    array_stats.mad = np.stack([ss.get_mad() for ss in stream_stats])
+    return array_stats
+
+
+# NOTE: each worker thread or process holds its own sensor array and a view of
+# the output array here so they are only sent to the worker once.
+_worker = threading.local()
+
+
+def _init_worker(sensor_array: ISensorArray,
+                 sim_list: list[mh.SimData],
+                 meas_array: np.ndarray | None,
+                 copy_array: bool) -> None:
+    _worker.sensor_array = (copy.deepcopy(sensor_array) if copy_array
+                            else sensor_array)
+    _worker.sim_list = sim_list
+    _worker.sim_ind = None
+    _worker.meas_array = meas_array
+    _worker.shm = None
+
+
+def _init_worker_shm(sensor_array: ISensorArray,
+                     sim_list: list[mh.SimData],
+                     shm_name: str,
+                     meas_shape: tuple[int,...],
+                     meas_dtype: np.dtype) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    meas_array = np.ndarray(meas_shape,dtype=meas_dtype,buffer=shm.buf)
+    # Processes already hold their own copy of the sensor array
+    _init_worker(sensor_array,sim_list,meas_array,False)
+    _worker.shm = shm
+
+
+def _clear_worker() -> None:
+    _worker.__dict__.clear()
+
+
+def _get_exp_chunks(array_ind: int,
+                    n_sims: int,
+                    n_exps: int,
+                    exps_per_chunk: int,
+                    seed_seq: np.random.SeedSequence | None
+                    ) -> list[tuple[int,int,int,np.random.SeedSequence | None]]:
+    exps_per_chunk = max(exps_per_chunk,1)
+    chunks = []
+    for jj in range(n_sims):
+        for kk,ee in enumerate(range(0,n_exps,exps_per_chunk)):
+            chunk_seed = None
+            if seed_seq is not None:
+                chunk_seed = np.random.SeedSequence(
+                    entropy=seed_seq.entropy,
+                    spawn_key=seed_seq.spawn_key+(array_ind,jj,kk))
+
+            chunks.append((jj,ee,min(ee+exps_per_chunk,n_exps),chunk_seed))
+
+    return chunks
+
+
+def _run_exp_chunk(sim_ind: int,
+                   exp_start: int,
+                   exp_stop: int,
+                   chunk_seed: np.random.SeedSequence | None
+                   ) -> np.ndarray | None:
+    sensor_array = _worker.sensor_array
+
+    if _worker.sim_ind != sim_ind:
+        sensor_array.get_field().set_sim_data(_worker.sim_list[sim_ind])
+        _worker.sim_ind = sim_ind
+
+    if chunk_seed is not None:
+        sensor_array.reseed(chunk_seed)
+
+    # Experiments are calculated one at a time so the results are the same as
+    # calling `calc_measurements` in a loop
+    chunk_meas = np.stack([sensor_array.calc_measurements()
+                           for _ in range(exp_stop-exp_start)])
+
+    # If the experiment data is not stored the chunk is returned to the caller
+    # to update the streaming statistics and then discarded
+    if _worker.meas_array is None:
+        return chunk_meas
+
+    _worker.meas_array[sim_ind,exp_start:exp_stop,:,:,:] = chunk_meas
+    return None
+
+
+def _run_chunks(pool: ThreadPoolExecutor | ProcessPoolExecutor | None,
+                chunks: list[tuple],
+                n_workers: int,
+                meas_array: np.ndarray | None,
+                stream_stats: list[StreamStats] | None) -> None:
+    if pool is None:
+        chunk_results = (_run_exp_chunk(*cc) for cc in chunks)
+    else:
+        chunk_results = _iter_pool_results(pool,chunks,2*n_workers)
+
+    # Statistics are updated in chunk order so they do not depend on which
+    # worker finishes first
+    for (sim_ind,exp_start,exp_stop,_),chunk_meas in zip(chunks,chunk_results):
+        if stream_stats is None:
+            continue
+
+        if chunk_meas is None:
+            chunk_meas = meas_array[sim_ind,exp_start:exp_stop]
+
+        stream_stats[sim_ind].update(chunk_meas)
+
+
+def _iter_pool_results(pool: ThreadPoolExecutor | ProcessPoolExecutor,
+                       chunks: list[tuple],
+                       max_in_flight: int):
+    # Limits the number of submitted chunks so unstored results do not pile up
+    # in memory faster than the statistics consume them
+    chunk_iter = iter(chunks)
+    futures = deque()
+    for cc in chunk_iter:
+        futures.append(pool.submit(_run_exp_chunk,*cc))
+        if len(futures) >= max_in_flight:
+            break
+
+    while futures:
+        # Re-raises any exception from the worker
+        yield futures.popleft().result()
+
+        next_chunk = next(chunk_iter,None)
+        if next_chunk is not None:
+            futures.append(pool.submit(_run_exp_chunk,*next_chunk))
+
+
+def _run_chunks_process(sensor_array: ISensorArray,
+                        sim_list: list[mh.SimData],
+                        meas_shape: tuple[int,...],
+                        chunks: list[tuple],
+                        n_workers: int,
+                        store_exp_data: bool,
+                        stream_stats: list[StreamStats] | None
+                        ) -> np.ndarray | None:
+    if not store_exp_data:
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 initializer=_init_worker,
+                                 initargs=(sensor_array,sim_list,None,
+                                           False)) as pool:
+            _run_chunks(pool,chunks,n_workers,None,stream_stats)
+        return None
+
+    meas_dtype = sensor_array.get_dtype()
+    n_bytes = max(int(np.prod(meas_shape))*meas_dtype.itemsize,1)
+    shm = shared_memory.SharedMemory(create=True,size=n_bytes)
+    try:
+        shm_array = np.ndarray(meas_shape,dtype=meas_dtype,buffer=shm.buf)
+        shm_array[...] = 0.0
+
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 initializer=_init_worker_shm,
+                                 initargs=(sensor_array,sim_list,shm.name,
+                                           meas_shape,meas_dtype)) as pool:
+            _run_chunks(pool,chunks,n_workers,shm_array,stream_stats)
 
+        meas_array = np.array(shm_array)
+        # Release the view so the shared memory block can be closed
+        del shm_array
+    finally:
+        shm.close()
+        shm.unlink()
 
+    return meas_array
 
@@ -106,7 +106,7 @@ class IField(ABC):
     def sample_field(self,
                     points: np.ndarray,
                     times: np.ndarray | None = None,
-                    angles: tuple[Rotation,...] | None = None,
+                    angles: tuple[Rotation,...] | Rotation | None = None,
                     ) -> np.ndarray:
         """Samples (interpolates) the simulation field at the specified
         positions, times, and angles.
@@ -120,11 +120,12 @@ class IField(ABC):
             Times to sample the underlying simulation. If None then the
             simulation time steps are used and no temporal interpolation is
             performed, by default None.
-        angles : tuple[Rotation,...] | None, optional
+        angles : tuple[Rotation,...] | Rotation | None, optional
             Angles to rotate the sampled values into with rotations specified
-            with respect to the simulation world coordinates. If a single
-            rotation is specified then all points are assumed to have the same
-            angle and are batch processed for speed. If None then no rotation is
+            with respect to the simulation world coordinates. Can be a tuple
+            of rotations or a stacked scipy Rotation. If a single rotation is
+            specified then all points are assumed to have the same angle and
+            are batch processed for speed. If None then no rotation is
             performed, by default None.
 
         Returns
@@ -134,3 +135,38 @@ class IField(ABC):
             dimensions: shape=(num_points,num_components,num_time_steps).
         """
         pass
+
+    @abstractmethod
+    def sample_field_with_mask(self,
+                               points: np.ndarray,
+                               times: np.ndarray | None = None,
+                               angles: tuple[Rotation,...] | Rotation | None \
+                                   = None,
+                               ) -> tuple[np.ndarray,np.ndarray]:
+        """Abstract method. Samples (interpolates) the simulation field at the
+        specified positions, times, and angles and returns the mask of the
+        points inside the mesh. The mask must come from the same point location
+        as the sampled values.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Spatial points to be sampled with the rows indicating the point
+            number of the columns indicating the X,Y and Z coordinates.
+        times : np.ndarray | None, optional
+            Times to sample the underlying simulation. If None then the
+            simulation time steps are used and no temporal interpolation is
+            performed, by default None.
+        angles : tuple[Rotation,...] | Rotation | None, optional
+            Angles to rotate the sampled values into with rotations specified
+            with respect to the simulation world coordinates. If None then no
+            rotation is performed, by default None.
+
+        Returns
+        -------
+        tuple[np.ndarray,np.ndarray]
+            An array of sampled (interpolated) values with the following
+            dimensions: shape=(num_points,num_components,num_time_steps). Mask
+            that is True for points inside the mesh with shape=(num_points,).
+        """
+        pass
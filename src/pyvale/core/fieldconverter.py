@@ -36,27 +36,11 @@ def conv_simdata_to_pyvista(sim_data: mh.SimData,
         The first UnstructuredGrid has the field components attached as dataset
         arrays. The second has no field data attached for visualisation.
     """
-    flat_connect = np.array([],dtype=np.int64)
-    cell_types = np.array([],dtype=np.int64)
+    (offsets,connect,cell_types) = conv_simdata_to_cells(sim_data,spat_dim)
+    pv_grid = build_pyvista_grid(sim_data.coords,offsets,connect,cell_types)
 
-    for cc in sim_data.connect:
-        # NOTE: need the -1 here to make element numbers 0 indexed!
-        temp_connect = sim_data.connect[cc]-1
-        (nodes_per_elem,n_elems) = temp_connect.shape
-
-        temp_connect = temp_connect.T.flatten()
-        idxs = np.arange(0,n_elems*nodes_per_elem,nodes_per_elem,dtype=np.int64)
-        temp_connect = np.insert(temp_connect,idxs,nodes_per_elem)
-
-        this_cell_type = _get_pyvista_cell_type(nodes_per_elem,spat_dim)
-        cell_types = np.hstack((cell_types,np.full(n_elems,this_cell_type)))
-        flat_connect = np.hstack((flat_connect,temp_connect),dtype=np.int64)
-
-    cells = flat_connect
-
-    points = sim_data.coords
-    pv_grid = pv.UnstructuredGrid(cells, cell_types, points)
-    pv_grid_vis = pv.UnstructuredGrid(cells, cell_types, points)
+    # Visualisation grid shares the points and cells without the field data
+    pv_grid_vis = pv_grid.copy(deep=False)
 
     if components is not None and sim_data.node_vars is not None:
         for cc in components:
@@ -65,6 +49,90 @@ def conv_simdata_to_pyvista(sim_data: mh.SimData,
     return (pv_grid,pv_grid_vis)
 
 
+def conv_simdata_to_cells(sim_data: mh.SimData,
+                          spat_dim: int
+                          ) -> tuple[np.ndarray,np.ndarray,np.ndarray]:
+    """Converts the connectivity of all element blocks in a `SimData` object
+    into the flat cell arrays used by VTK.
+
+    Parameters
+    ----------
+    sim_data : mh.SimData
+        Object containing a mesh from a simulation.
+    spat_dim : int
+        Number of spatial dimensions (2 or 3) used to determine the element
+        types in the mesh from the number of nodes per element.
+
+    Returns
+    -------
+    tuple[np.ndarray,np.ndarray,np.ndarray]
+        The cell offsets into the connectivity with shape=(num_cells+1,), the
+        flat 0 indexed connectivity and the VTK cell type of each cell with
+        shape=(num_cells,).
+    """
+    blocks = [sim_data.connect[cc] for cc in sim_data.connect]
+    n_cells = sum(bb.shape[1] for bb in blocks)
+    n_connect = sum(bb.size for bb in blocks)
+
+    # NOTE: VTK stores the cells as a flat connectivity array and the offset of
+    # the first node of each cell (with the total length appended) so these are
+    # allocated once for all element blocks and filled block by block
+    connect = np.empty((n_connect,),dtype=np.int64)
+    offsets = np.empty((n_cells+1,),dtype=np.int64)
+    cell_types = np.empty((n_cells,),dtype=np.uint8)
+    offsets[0] = 0
+
+    cell_start = 0
+    connect_start = 0
+    for bb in blocks:
+        (nodes_per_elem,n_elems) = bb.shape
+        cell_end = cell_start + n_elems
+        connect_end = connect_start + nodes_per_elem*n_elems
+
+        # NOTE: need the -1 here to make element numbers 0 indexed!
+        np.subtract(bb.T,1,out=connect[connect_start:connect_end].reshape(
+            (n_elems,nodes_per_elem)))
+        offsets[cell_start+1:cell_end+1] = np.arange(
+            connect_start+nodes_per_elem,connect_end+1,nodes_per_elem)
+        cell_types[cell_start:cell_end] = _get_pyvista_cell_type(nodes_per_elem,
+                                                                 spat_dim)
+        cell_start = cell_end
+        connect_start = connect_end
+
+    return (offsets,connect,cell_types)
+
+
+def build_pyvista_grid(points: np.ndarray,
+                       offsets: np.ndarray,
+                       connect: np.ndarray,
+                       cell_types: np.ndarray) -> pv.UnstructuredGrid:
+    """Builds a pyvista UnstructuredGrid directly from the VTK cell arrays
+    without creating the padded legacy cell array.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Nodal coordinates. shape=(num_nodes,3)
+    offsets : np.ndarray
+        Offset of the first node of each cell in the connectivity with the
+        total length appended. shape=(num_cells+1,)
+    connect : np.ndarray
+        Flat 0 indexed connectivity of all cells.
+    cell_types : np.ndarray
+        VTK cell type of each cell. shape=(num_cells,)
+
+    Returns
+    -------
+    pv.UnstructuredGrid
+        Pyvista grid containing the mesh without any field data.
+    """
+    pv_grid = pv.UnstructuredGrid()
+    pv_grid.points = points
+    pv_grid.SetCells(pv.convert_array(np.asarray(cell_types,dtype=np.uint8)),
+                     pv.CellArray.from_arrays(offsets,connect))
+    return pv_grid
+
+
 def _get_pyvista_cell_type(nodes_per_elem: int, spat_dim: int) -> CellType:
     """Helper function to identify the pyvista element type in the mesh.
 
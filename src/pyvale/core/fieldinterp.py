@@ -0,0 +1,664 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import enum
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from scipy.spatial import cKDTree
+from pyvista import CellType
+
+
+class EOutsidePolicy(enum.Enum):
+    """Enumeration specifying the value sampled at points outside the mesh. The
+    points outside the mesh are found in the same pass that locates the points
+    in the mesh so the policy does not need a second search of all points.
+
+    ZERO
+        Points outside the mesh sample a value of 0.
+
+    NAN
+        Points outside the mesh sample NaN so they propagate through the error
+        chain and can be detected in the measurements.
+
+    NEAREST
+        The shape functions of the nearest cell are extrapolated to the point.
+
+    CLAMP
+        The point is clamped onto the boundary of the nearest cell so it
+        samples the value at the closest point in the mesh.
+    """
+    ZERO = enum.auto()
+    NAN = enum.auto()
+    NEAREST = enum.auto()
+    CLAMP = enum.auto()
+
+
+class EInterpBackend(enum.Enum):
+    """Enumeration specifying how sample points are located in the simulation
+    mesh to build the element shape function weights used for interpolation.
+
+    VTK
+        Points are located with a VTK cell locator. Point sets that are only
+        sampled once are probed directly with VTK.
+
+    NUMPY
+        Points are located with a KD-tree of the cell centres and the
+        parametric coordinates are found with vectorised Newton iterations
+        using the shape functions in `fieldinterp`. Every point set is sampled
+        through a sample plan with an explicit outside mesh mask.
+    """
+    VTK = enum.auto()
+    NUMPY = enum.auto()
+
+
+@dataclass(slots=True)
+class InterpOpts:
+    """Field interpolation options dataclass. Allows the user to select the
+    backend used to locate sample points in the mesh and control the chunking,
+    threading and tolerances of the NumPy backend.
+    """
+
+    backend: EInterpBackend = EInterpBackend.VTK
+    """Backend used to locate the sample points in the mesh, see
+    `EInterpBackend`.
+    """
+
+    outside_policy: EOutsidePolicy = EOutsidePolicy.ZERO
+    """Value sampled at points outside the mesh, see `EOutsidePolicy`. The
+    nearest and clamp policies use the NumPy cell locator for the points
+    outside the mesh with either backend.
+    """
+
+    workers: int = 1
+    """Number of threads used to process chunks of sample points with the
+    NumPy backend.
+    """
+
+    chunk_pairs: int = 65536
+    """Maximum number of candidate (point, cell) pairs located together with
+    the NumPy backend. Points are grouped into chunks by their number of
+    candidate cells which bounds the memory used for the Newton iterations of
+    each chunk. A point with more candidates than this is located on its own.
+    """
+
+    newton_max_iter: int = 20
+    """Maximum number of Newton iterations used to find the parametric
+    coordinates of a point in a cell.
+    """
+
+    newton_tol: float = 1e-10
+    """Newton iterations stop when the largest update to the parametric
+    coordinates is below this tolerance.
+    """
+
+    pcoord_tol: float = 1e-8
+    """Tolerance on the parametric coordinates when checking if a point is
+    inside a cell, allows points on shared faces and edges to be found.
+    """
+
+    dist_tol: float = 1e-8
+    """Tolerance on the distance between the point and the mapped parametric
+    coordinates relative to the diagonal of the mesh bounding box. Rejects
+    points off the plane of 2D cells and non-converged iterations.
+    """
+
+
+@dataclass(slots=True)
+class _ElemShapes:
+    """Helper dataclass holding the polynomial shape functions of one element
+    type in the VTK node ordering and parametric coordinates.
+    """
+    pcoord_dim: int
+    simplex: bool
+    # Monomial exponents, shape=(n_monos,pcoord_dim)
+    exps: np.ndarray
+    # Shape function coefficients of each monomial, shape=(n_monos,n_nodes)
+    coeffs: np.ndarray
+    # Starting point for the Newton iterations, shape=(pcoord_dim,)
+    pcoord_start: np.ndarray
+
+    def calc_shape_funcs(self, pcoords: np.ndarray) -> np.ndarray:
+        # shape=(n_pts,n_monos) @ (n_monos,n_nodes)
+        monos = np.prod(pcoords[:,np.newaxis,:]**self.exps,axis=-1)
+        return monos @ self.coeffs
+
+    def calc_shape_derivs(self, pcoords: np.ndarray) -> np.ndarray:
+        # shape=(n_pts,pcoord_dim,n_nodes)
+        derivs = np.empty((pcoords.shape[0],self.pcoord_dim,
+                           self.coeffs.shape[1]))
+        for dd in range(self.pcoord_dim):
+            exps_deriv = self.exps.copy()
+            exps_deriv[:,dd] = np.maximum(exps_deriv[:,dd]-1,0)
+            monos = (self.exps[:,dd]*np.prod(
+                pcoords[:,np.newaxis,:]**exps_deriv,axis=-1))
+            derivs[:,dd,:] = monos @ self.coeffs
+        return derivs
+
+    def clamp(self, pcoords: np.ndarray) -> np.ndarray:
+        pcoords = np.clip(pcoords,0.0,None if self.simplex else 1.0)
+        if self.simplex:
+            # Points beyond the sloped face are scaled back onto it
+            pcoord_sum = np.sum(pcoords,axis=1,keepdims=True)
+            pcoords = np.where(pcoord_sum > 1.0,pcoords/pcoord_sum,pcoords)
+        return pcoords
+
+    def is_inside(self, pcoords: np.ndarray, tol: float) -> np.ndarray:
+        inside = np.all(pcoords >= -tol,axis=1)
+        if self.simplex:
+            return inside & (np.sum(pcoords,axis=1) <= 1.0+tol)
+        return inside & np.all(pcoords <= 1.0+tol,axis=1)
+
+
+def _build_elem_shapes(node_pcoords: list[tuple[float,...]],
+                       exps: list[tuple[int,...]],
+                       simplex: bool,
+                       mono_comb: np.ndarray | None = None) -> _ElemShapes:
+    """Helper function for building the shape functions of an element from
+    the parametric coordinates of its nodes and the polynomial basis spanning
+    the element. The shape functions are found by inverting the Vandermonde
+    matrix of the basis at the nodes so they match VTK for the same nodes.
+    """
+    node_pcoords = np.array(node_pcoords,dtype=np.float64)
+    exps = np.array(exps,dtype=np.int64)
+    # Basis polynomials as combinations of the monomials, only needed for the
+    # biquadratic triangle where the bubble is not a single monomial
+    if mono_comb is None:
+        mono_comb = np.eye(exps.shape[0])
+
+    monos = np.prod(node_pcoords[:,np.newaxis,:]**exps,axis=-1)
+    vander = monos @ mono_comb
+    coeffs = mono_comb @ np.linalg.inv(vander)
+
+    if simplex:
+        pcoord_start = np.full(node_pcoords.shape[1],
+                               1.0/(node_pcoords.shape[1]+1))
+    else:
+        pcoord_start = np.full(node_pcoords.shape[1],0.5)
+
+    return _ElemShapes(node_pcoords.shape[1],simplex,exps,coeffs,pcoord_start)
+
+
+def _tensor_exps(dim: int, order: int) -> list[tuple[int,...]]:
+    grids = np.meshgrid(*[np.arange(order+1)]*dim,indexing="ij")
+    return [tuple(ee) for ee in np.column_stack([gg.ravel() for gg in grids])]
+
+
+def _simplex_exps(dim: int, order: int) -> list[tuple[int,...]]:
+    return [ee for ee in _tensor_exps(dim,order) if sum(ee) <= order]
+
+
+def _serendipity_exps(dim: int) -> list[tuple[int,...]]:
+    # Quadratic serendipity: tensor quadratic monomials with at most one
+    # variable squared
+    return [ee for ee in _tensor_exps(dim,2)
+            if sum(1 for pp in ee if pp == 2) <= 1]
+
+
+_TRI_NODES = [(0.0,0.0),(1.0,0.0),(0.0,1.0),(0.5,0.0),(0.5,0.5),(0.0,0.5),
+              (1.0/3.0,1.0/3.0)]
+_QUAD_NODES = [(0.0,0.0),(1.0,0.0),(1.0,1.0),(0.0,1.0),
+               (0.5,0.0),(1.0,0.5),(0.5,1.0),(0.0,0.5),(0.5,0.5)]
+_TET_NODES = [(0.0,0.0,0.0),(1.0,0.0,0.0),(0.0,1.0,0.0),(0.0,0.0,1.0),
+              (0.5,0.0,0.0),(0.5,0.5,0.0),(0.0,0.5,0.0),
+              (0.0,0.0,0.5),(0.5,0.0,0.5),(0.0,0.5,0.5)]
+_HEX_NODES = [(0.0,0.0,0.0),(1.0,0.0,0.0),(1.0,1.0,0.0),(0.0,1.0,0.0),
+              (0.0,0.0,1.0),(1.0,0.0,1.0),(1.0,1.0,1.0),(0.0,1.0,1.0),
+              (0.5,0.0,0.0),(1.0,0.5,0.0),(0.5,1.0,0.0),(0.0,0.5,0.0),
+              (0.5,0.0,1.0),(1.0,0.5,1.0),(0.5,1.0,1.0),(0.0,0.5,1.0),
+              (0.0,0.0,0.5),(1.0,0.0,0.5),(1.0,1.0,0.5),(0.0,1.0,0.5),
+              (0.0,0.5,0.5),(1.0,0.5,0.5),(0.5,0.0,0.5),(0.5,1.0,0.5),
+              (0.5,0.5,0.0),(0.5,0.5,1.0),(0.5,0.5,0.5)]
+
+# Biquadratic triangle: quadratic basis plus the cubic bubble r*s*(1-r-s)
+# which is spanned by the quadratic monomials and r^2*s + r*s^2
+_TRI7_EXPS = _simplex_exps(2,2) + [(2,1),(1,2)]
+_TRI7_COMB = np.zeros((8,7))
+_TRI7_COMB[:6,:6] = np.eye(6)
+_TRI7_COMB[6:,6] = 1.0
+
+_ELEM_SHAPES = {
+    CellType.TRIANGLE: _build_elem_shapes(_TRI_NODES[:3],
+                                          _simplex_exps(2,1),True),
+    CellType.QUADRATIC_TRIANGLE: _build_elem_shapes(_TRI_NODES[:6],
+                                                    _simplex_exps(2,2),True),
+    CellType.BIQUADRATIC_TRIANGLE: _build_elem_shapes(_TRI_NODES,
+                                                      _TRI7_EXPS,True,
+                                                      _TRI7_COMB),
+    CellType.QUAD: _build_elem_shapes(_QUAD_NODES[:4],
+                                      _tensor_exps(2,1),False),
+    CellType.QUADRATIC_QUAD: _build_elem_shapes(_QUAD_NODES[:8],
+                                                _serendipity_exps(2),False),
+    CellType.BIQUADRATIC_QUAD: _build_elem_shapes(_QUAD_NODES,
+                                                  _tensor_exps(2,2),False),
+    CellType.TETRA: _build_elem_shapes(_TET_NODES[:4],
+                                       _simplex_exps(3,1),True),
+    CellType.QUADRATIC_TETRA: _build_elem_shapes(_TET_NODES,
+                                                 _simplex_exps(3,2),True),
+    CellType.HEXAHEDRON: _build_elem_shapes(_HEX_NODES[:8],
+                                            _tensor_exps(3,1),False),
+    CellType.QUADRATIC_HEXAHEDRON: _build_elem_shapes(_HEX_NODES[:20],
+                                                      _serendipity_exps(3),
+                                                      False),
+    CellType.TRIQUADRATIC_HEXAHEDRON: _build_elem_shapes(_HEX_NODES,
+                                                         _tensor_exps(3,2),
+                                                         False),
+}
+
+
+@dataclass(slots=True)
+class _CellSizeClass:
+    """Helper dataclass holding a KD-tree of the centres of the cells in the
+    mesh with similar sizes and the search radius that bounds all of them.
+    """
+    tree: cKDTree
+    # Index of each cell in the tree in the mesh, shape=(n_cells_in_class,)
+    cells: np.ndarray
+    radius: float
+
+
+class NumpyCellLocator:
+    """Locates sample points in a finite element mesh using NumPy. Cells are
+    grouped by their radius in factors of two and each group has a KD-tree of
+    its cell centres searched within the largest radius of the group. Candidate
+    cells from the searches are filtered by their bounding boxes. The number of
+    candidates per point is then bounded for graded meshes where small and
+    large cells are mixed. The parametric coordinates of each point in its
+    candidate cells are found with vectorised Newton iterations on the element
+    shape functions.
+
+    Supports the element types produced by `conv_simdata_to_pyvista`: 3, 6 and
+    7 node triangles, 4, 8 and 9 node quads, 4 and 10 node tets and 8, 20 and
+    27 node hexes. 2D elements can be embedded in 3D, points off the plane of
+    the element are outside.
+    """
+    __slots__ = ("_coords","_offsets","_connect","_cell_types","_centres",
+                 "_size_classes","_bbox_min","_bbox_max","_mesh_length",
+                 "_max_nodes_per_cell")
+
+    def __init__(self,
+                 coords: np.ndarray,
+                 offsets: np.ndarray,
+                 connect: np.ndarray,
+                 cell_types: np.ndarray) -> None:
+        """Initialiser for the `NumpyCellLocator` class.
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            Nodal coordinates of the mesh. shape=(num_nodes,3)
+        offsets : np.ndarray
+            Offset of the first node of each cell in the connectivity array
+            with the total length appended. shape=(num_cells+1,)
+        connect : np.ndarray
+            Flat connectivity array holding the nodes of each cell in the VTK
+            node ordering.
+        cell_types : np.ndarray
+            VTK cell type of each cell. shape=(num_cells,)
+        """
+        self._coords = np.asarray(coords,dtype=np.float64)
+        self._offsets = np.asarray(offsets,dtype=np.int64)
+        self._connect = np.asarray(connect,dtype=np.int64)
+        self._cell_types = np.asarray(cell_types)
+
+        for cc in np.unique(self._cell_types):
+            if CellType(cc) not in _ELEM_SHAPES:
+                raise ValueError(f"Cell type {CellType(cc).name} is not "
+                                 + "supported by the NumPy interpolator.")
+
+        nodes_per_cell = np.diff(self._offsets)
+        self._max_nodes_per_cell = int(np.max(nodes_per_cell))
+        # shape=(num_connect,3)
+        cell_coords = self._coords[self._connect]
+        starts = self._offsets[:-1]
+
+        self._centres = (np.add.reduceat(cell_coords,starts,axis=0)
+                         / nodes_per_cell[:,np.newaxis])
+        node_dists = np.linalg.norm(
+            cell_coords - np.repeat(self._centres,nodes_per_cell,axis=0),
+            axis=1)
+        # Any point in a cell is within the cell radius of its centre
+        # NOTE: the radius is padded for curved edges of quadratic elements
+        radii = 1.1*np.maximum.reduceat(node_dists,starts)
+
+        size_inds = np.floor(np.log2(radii/np.min(radii))).astype(np.int64)
+        self._size_classes = []
+        for ss in np.unique(size_inds):
+            cells = np.nonzero(size_inds == ss)[0]
+            self._size_classes.append(_CellSizeClass(
+                cKDTree(self._centres[cells]),cells,np.max(radii[cells])))
+
+        bbox_pad = 0.05*radii[:,np.newaxis]
+        self._bbox_min = np.minimum.reduceat(cell_coords,starts,axis=0)-bbox_pad
+        self._bbox_max = np.maximum.reduceat(cell_coords,starts,axis=0)+bbox_pad
+        self._mesh_length = np.linalg.norm(np.max(self._coords,axis=0)
+                                           - np.min(self._coords,axis=0))
+
+    def find_cells(self,
+                   points: np.ndarray,
+                   interp_opts: InterpOpts | None = None,
+                   ) -> tuple[np.ndarray,np.ndarray]:
+        """Finds the cell containing each point and the shape function weights
+        of the cell nodes at the point. Points are processed in chunks with a
+        bounded number of candidate cells which are shared between threads if
+        more than one worker is specified.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Coordinates of the points to locate. shape=(num_points,3)
+        interp_opts : InterpOpts | None, optional
+            Options controlling the chunking, threading and tolerances. If None
+            then the default options are used, by default None.
+
+        Returns
+        -------
+        tuple[np.ndarray,np.ndarray]
+            Index of the cell containing each point with -1 for points outside
+            the mesh, shape=(num_points,). Shape function weights of the nodes
+            of the containing cell in connectivity order, zero outside the
+            mesh, shape=(num_points,max_nodes_per_cell).
+        """
+        if interp_opts is None:
+            interp_opts = InterpOpts()
+
+        points = np.asarray(points,dtype=np.float64)
+        n_points = points.shape[0]
+        chunks = _chunk_by_pairs(self._count_candidates(points),
+                                 max(interp_opts.chunk_pairs,1))
+
+        cell_ids = np.full((n_points,),-1,dtype=np.int64)
+        cell_weights = np.zeros((n_points,self._max_nodes_per_cell))
+
+        def find_chunk(chunk: slice) -> None:
+            (cell_ids[chunk],cell_weights[chunk]) = self._find_chunk(
+                points[chunk],interp_opts)
+
+        if interp_opts.workers <= 1 or len(chunks) <= 1:
+            for cc in chunks:
+                find_chunk(cc)
+        else:
+            with ThreadPoolExecutor(max_workers=interp_opts.workers) as pool:
+                # Chunks write to disjoint slices so no locking is needed
+                list(pool.map(find_chunk,chunks))
+
+        return (cell_ids,cell_weights)
+
+    def _find_chunk(self,
+                    points: np.ndarray,
+                    interp_opts: InterpOpts,
+                    ) -> tuple[np.ndarray,np.ndarray]:
+        n_points = points.shape[0]
+        cell_ids = np.full((n_points,),-1,dtype=np.int64)
+        cell_weights = np.zeros((n_points,self._max_nodes_per_cell))
+
+        (pair_points,pair_cells) = self._find_candidates(points)
+        if pair_points.shape[0] == 0:
+            return (cell_ids,cell_weights)
+
+        # Candidates for each point are tried closest first so ties on shared
+        # faces are broken consistently
+        centre_dists = np.linalg.norm(points[pair_points]
+                                      - self._centres[pair_cells],axis=1)
+        order = np.lexsort((centre_dists,pair_points))
+        pair_points = pair_points[order]
+        pair_cells = pair_cells[order]
+
+        pair_found = np.zeros(pair_points.shape,dtype=bool)
+        pair_weights = np.zeros((pair_points.shape[0],
+                                 self._max_nodes_per_cell))
+
+        pair_types = self._cell_types[pair_cells]
+        for tt in np.unique(pair_types):
+            is_type = pair_types == tt
+            elem_shapes = _ELEM_SHAPES[CellType(tt)]
+            type_points = points[pair_points[is_type]]
+            (pcoords,node_coords) = self._invert_cells(elem_shapes,
+                                                       type_points,
+                                                       pair_cells[is_type],
+                                                       interp_opts,
+                                                       stop_outside=True)
+            weights = elem_shapes.calc_shape_funcs(pcoords)
+
+            # Checking the mapped point rejects non-converged iterations and
+            # points off the plane of 2D elements
+            close = (_calc_map_dist(type_points,weights,node_coords)
+                     <= interp_opts.dist_tol*self._mesh_length)
+            pair_found[is_type] = (close & elem_shapes.is_inside(
+                pcoords,interp_opts.pcoord_tol))
+            pair_weights[np.ix_(is_type,np.arange(weights.shape[1]))] = weights
+
+        found_pairs = np.nonzero(pair_found)[0]
+        (found_points,first) = np.unique(pair_points[found_pairs],
+                                         return_index=True)
+        cell_ids[found_points] = pair_cells[found_pairs[first]]
+        cell_weights[found_points] = pair_weights[found_pairs[first]]
+
+        return (cell_ids,cell_weights)
+
+    def _count_candidates(self, points: np.ndarray) -> np.ndarray:
+        n_near = np.zeros((points.shape[0],),dtype=np.int64)
+        for sc in self._size_classes:
+            n_near += sc.tree.query_ball_point(points,sc.radius,
+                                               return_length=True)
+        return n_near
+
+    def _find_candidates(self,
+                         points: np.ndarray) -> tuple[np.ndarray,np.ndarray]:
+        pair_points = [np.empty((0,),dtype=np.int64)]
+        pair_cells = [np.empty((0,),dtype=np.int64)]
+
+        for sc in self._size_classes:
+            near_cells = sc.tree.query_ball_point(points,sc.radius)
+            n_near = np.array([len(nn) for nn in near_cells],dtype=np.int64)
+            if np.sum(n_near) == 0:
+                continue
+
+            class_points = np.repeat(np.arange(points.shape[0]),n_near)
+            class_cells = sc.cells[np.concatenate([nn for nn in near_cells
+                                                   if nn]).astype(np.int64)]
+
+            in_bbox = np.all(
+                (points[class_points] >= self._bbox_min[class_cells])
+                & (points[class_points] <= self._bbox_max[class_cells]),
+                axis=1)
+            pair_points.append(class_points[in_bbox])
+            pair_cells.append(class_cells[in_bbox])
+
+        return (np.concatenate(pair_points),np.concatenate(pair_cells))
+
+    def find_nearest_cells(self,
+                           points: np.ndarray,
+                           clamp: bool,
+                           interp_opts: InterpOpts | None = None,
+                           ) -> tuple[np.ndarray,np.ndarray]:
+        """Finds the nearest cell to each point and the shape function weights
+        of the cell nodes extrapolated to the point or clamped to the cell
+        boundary. Used for points outside the mesh so the nearest cell is
+        chosen from the cells with the closest centres.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Coordinates of the points. shape=(num_points,3)
+        clamp : bool
+            If True the parametric coordinates are clamped to the cell so the
+            weights give the value at the closest point in the cell. If False
+            the shape functions are extrapolated to the point.
+        interp_opts : InterpOpts | None, optional
+            Options controlling the Newton iterations. If None then the default
+            options are used, by default None.
+
+        Returns
+        -------
+        tuple[np.ndarray,np.ndarray]
+            Index of the nearest cell to each point, shape=(num_points,). Shape
+            function weights of the nodes of the nearest cell in connectivity
+            order, shape=(num_points,max_nodes_per_cell).
+        """
+        if interp_opts is None:
+            interp_opts = InterpOpts()
+
+        points = np.asarray(points,dtype=np.float64)
+        n_points = points.shape[0]
+        cell_ids = np.full((n_points,),-1,dtype=np.int64)
+        cell_weights = np.zeros((n_points,self._max_nodes_per_cell))
+        if n_points == 0:
+            return (cell_ids,cell_weights)
+
+        # The closest cell centres of each size class are the candidates so a
+        # large cell next to many small cells is not missed
+        pair_points = []
+        pair_cells = []
+        for sc in self._size_classes:
+            n_near = min(8,sc.tree.n)
+            (_,near_cells) = sc.tree.query(points,k=n_near)
+            pair_points.append(np.repeat(np.arange(n_points),n_near))
+            pair_cells.append(sc.cells[near_cells.ravel()])
+
+        pair_points = np.concatenate(pair_points)
+        pair_cells = np.concatenate(pair_cells)
+        pair_dists = np.zeros(pair_points.shape)
+        pair_weights = np.zeros((pair_points.shape[0],
+                                 self._max_nodes_per_cell))
+
+        pair_types = self._cell_types[pair_cells]
+        for tt in np.unique(pair_types):
+            is_type = pair_types == tt
+            elem_shapes = _ELEM_SHAPES[CellType(tt)]
+            type_points = points[pair_points[is_type]]
+            (pcoords,node_coords) = self._invert_cells(elem_shapes,
+                                                       type_points,
+                                                       pair_cells[is_type],
+                                                       interp_opts,
+                                                       stop_outside=False)
+            # Distance to the closest point in the cell picks the nearest cell
+            clamp_weights = elem_shapes.calc_shape_funcs(
+                elem_shapes.clamp(pcoords))
+            pair_dists[is_type] = _calc_map_dist(type_points,
+                                                 clamp_weights,
+                                                 node_coords)
+            if clamp:
+                weights = clamp_weights
+            else:
+                weights = elem_shapes.calc_shape_funcs(pcoords)
+            pair_weights[np.ix_(is_type,np.arange(weights.shape[1]))] = weights
+
+        order = np.lexsort((pair_dists,pair_points))
+        nearest = order[np.unique(pair_points[order],return_index=True)[1]]
+        cell_ids[:] = pair_cells[nearest]
+        cell_weights[:] = pair_weights[nearest]
+
+        return (cell_ids,cell_weights)
+
+    def _invert_cells(self,
+                      elem_shapes: _ElemShapes,
+                      points: np.ndarray,
+                      cells: np.ndarray,
+                      interp_opts: InterpOpts,
+                      stop_outside: bool,
+                      ) -> tuple[np.ndarray,np.ndarray]:
+        n_nodes = elem_shapes.coeffs.shape[1]
+        # shape=(n_pairs,n_nodes,3)
+        node_coords = self._coords[
+            self._connect[self._offsets[cells][:,np.newaxis]
+                          + np.arange(n_nodes)]]
+
+        pcoords = np.tile(elem_shapes.pcoord_start,(points.shape[0],1))
+        # Only pairs that have not converged or left the cell are iterated
+        active = np.arange(points.shape[0])
+        eye = np.eye(elem_shapes.pcoord_dim)
+
+        for _ in range(interp_opts.newton_max_iter):
+            pc = pcoords[active]
+            nc = node_coords[active]
+            # shape=(n_active,3,pcoord_dim)
+            jac = np.einsum("pdn,pnk->pkd",
+                            elem_shapes.calc_shape_derivs(pc),nc)
+            resid = points[active] - np.einsum(
+                "pn,pnk->pk",elem_shapes.calc_shape_funcs(pc),nc)
+
+            # Gauss-Newton so 2D elements embedded in 3D use the same update
+            jac_t = np.swapaxes(jac,1,2)
+            lhs = jac_t @ jac
+            rhs = np.einsum("pdk,pk->pd",jac_t,resid)
+
+            singular = np.abs(np.linalg.det(lhs)) <= 1e-300
+            lhs[singular] = eye
+            rhs[singular] = 0.0
+            update = np.linalg.solve(lhs,rhs[...,np.newaxis])[...,0]
+            pcoords[active] = pc + update
+
+            done = singular | (np.max(np.abs(update),axis=1)
+                               <= interp_opts.newton_tol)
+            if stop_outside:
+                # Points far outside the parametric cell cannot be inside it
+                done = done | np.any((pcoords[active] < -0.5)
+                                     | (pcoords[active] > 1.5),axis=1)
+            active = active[~done]
+            if active.shape[0] == 0:
+                break
+
+        return (pcoords,node_coords)
+
+
+def _chunk_by_pairs(n_pairs: np.ndarray, chunk_pairs: int) -> list[slice]:
+    """Helper function for splitting the points into contiguous chunks with at
+    most `chunk_pairs` candidate (point, cell) pairs in each chunk. A point
+    with more candidates than this is placed in a chunk on its own.
+    """
+    pairs_cum = np.concatenate(((0,),np.cumsum(n_pairs)))
+    n_points = n_pairs.shape[0]
+
+    chunks = []
+    start = 0
+    while start < n_points:
+        stop = np.searchsorted(pairs_cum,pairs_cum[start]+chunk_pairs,
+                               side="right") - 1
+        stop = min(max(stop,start+1),n_points)
+        chunks.append(slice(start,stop))
+        start = stop
+
+    return chunks
+
+
+def _calc_map_dist(points: np.ndarray,
+                   weights: np.ndarray,
+                   node_coords: np.ndarray) -> np.ndarray:
+    """Helper function for calculating the distance between each point and
+    the position given by the shape function weights of its cell nodes.
+    """
+    return np.linalg.norm(points - np.einsum("pn,pnk->pk",weights,node_coords),
+                          axis=1)
+
+
+# NOTE: the VTK backend is the default so results match previous versions
+_interp_opts = InterpOpts()
+
+
+def set_interp_opts(interp_opts: InterpOpts) -> None:
+    """Sets the interpolation options used by all fields when building sample
+    plans, see `InterpOpts`.
+
+    Parameters
+    ----------
+    interp_opts : InterpOpts
+        The interpolation options to use.
+    """
+    global _interp_opts
+    _interp_opts = interp_opts
+
+
+def get_interp_opts() -> InterpOpts:
+    """Gets the interpolation options used by all fields.
+
+    Returns
+    -------
+    InterpOpts
+        The interpolation options.
+    """
+    return _interp_opts
@@ -0,0 +1,846 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import copy
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+from scipy import sparse
+import pyvista as pv
+from vtkmodules.vtkCommonCore import reference
+from vtkmodules.vtkCommonDataModel import (vtkGenericCell,
+                                            vtkStaticCellLocator)
+from pyvale.core.diskcache import get_disk_cache
+from pyvale.core.hashtools import hash_array, hash_arrays
+from pyvale.core.fieldinterp import (EInterpBackend,
+                                     EOutsidePolicy,
+                                     InterpOpts,
+                                     NumpyCellLocator,
+                                     get_interp_opts)
+
+
+@dataclass(slots=True)
+class SamplePlan:
+    """Dataclass holding the result of locating a set of sample points within a
+    mesh. Stores the containing cell and the element shape function weights
+    for each point so that any nodal field on the same mesh can be interpolated
+    at the points with a single sparse matrix product.
+    """
+
+    cell_ids: np.ndarray
+    """Index of the cell containing each sample point. Points outside the mesh
+    have a cell index of -1. shape=(num_points,)
+    """
+
+    weights: sparse.csr_array
+    """Sparse interpolation matrix mapping nodal values to the sample points
+    where each row holds the shape function weights of the containing cell.
+    Rows for points outside the mesh are empty so they sample a value of 0,
+    unless the plan was built with the nearest or clamp outside policies where
+    they hold the weights of the nearest cell, see `EOutsidePolicy`.
+    shape=(num_points,num_nodes)
+    """
+
+    def get_outside_mask(self) -> np.ndarray:
+        """Gets a mask of the sample points that are outside the mesh.
+
+        Returns
+        -------
+        np.ndarray
+            True for points that were not found in any cell of the mesh.
+            shape=(num_points,)
+        """
+        return self.cell_ids < 0
+
+
+def hash_pyvista_grid(pyvista_grid: pv.UnstructuredGrid) -> str:
+    """Creates a hash key for the mesh in a pyvista grid based on the nodal
+    coordinates, connectivity and cell types. Field data attached to the grid
+    does not change the key so different simulations on the same mesh share the
+    same key.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+
+    Returns
+    -------
+    str
+        Hexadecimal hash string identifying the mesh.
+    """
+    return hash_arrays((pyvista_grid.points,
+                        pyvista_grid.cell_connectivity,
+                        _get_cell_offsets(pyvista_grid),
+                        pyvista_grid.celltypes))
+
+
+def _get_cell_offsets(pyvista_grid: pv.UnstructuredGrid) -> np.ndarray:
+    """Helper function for getting the offsets into the flat connectivity
+    array for each cell in the grid.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+
+    Returns
+    -------
+    np.ndarray
+        Offset of the first node of each cell in the connectivity array with
+        the total length appended. shape=(num_cells+1,)
+    """
+    return pv.convert_array(pyvista_grid.GetCells().GetOffsetsArray())
+
+
+def calc_find_cell_tol(pyvista_grid: pv.UnstructuredGrid) -> float:
+    """Calculates the tolerance used by VTK to decide if a point is inside a
+    cell of the mesh. Sample plans and direct VTK probes use the same
+    tolerance and cell locator so they find the same cells and give identical
+    sampled values.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+
+    Returns
+    -------
+    float
+        Distance tolerance for locating points in cells.
+    """
+    return 1e-12*pyvista_grid.length
+
+
+def build_sample_plan(pyvista_grid: pv.UnstructuredGrid,
+                      points: np.ndarray,
+                      interp_opts: InterpOpts | None = None,
+                      locator: NumpyCellLocator | None = None,
+                      ) -> SamplePlan:
+    """Builds a sample plan by locating each sample point in the mesh with a
+    VTK cell locator and storing the shape function weights of the containing
+    cell.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+    points : np.ndarray
+        Coordinates of the points at which to sample the mesh. shape=(
+        num_points,3)
+    interp_opts : InterpOpts | None, optional
+        Options giving the policy for points outside the mesh. If None then the
+        default options are used, by default None.
+    locator : NumpyCellLocator | None, optional
+        Cell locator for this mesh used to find the nearest cells for points
+        outside the mesh with the nearest and clamp policies. If None then one
+        is created if needed, by default None.
+
+    Returns
+    -------
+    SamplePlan
+        Containing cell index and interpolation weights for each point.
+    """
+    n_points = points.shape[0]
+    max_nodes_per_cell = np.max(np.diff(_get_cell_offsets(pyvista_grid)))
+
+    vtk_locator = vtkStaticCellLocator()
+    vtk_locator.SetDataSet(pyvista_grid)
+    vtk_locator.BuildLocator()
+
+    # NOTE: these are buffers that VTK writes into on every call to FindCell
+    gen_cell = vtkGenericCell()
+    sub_id = reference(0)
+    pcoords = np.zeros((3,))
+    weights_buff = np.zeros((max_nodes_per_cell,))
+
+    tol2 = calc_find_cell_tol(pyvista_grid)**2
+    cell_ids = np.empty((n_points,),dtype=np.int64)
+    # shape=(n_points,max_nodes_per_cell)
+    cell_weights = np.zeros((n_points,max_nodes_per_cell))
+
+    for ii,pp in enumerate(points):
+        cell_ids[ii] = vtk_locator.FindCell(pp,tol2,gen_cell,sub_id,pcoords,
+                                            weights_buff)
+        cell_weights[ii,:] = weights_buff
+
+    return _build_plan_with_policy(pyvista_grid,points,cell_ids,cell_weights,
+                                   interp_opts,locator)
+
+
+def create_numpy_locator(pyvista_grid: pv.UnstructuredGrid
+                         ) -> NumpyCellLocator:
+    """Creates a NumPy cell locator for the mesh in a pyvista grid.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+
+    Returns
+    -------
+    NumpyCellLocator
+        Cell locator that can be reused for any set of points in this mesh.
+    """
+    return NumpyCellLocator(np.asarray(pyvista_grid.points),
+                            _get_cell_offsets(pyvista_grid),
+                            np.asarray(pyvista_grid.cell_connectivity),
+                            np.asarray(pyvista_grid.celltypes))
+
+
+def build_sample_plan_numpy(pyvista_grid: pv.UnstructuredGrid,
+                            points: np.ndarray,
+                            interp_opts: InterpOpts | None = None,
+                            locator: NumpyCellLocator | None = None,
+                            ) -> SamplePlan:
+    """Builds a sample plan by locating each sample point in the mesh with the
+    NumPy interpolator, see `NumpyCellLocator`. Points are located in chunks
+    which can be shared between threads using the interpolation options.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+    points : np.ndarray
+        Coordinates of the points at which to sample the mesh. shape=(
+        num_points,3)
+    interp_opts : InterpOpts | None, optional
+        Options controlling the chunking, threading, tolerances and the policy
+        for points outside the mesh. If None then the default options are used,
+        by default None.
+    locator : NumpyCellLocator | None, optional
+        Cell locator for this mesh to reuse, if None then one is created, by
+        default None.
+
+    Returns
+    -------
+    SamplePlan
+        Containing cell index and interpolation weights for each point.
+    """
+    if locator is None:
+        locator = create_numpy_locator(pyvista_grid)
+
+    (cell_ids,cell_weights) = locator.find_cells(points,interp_opts)
+    return _build_plan_with_policy(pyvista_grid,points,cell_ids,cell_weights,
+                                   interp_opts,locator)
+
+
+def build_outside_plan(pyvista_grid: pv.UnstructuredGrid,
+                       points: np.ndarray,
+                       clamp: bool,
+                       locator: NumpyCellLocator | None = None,
+                       interp_opts: InterpOpts | None = None,
+                       ) -> SamplePlan:
+    """Builds a sample plan for points that are known to be outside the mesh
+    holding the shape function weights of the nearest cell to each point. Used
+    with the valid point mask of a direct VTK probe so only the points outside
+    the mesh are searched again for the nearest and clamp outside policies.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+    points : np.ndarray
+        Coordinates of the points outside the mesh. shape=(num_points,3)
+    clamp : bool
+        If True the weights give the value at the closest point in the nearest
+        cell, otherwise the cell shape functions are extrapolated to the point,
+        see `EOutsidePolicy`.
+    locator : NumpyCellLocator | None, optional
+        Cell locator for this mesh to reuse, if None then one is created, by
+        default None.
+    interp_opts : InterpOpts | None, optional
+        Options controlling the Newton iterations. If None then the default
+        options are used, by default None.
+
+    Returns
+    -------
+    SamplePlan
+        Plan with a cell index of -1 for every point and the interpolation
+        weights of the nearest cell.
+    """
+    if locator is None:
+        locator = create_numpy_locator(pyvista_grid)
+
+    (weight_cell_ids,cell_weights) = locator.find_nearest_cells(points,
+                                                                clamp,
+                                                                interp_opts)
+    cell_ids = np.full((points.shape[0],),-1,dtype=np.int64)
+    return _build_plan_from_weights(pyvista_grid,cell_ids,cell_weights,
+                                    weight_cell_ids)
+
+
+def _build_plan_with_policy(pyvista_grid: pv.UnstructuredGrid,
+                            points: np.ndarray,
+                            cell_ids: np.ndarray,
+                            cell_weights: np.ndarray,
+                            interp_opts: InterpOpts | None,
+                            locator: NumpyCellLocator | None,
+                            ) -> SamplePlan:
+    """Helper function for applying the policy for points outside the mesh and
+    assembling the sample plan. Only the points outside the mesh are searched
+    again so the cost does not grow with the number of points inside the mesh.
+    """
+    if interp_opts is None:
+        interp_opts = InterpOpts()
+
+    outside = cell_ids < 0
+    if not _needs_nearest(interp_opts) or not np.any(outside):
+        return _build_plan_from_weights(pyvista_grid,cell_ids,cell_weights)
+
+    if locator is None:
+        locator = create_numpy_locator(pyvista_grid)
+
+    weight_cell_ids = cell_ids.copy()
+    (weight_cell_ids[outside],cell_weights[outside]) = (
+        locator.find_nearest_cells(
+            points[outside],
+            interp_opts.outside_policy == EOutsidePolicy.CLAMP,
+            interp_opts))
+
+    return _build_plan_from_weights(pyvista_grid,cell_ids,cell_weights,
+                                    weight_cell_ids)
+
+
+def _build_plan_from_weights(pyvista_grid: pv.UnstructuredGrid,
+                             cell_ids: np.ndarray,
+                             cell_weights: np.ndarray,
+                             weight_cell_ids: np.ndarray | None = None,
+                             ) -> SamplePlan:
+    """Helper function for assembling the sparse interpolation matrix of a
+    sample plan from the containing cell and the shape function weights of the
+    cell nodes for each point.
+
+    Parameters
+    ----------
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh.
+    cell_ids : np.ndarray
+        Index of the cell containing each point, -1 outside the mesh.
+        shape=(num_points,)
+    cell_weights : np.ndarray
+        Shape function weights of the nodes of the containing cell in
+        connectivity order. shape=(num_points,max_nodes_per_cell)
+    weight_cell_ids : np.ndarray | None, optional
+        Index of the cell whose nodes the weights of each point belong to when
+        this differs from the containing cell, e.g. the nearest cell for points
+        outside the mesh. If None then the containing cell is used, by default
+        None.
+
+    Returns
+    -------
+    SamplePlan
+        Containing cell index and interpolation weights for each point.
+    """
+    if weight_cell_ids is None:
+        weight_cell_ids = cell_ids
+
+    n_points = cell_ids.shape[0]
+    offsets = _get_cell_offsets(pyvista_grid)
+    connect = np.asarray(pyvista_grid.cell_connectivity)
+
+    found = weight_cell_ids >= 0
+    point_inds = np.nonzero(found)[0]
+    found_cells = weight_cell_ids[found]
+
+    nodes_per_cell = offsets[found_cells+1] - offsets[found_cells]
+    rows = np.repeat(point_inds,nodes_per_cell)
+    # Local node number within the containing cell for each non-zero
+    local_nodes = (np.arange(rows.shape[0])
+                   - np.repeat(np.cumsum(nodes_per_cell)-nodes_per_cell,
+                               nodes_per_cell))
+    cols = connect[np.repeat(offsets[found_cells],nodes_per_cell)+local_nodes]
+    vals = cell_weights[rows,local_nodes]
+
+    # NOTE: the rows are assembled directly rather than from (row,col) pairs,
+    # which would sort the columns, so the nodes of each row stay in cell
+    # connectivity order. The sparse product then sums in the same order as
+    # VTK interpolation giving the same values as a direct VTK probe.
+    nnz_per_point = np.zeros((n_points,),dtype=np.int64)
+    nnz_per_point[point_inds] = nodes_per_cell
+    indptr = np.concatenate(((0,),np.cumsum(nnz_per_point)))
+    weights = sparse.csr_array((vals,cols,indptr),
+                               shape=(n_points,pyvista_grid.n_points))
+
+    return SamplePlan(cell_ids=cell_ids,weights=weights)
+
+
+@dataclass(slots=True)
+class TimePlan:
+    """Dataclass holding the bracketing simulation time steps and linear
+    interpolation weights for a set of sample times. Allows a block of sampled
+    values to be interpolated in time for all sensors and components at once.
+    """
+
+    inds_lower: np.ndarray
+    """Index of the simulation time step at or below each sample time.
+    shape=(num_sample_times,) or shape=(num_real,num_sample_times) for a batch
+    of realisations with different sample times.
+    """
+
+    inds_upper: np.ndarray
+    """Index of the simulation time step above each sample time. Same shape as
+    `inds_lower`.
+    """
+
+    weights_upper: np.ndarray
+    """Linear interpolation weight applied to the upper time step, the lower
+    time step has a weight of one minus this. Same shape as `inds_lower`.
+    """
+
+
+def build_time_plan(sim_time_steps: np.ndarray,
+                    sample_times: np.ndarray) -> TimePlan:
+    """Builds a time plan for linearly interpolating from the simulation time
+    steps to the sample times. Sample times outside the simulation time range
+    are clamped to the first or last time step consistent with `np.interp`.
+
+    Parameters
+    ----------
+    sim_time_steps : np.ndarray
+        Monotonically increasing simulation time steps. shape=(num_sim_steps,)
+    sample_times : np.ndarray
+        Times at which to sample. shape=(num_sample_times,) or shape=(num_real,
+        num_sample_times) for a batch of realisations.
+
+    Returns
+    -------
+    TimePlan
+        Bracketing indices and interpolation weights for each sample time.
+    """
+    n_sim_steps = sim_time_steps.shape[0]
+    if n_sim_steps == 1:
+        zero_inds = np.zeros(sample_times.shape,dtype=np.int64)
+        return TimePlan(inds_lower=zero_inds,
+                        inds_upper=zero_inds,
+                        weights_upper=np.zeros(sample_times.shape))
+
+    inds_lower = np.searchsorted(sim_time_steps,sample_times,side="right") - 1
+    inds_lower = np.clip(inds_lower,0,n_sim_steps-2)
+    inds_upper = inds_lower + 1
+
+    time_lower = sim_time_steps[inds_lower]
+    time_step = sim_time_steps[inds_upper] - time_lower
+    weights_upper = np.divide(sample_times - time_lower,
+                              time_step,
+                              out=np.zeros(sample_times.shape),
+                              where=time_step != 0.0)
+    weights_upper = np.clip(weights_upper,0.0,1.0)
+
+    return TimePlan(inds_lower=inds_lower,
+                    inds_upper=inds_upper,
+                    weights_upper=weights_upper)
+
+
+def interp_with_time_plan(time_plan: TimePlan,
+                          sample_data: np.ndarray) -> np.ndarray:
+    """Linearly interpolates a block of sampled values in time using a
+    precomputed time plan. The interpolation is performed over the last axis
+    for all sensors and components at once. If the time plan has a leading
+    realisation axis then each realisation in the sampled data is interpolated
+    to its own sample times.
+
+    Parameters
+    ----------
+    time_plan : TimePlan
+        Bracketing indices and weights for the sample times.
+    sample_data : np.ndarray
+        Values at the simulation time steps. shape=(num_sensors,
+        num_field_components,num_sim_steps) or shape=(num_real,num_sensors,
+        num_field_components,num_sim_steps) for a batched time plan.
+
+    Returns
+    -------
+    np.ndarray
+        Values at the sample times. shape=(num_sensors,num_field_components,
+        num_sample_times) with a leading realisation axis for a batched time
+        plan.
+    """
+    if time_plan.inds_lower.ndim == 1:
+        return (sample_data[...,time_plan.inds_lower]
+                *(1.0-time_plan.weights_upper)
+                + sample_data[...,time_plan.inds_upper]
+                *time_plan.weights_upper)
+
+    # Broadcast the per realisation plan over the sensor and component axes
+    n_mid_dims = sample_data.ndim - time_plan.inds_lower.ndim
+    plan_shape = (time_plan.inds_lower.shape[:-1] + (1,)*n_mid_dims
+                  + time_plan.inds_lower.shape[-1:])
+    weights_upper = time_plan.weights_upper.reshape(plan_shape)
+
+    return (np.take_along_axis(sample_data,
+                               time_plan.inds_lower.reshape(plan_shape),
+                               axis=-1)*(1.0-weights_upper)
+            + np.take_along_axis(sample_data,
+                                 time_plan.inds_upper.reshape(plan_shape),
+                                 axis=-1)*weights_upper)
+
+
+class SamplePlanCache:
+    """Least recently used (LRU) cache of sample plans keyed by the mesh, the
+    hashed set of sample points and the interpolation options that change the
+    plan: the backend, the policy for points outside the mesh and the
+    tolerances (see `InterpOpts`). Avoids locating the same sample points in
+    the same mesh every time a field is sampled.
+
+    A plan is only built the second time a point set is requested on a given
+    mesh. Point sets that are only sampled once (e.g. randomly perturbed sensor
+    positions) are sampled directly by the caller as building a plan costs more
+    than a single direct sample.
+
+    With the NumPy interpolation backend (see `set_interp_opts`) building a
+    plan costs the same as sampling directly so a plan is returned for every
+    request, it is only stored from the second request. With the VTK backend
+    and the nearest or clamp outside policies the first request is also probed
+    directly and only the points outside the mesh are searched for their
+    nearest cell, see `get_outside_locator`. The NumPy cell locator for each
+    mesh is kept so the cell search tree is only built once.
+
+    If an on disk cache has been set (see `set_disk_cache`) then built plans
+    are also stored on disk keyed by the mesh and point hashes. A plan found on
+    disk is used the first time a point set is requested so later processes
+    skip the point location entirely. Plans on disk are keyed by a format
+    version and checked against the requested points and mesh before use, an
+    invalid plan is ignored and built again.
+
+    The cache can be shared by fields used from several threads. The stored
+    plans are accessed under a lock but plans are loaded, built and saved
+    outside it so threads sampling different point sets run in parallel. A
+    thread requesting a point set that another thread is loading or building
+    waits for that plan instead of building it again. The lock is recreated
+    when the cache is copied or pickled.
+    """
+    __slots__ = ("_max_plans","_plans","_seen","_time_plans","_locators",
+                 "_in_flight","_lock")
+
+    def __init__(self, max_plans: int = 16) -> None:
+        """Initialiser for the `SamplePlanCache` class.
+
+        Parameters
+        ----------
+        max_plans : int, optional
+            Maximum number of sample plans to store before the least recently
+            used plan is discarded, by default 16.
+        """
+        self._max_plans = max_plans
+        self._plans = OrderedDict()
+        self._seen = OrderedDict()
+        self._time_plans = OrderedDict()
+        self._locators = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # Shallow copies are taken under the lock as another thread can be
+        # using the cache while it is copied for a worker, plans being built
+        # by other threads are not copied
+        with self._lock:
+            return {ss: copy.copy(getattr(self,ss))
+                    for ss in self.__slots__
+                    if ss not in ("_in_flight","_lock")}
+
+    def __setstate__(self, state: dict) -> None:
+        for ss in state:
+            setattr(self,ss,state[ss])
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get_plan(self,
+                 mesh_key: str,
+                 pyvista_grid: pv.UnstructuredGrid,
+                 points: np.ndarray) -> SamplePlan | None:
+        """Gets the sample plan for the input points on the given mesh. If the
+        point set has been requested previously then a plan is built and
+        stored. Otherwise the point set is recorded and None is returned, or
+        an unstored plan is returned if the NumPy interpolation backend is
+        selected.
+
+        Parameters
+        ----------
+        mesh_key : str
+            Hash key identifying the mesh, see `hash_pyvista_grid`.
+        pyvista_grid : pv.UnstructuredGrid
+            Pyvista grid object containing the simulation mesh.
+        points : np.ndarray
+            Coordinates of the points at which to sample the mesh. shape=(
+            num_points,3)
+
+        Returns
+        -------
+        SamplePlan | None
+            The sample plan for these points or None if the points have not
+            been requested before and the points can be probed directly.
+        """
+        interp_opts = get_interp_opts()
+        key = (mesh_key,hash_array(points),_get_interp_opts_key(interp_opts))
+
+        while True:
+            with self._lock:
+                if key in self._plans:
+                    self._plans.move_to_end(key)
+                    return self._plans[key]
+
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    # This thread loads or builds the plan, other threads
+                    # requesting the same points wait for it and check again
+                    self._in_flight[key] = threading.Event()
+                    break
+
+            in_flight.wait()
+
+        try:
+            return self._load_or_build_plan(key,pyvista_grid,points,
+                                            interp_opts)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def _load_or_build_plan(self,
+                            key: tuple[str,str,str],
+                            pyvista_grid: pv.UnstructuredGrid,
+                            points: np.ndarray,
+                            interp_opts: InterpOpts) -> SamplePlan | None:
+        # Disk I/O and building are done outside the lock so threads sampling
+        # other point sets are not blocked
+        plan = _load_plan(key,points.shape[0],pyvista_grid.n_points)
+        if plan is not None:
+            with self._lock:
+                self._store_plan(key,plan)
+            return plan
+
+        with self._lock:
+            is_repeat = self._mark_seen(key)
+
+        if not is_repeat and interp_opts.backend == EInterpBackend.VTK:
+            return None
+
+        plan = self._build_plan(key[0],pyvista_grid,points,interp_opts)
+        if is_repeat:
+            with self._lock:
+                self._store_plan(key,plan)
+            _save_plan(key,plan)
+
+        return plan
+
+    def _mark_seen(self, key: tuple[str,str,str]) -> bool:
+        # Returns True if the point set has been requested before
+        if key in self._seen:
+            del self._seen[key]
+            return True
+
+        self._seen[key] = None
+        if len(self._seen) > 4*self._max_plans:
+            self._seen.popitem(last=False)
+        return False
+
+    def _build_plan(self,
+                    mesh_key: str,
+                    pyvista_grid: pv.UnstructuredGrid,
+                    points: np.ndarray,
+                    interp_opts: InterpOpts) -> SamplePlan:
+        if interp_opts.backend == EInterpBackend.VTK:
+            locator = None
+            if _needs_nearest(interp_opts):
+                locator = self.get_locator(mesh_key,pyvista_grid)
+            return build_sample_plan(pyvista_grid,points,interp_opts,locator)
+
+        return build_sample_plan_numpy(pyvista_grid,
+                                       points,
+                                       interp_opts,
+                                       self.get_locator(mesh_key,
+                                                         pyvista_grid))
+
+    def get_outside_locator(self,
+                            mesh_key: str,
+                            pyvista_grid: pv.UnstructuredGrid,
+                            ) -> NumpyCellLocator | None:
+        """Gets the cell locator used to find the nearest cells to points
+        outside the mesh when sampling without a plan, see `build_outside_plan`.
+
+        Parameters
+        ----------
+        mesh_key : str
+            Hash key identifying the mesh, see `hash_pyvista_grid`.
+        pyvista_grid : pv.UnstructuredGrid
+            Pyvista grid object containing the simulation mesh.
+
+        Returns
+        -------
+        NumpyCellLocator | None
+            The cell locator for this mesh if the nearest or clamp outside
+            policies are selected, otherwise None.
+        """
+        if not _needs_nearest(get_interp_opts()):
+            return None
+
+        return self.get_locator(mesh_key,pyvista_grid)
+
+    def get_locator(self,
+                    mesh_key: str,
+                    pyvista_grid: pv.UnstructuredGrid) -> NumpyCellLocator:
+        """Gets the NumPy cell locator for the mesh, the locator is built the
+        first time the mesh is requested and then kept for reuse.
+
+        Parameters
+        ----------
+        mesh_key : str
+            Hash key identifying the mesh, see `hash_pyvista_grid`.
+        pyvista_grid : pv.UnstructuredGrid
+            Pyvista grid object containing the simulation mesh.
+
+        Returns
+        -------
+        NumpyCellLocator
+            Cell locator that can be reused for any set of points in this mesh.
+        """
+        with self._lock:
+            if mesh_key in self._locators:
+                self._locators.move_to_end(mesh_key)
+                return self._locators[mesh_key]
+
+        # Built outside the lock, if two threads build the same locator the
+        # first one stored is kept
+        locator = create_numpy_locator(pyvista_grid)
+        with self._lock:
+            locator = self._locators.setdefault(mesh_key,locator)
+            self._locators.move_to_end(mesh_key)
+            if len(self._locators) > 2:
+                self._locators.popitem(last=False)
+
+        return locator
+
+    def _store_plan(self, key: tuple[str,str,str], plan: SamplePlan) -> None:
+        self._plans[key] = plan
+        if len(self._plans) > self._max_plans:
+            self._plans.popitem(last=False)
+
+    def get_time_plan(self,
+                      sim_time_steps: np.ndarray,
+                      sample_times: np.ndarray) -> TimePlan:
+        """Gets the time plan for interpolating from the simulation time steps
+        to the sample times. The plan is built and stored if these sample times
+        have not been requested before so perturbations that only change the
+        sensor positions reuse the same time plan.
+
+        Parameters
+        ----------
+        sim_time_steps : np.ndarray
+            Simulation time steps. shape=(num_sim_steps,)
+        sample_times : np.ndarray
+            Times at which to sample. shape=(num_sample_times,)
+
+        Returns
+        -------
+        TimePlan
+            Bracketing indices and interpolation weights for each sample time.
+        """
+        key = (hash_array(sim_time_steps),hash_array(sample_times))
+
+        with self._lock:
+            if key in self._time_plans:
+                self._time_plans.move_to_end(key)
+                return self._time_plans[key]
+
+            time_plan = build_time_plan(sim_time_steps,sample_times)
+            self._time_plans[key] = time_plan
+            if len(self._time_plans) > self._max_plans:
+                self._time_plans.popitem(last=False)
+
+        return time_plan
+
+    def clear(self) -> None:
+        """Removes all stored sample plans and time plans.
+        """
+        with self._lock:
+            self._plans.clear()
+            self._seen.clear()
+            self._time_plans.clear()
+            self._locators.clear()
+
+
+# NOTE: increment when the stored plan arrays change so plans written by older
+# versions on disk are not loaded
+_PLAN_FORMAT_VERSION = 3
+
+
+def _needs_nearest(interp_opts: InterpOpts) -> bool:
+    return interp_opts.outside_policy in (EOutsidePolicy.NEAREST,
+                                          EOutsidePolicy.CLAMP)
+
+
+def _get_interp_opts_key(interp_opts: InterpOpts) -> str:
+    # Options that change which cells are found or the plan weights, the
+    # chunking and number of workers do not change the plan
+    return "-".join((interp_opts.backend.name,
+                     interp_opts.outside_policy.name,
+                     repr(interp_opts.pcoord_tol),
+                     repr(interp_opts.dist_tol),
+                     repr(interp_opts.newton_tol),
+                     repr(interp_opts.newton_max_iter))).lower()
+
+
+def _get_plan_disk_key(key: tuple[str,str,str]) -> str:
+    return f"plan-v{_PLAN_FORMAT_VERSION}-{key[0]}-{key[1]}-{key[2]}"
+
+
+def _load_plan(key: tuple[str,str,str],
+               n_points: int,
+               n_nodes: int) -> SamplePlan | None:
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return None
+
+    arrays = disk_cache.load(_get_plan_disk_key(key))
+    if arrays is None or not _check_plan_arrays(arrays,n_points,n_nodes):
+        return None
+
+    weights = sparse.csr_array((arrays["data"],arrays["indices"],
+                                arrays["indptr"]),
+                               shape=(n_points,n_nodes))
+    return SamplePlan(cell_ids=arrays["cell_ids"],weights=weights)
+
+
+def _check_plan_arrays(arrays: dict[str,np.ndarray],
+                       n_points: int,
+                       n_nodes: int) -> bool:
+    """Helper function for checking that the arrays of a sample plan loaded
+    from disk are consistent with the points and mesh they were requested for.
+    Entries that fail the check (e.g. written by another version or truncated)
+    are ignored and the plan is built again.
+    """
+    if not all(kk in arrays for kk in ("cell_ids","data","indices","indptr",
+                                       "shape")):
+        return False
+
+    (cell_ids,data,indices,indptr) = (arrays["cell_ids"],arrays["data"],
+                                      arrays["indices"],arrays["indptr"])
+    if (not np.array_equal(arrays["shape"],(n_points,n_nodes))
+        or cell_ids.shape != (n_points,)
+        or indptr.shape != (n_points+1,)
+        or data.ndim != 1
+        or indices.shape != data.shape):
+        return False
+
+    return bool(indptr[0] == 0
+                and indptr[-1] == data.shape[0]
+                and np.all(np.diff(indptr) >= 0)
+                and np.all((indices >= 0) & (indices < n_nodes)))
+
+
+def _save_plan(key: tuple[str,str,str], plan: SamplePlan) -> None:
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return
+
+    disk_cache.save(_get_plan_disk_key(key),
+                    {"cell_ids": plan.cell_ids,
+                     "data": plan.weights.data,
+                     "indices": plan.weights.indices,
+                     "indptr": plan.weights.indptr,
+                     "shape": np.array(plan.weights.shape,dtype=np.int64)})
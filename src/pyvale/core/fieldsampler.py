@@ -5,18 +5,35 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
+from dataclasses import replace
 import numpy as np
 import pyvista as pv
 from pyvale.core.field import IField
-from pyvale.core.sensordata import SensorData
+from pyvale.core.sensordata import SensorData, tile_sensor_rotation
+from pyvale.core.integratorspatial import IIntegratorSpatial
 from pyvale.core.integratorfactory import build_spatial_averager
+from pyvale.core.fieldinterp import (EOutsidePolicy,
+                                     NumpyCellLocator,
+                                     get_interp_opts)
+from pyvale.core.fieldsampleplan import (SamplePlan,
+                                         TimePlan,
+                                         build_outside_plan,
+                                         build_time_plan,
+                                         calc_find_cell_tol,
+                                         interp_with_time_plan)
 
 
-def sample_field_with_sensor_data(field: IField, sensor_data: SensorData
+def sample_field_with_sensor_data(field: IField,
+                                  sensor_data: SensorData,
+                                  integrator: IIntegratorSpatial | None = None,
                                   ) -> np.ndarray:
     """Samples (interpolates) an `IField` object using the parameters specified
     in the `SensorData` object.
 
+    If the sensor positions have a leading realisation axis (a batch of
+    perturbed sensor states, see `SensorData`) then the positions of all
+    realisations are stacked and the field is sampled once for all of them.
+
     Parameters
     ----------
     field : IField
@@ -25,36 +42,246 @@ def sample_field_with_sensor_data(field: IField, sensor_data: SensorData
     sensor_data : SensorData
         Contains sensor array parameters including: number of sensors, positions
         and sample times. See the `SensorData` class for more information.
+    integrator : IIntegratorSpatial | None, optional
+        Persistent spatial integrator to reuse if the sensors use spatial
+        averaging, see `SpatialAveragerCache`. It must have been built for this
+        field and the spatial averaging of the sensor data. If None then a new
+        integrator is built for this call, by default None.
 
     Returns
     -------
     np.ndarray
         Array of sampled sensor measurements with shape=(num_sensors,
-        num_field_components,num_time_steps).
+        num_field_components,num_time_steps). For a batch of sensor states the
+        shape is (num_real,num_sensors,num_field_components,num_time_steps).
     """
+    if sensor_data.positions.ndim == 3:
+        (sample_vals,_) = _sample_field_batch(field,sensor_data,integrator)
+        return sample_vals
+
     if sensor_data.spatial_averager is None:
         return field.sample_field(sensor_data.positions,
                                   sensor_data.sample_times,
                                   sensor_data.angles)
 
-    spatial_integrator = build_spatial_averager(field,sensor_data)
-    return spatial_integrator.calc_averages()
+    if integrator is None:
+        integrator = build_spatial_averager(field,sensor_data)
+
+    return integrator.calc_averages(sensor_data)
+
+
+def sample_field_with_sensor_mask(field: IField,
+                                  sensor_data: SensorData,
+                                  integrator: IIntegratorSpatial | None = None,
+                                  ) -> tuple[np.ndarray,np.ndarray]:
+    """Samples (interpolates) an `IField` object using the parameters specified
+    in the `SensorData` object and returns the mask of the sensors inside the
+    mesh, see `sample_field_with_sensor_data`.
+
+    For point sensors the mask comes from the same point location as the
+    sampled values so it has no extra cost. For sensors with spatial averaging
+    the mask is for the sensor positions which are located separately from the
+    integration points.
+
+    Parameters
+    ----------
+    field : IField
+        The simulated physical field that the sensors will samples from.
+    sensor_data : SensorData
+        Contains sensor array parameters including: number of sensors, positions
+        and sample times. See the `SensorData` class for more information.
+    integrator : IIntegratorSpatial | None, optional
+        Persistent spatial integrator to reuse if the sensors use spatial
+        averaging, see `sample_field_with_sensor_data`, by default None.
+
+    Returns
+    -------
+    tuple[np.ndarray,np.ndarray]
+        Array of sampled sensor measurements with the same shape as returned
+        by `sample_field_with_sensor_data`. Mask that is True for the sensors
+        inside the mesh with shape=(num_sensors,) or shape=(num_real,
+        num_sensors) for a batch of sensor states.
+    """
+    if sensor_data.positions.ndim == 3:
+        return _sample_field_batch(field,sensor_data,integrator,True)
+
+    if sensor_data.spatial_averager is None:
+        return field.sample_field_with_mask(sensor_data.positions,
+                                            sensor_data.sample_times,
+                                            sensor_data.angles)
+
+    # Only the first time step is sampled as only the mask is needed
+    (_,valid_mask) = field.sample_field_with_mask(
+        sensor_data.positions,
+        field.get_time_steps()[:1])
+    return (sample_field_with_sensor_data(field,sensor_data,integrator),
+            valid_mask)
+
+
+def _sample_field_batch(field: IField,
+                        sensor_data: SensorData,
+                        integrator: IIntegratorSpatial | None,
+                        with_mask: bool = False,
+                        ) -> tuple[np.ndarray,np.ndarray | None]:
+    """Helper function for sampling a batch of sensor states with a single
+    interpolation of the field. If each realisation has its own sample times
+    then the field is sampled at the simulation time steps and then each
+    realisation is interpolated to its own sample times.
+
+    Parameters
+    ----------
+    field : IField
+        The simulated physical field that the sensors will samples from.
+    sensor_data : SensorData
+        Batch of sensor states with positions shape=(num_real,num_sensors,3).
+    integrator : IIntegratorSpatial | None
+        Persistent spatial integrator to reuse, if None then one is built.
+    with_mask : bool, optional
+        If True the mask of the sensors inside the mesh is also returned, by
+        default False.
+
+    Returns
+    -------
+    tuple[np.ndarray,np.ndarray | None]
+        Array of sampled sensor measurements with shape=(num_real,num_sensors,
+        num_field_components,num_time_steps). Mask that is True for the sensors
+        inside the mesh with shape=(num_real,num_sensors), None if the mask was
+        not requested.
+    """
+    (n_real,n_sens,_) = sensor_data.positions.shape
+
+    sample_times = sensor_data.sample_times
+    batch_times = sample_times is not None and sample_times.ndim == 2
+
+    # Nominal angles given once per sensor are repeated for each realisation
+    # so each stacked position keeps the angle of its own sensor
+    angles = sensor_data.angles
+    if angles is not None:
+        angles = tile_sensor_rotation(angles,n_real*n_sens)
+
+    stacked_data = replace(
+        sensor_data,
+        positions=sensor_data.positions.reshape((n_real*n_sens,3)),
+        sample_times=None if batch_times else sample_times,
+        angles=angles)
+
+    # shape=(n_real*n_sens,n_comps,n_time_steps)
+    batch_mask = None
+    if with_mask:
+        (stacked_vals,stacked_mask) = sample_field_with_sensor_mask(
+            field,
+            stacked_data,
+            integrator)
+        batch_mask = stacked_mask.reshape((n_real,n_sens))
+    else:
+        stacked_vals = sample_field_with_sensor_data(field,
+                                                     stacked_data,
+                                                     integrator)
+
+    batch_vals = stacked_vals.reshape((n_real,n_sens)+stacked_vals.shape[1:])
+
+    if not batch_times:
+        return (batch_vals,batch_mask)
+
+    time_plan = build_time_plan(field.get_time_steps(),sample_times)
+    return (interp_with_time_plan(time_plan,batch_vals),batch_mask)
 
 
-# NOTE: sampling outside the bounds of the sample returns a value of 0
 def sample_pyvista_grid(components: tuple[str,...],
                         pyvista_grid: pv.UnstructuredGrid,
                         sim_time_steps: np.ndarray,
                         points: np.ndarray,
-                        sample_times: np.ndarray | None = None
+                        sample_times: np.ndarray | None = None,
+                        sample_plan: SamplePlan | None = None,
+                        time_plan: TimePlan | None = None,
+                        outside_policy: EOutsidePolicy = EOutsidePolicy.ZERO,
+                        locator: NumpyCellLocator | None = None,
                         ) -> np.ndarray:
     """Function for sampling (interpolating) a pyvista grid object containing
+    simulated field data. See `sample_pyvista_grid_with_mask` which also
+    returns the mask of the points inside the mesh.
+
+    NOTE: by default sampling outside the mesh bounds returns a value of 0.
+
+    Parameters
+    ----------
+    components : tuple[str,...]
+        String keys for the components to be sampled in the pyvista grid object.
+    pyvista_grid : pv.UnstructuredGrid
+        Pyvista grid object containing the simulation mesh and the components of
+        the physical field that will be sampled.
+    sim_time_steps : np.ndarray
+        Simulation time steps corresponding to the fields in the pyvista grid
+        object.
+    points : np.ndarray
+        Coordinates of the points at which to sample the pyvista grid object.
+        shape=(num_points,3)
+    sample_times : np.ndarray | None, optional
+        Array of time steps at which to sample the pyvista grid. If None then no
+        temporal interpolation is performed, by default None.
+    sample_plan : SamplePlan | None, optional
+        Precomputed containing cells and interpolation weights for the sample
+        points in this grid. If None then the grid is probed directly using
+        VTK, by default None.
+    time_plan : TimePlan | None, optional
+        Precomputed bracketing time steps and weights for the sample times, by
+        default None.
+    outside_policy : EOutsidePolicy, optional
+        Value sampled at points outside the mesh, by default
+        EOutsidePolicy.ZERO.
+    locator : NumpyCellLocator | None, optional
+        Cell locator for this mesh used to find the nearest cells to points
+        outside the mesh when probing without a plan, by default None.
+
+    Returns
+    -------
+    np.ndarray
+        Array of sampled sensor measurements with shape=(num_sensors,
+        num_field_components,num_time_steps).
+    """
+    (sample_vals,_) = sample_pyvista_grid_with_mask(components,
+                                                    pyvista_grid,
+                                                    sim_time_steps,
+                                                    points,
+                                                    sample_times,
+                                                    sample_plan,
+                                                    time_plan,
+                                                    outside_policy,
+                                                    locator)
+    return sample_vals
+
+
+def sample_pyvista_grid_with_mask(components: tuple[str,...],
+                                  pyvista_grid: pv.UnstructuredGrid,
+                                  sim_time_steps: np.ndarray,
+                                  points: np.ndarray,
+                                  sample_times: np.ndarray | None = None,
+                                  sample_plan: SamplePlan | None = None,
+                                  time_plan: TimePlan | None = None,
+                                  outside_policy: EOutsidePolicy = \
+                                      EOutsidePolicy.ZERO,
+                                  locator: NumpyCellLocator | None = None,
+                                  ) -> tuple[np.ndarray,np.ndarray]:
+    """Function for sampling (interpolating) a pyvista grid object containing
     simulated field data. The pyvista sample method uses VTK to perform the
     spatial interpolation using the element shape functions. If the sampling
     time steps are not the same as the simulation time then a linear
-    interpolation over time is performed using numpy.
+    interpolation over time is performed for all sensors and components at
+    once using the bracketing time steps of each sample time.
 
-    NOTE: sampling outside the mesh bounds of the sample returns a value of 0.
+    If a sample plan is provided then VTK is skipped and the stored shape
+    function weights are applied to the nodal field data as a sparse matrix
+    product for all components and time steps. Plans built with the VTK
+    backend give identical values to probing the grid directly so the result
+    does not depend on whether a plan has been cached.
+
+    The mask of the points inside the mesh comes from the same point location
+    as the sampled values (the VTK valid point mask or the cells in the sample
+    plan) so no extra search is needed. With the nearest and clamp outside
+    policies a sample plan already holds the weights of the nearest cell for
+    points outside the mesh. Without a plan only the points outside the VTK
+    valid point mask are searched for their nearest cell, see
+    `build_outside_plan`, giving the same values as sampling with a plan.
 
     Parameters
     ----------
@@ -76,37 +303,71 @@ def sample_pyvista_grid(components: tuple[str,...],
         Array of time steps at which to sample the pyvista grid. If None then no
         temporal interpolation is performed and the sample times are assumed to
         be the simulation time steps.
+    sample_plan : SamplePlan | None, optional
+        Precomputed containing cells and interpolation weights for the sample
+        points in this grid, see `SamplePlanCache`. If None then the grid is
+        probed directly using VTK, by default None.
+    time_plan : TimePlan | None, optional
+        Precomputed bracketing time steps and weights for the sample times. If
+        None and sample times are specified then the time plan is built here,
+        by default None.
+    outside_policy : EOutsidePolicy, optional
+        Value sampled at points outside the mesh, see `EOutsidePolicy`, by
+        default EOutsidePolicy.ZERO.
+    locator : NumpyCellLocator | None, optional
+        Cell locator for this mesh used to find the nearest cells to points
+        outside the mesh when probing without a plan with the nearest and clamp
+        outside policies. If None then one is created if needed, by default
+        None.
 
     Returns
     -------
-    np.ndarray
+    tuple[np.ndarray,np.ndarray]
         Array of sampled sensor measurements with shape=(num_sensors,
-        num_field_components,num_time_steps).
+        num_field_components,num_time_steps). Mask that is True for the points
+        inside the mesh with shape=(num_sensors,).
     """
-    pv_points = pv.PolyData(points)
-    sample_data = pv_points.sample(pyvista_grid)
-
     n_comps = len(components)
-    (n_sensors,n_time_steps) = np.array(sample_data[components[0]]).shape
+    n_sensors = points.shape[0]
+    n_time_steps = sim_time_steps.shape[0]
     sample_at_sim_time = np.empty((n_sensors,n_comps,n_time_steps))
 
-    for ii,cc in enumerate(components):
-        sample_at_sim_time[:,ii,:] = np.array(sample_data[cc])
+    if sample_plan is None:
+        # Same locator and tolerance as the sample plans so sampling with or
+        # without a plan gives identical values
+        sample_data = pv.PolyData(points).sample(
+            pyvista_grid,
+            tolerance=calc_find_cell_tol(pyvista_grid),
+            locator="static_cell")
+        valid_mask = np.asarray(sample_data["vtkValidPointMask"]).astype(bool)
+        for ii,cc in enumerate(components):
+            sample_at_sim_time[:,ii,:] = np.array(sample_data[cc])
 
-    if sample_times is None:
-        return sample_at_sim_time
+        if (outside_policy in (EOutsidePolicy.NEAREST,EOutsidePolicy.CLAMP)
+            and not np.all(valid_mask)):
+            outside_plan = build_outside_plan(
+                pyvista_grid,
+                points[~valid_mask],
+                outside_policy == EOutsidePolicy.CLAMP,
+                locator,
+                get_interp_opts())
+            for ii,cc in enumerate(components):
+                sample_at_sim_time[~valid_mask,ii,:] = (
+                    outside_plan.weights @ np.asarray(pyvista_grid[cc]))
+    else:
+        valid_mask = ~sample_plan.get_outside_mask()
+        for ii,cc in enumerate(components):
+            # shape=(n_sensors,n_nodes) @ (n_nodes,n_time_steps)
+            sample_at_sim_time[:,ii,:] = (sample_plan.weights
+                                          @ np.asarray(pyvista_grid[cc]))
 
-    def sample_time_interp(x):
-        return np.interp(sample_times, sim_time_steps, x)
-
-    n_time_steps = sample_times.shape[0]
-    sample_at_spec_time = np.empty((n_sensors,n_comps,n_time_steps))
-
-    for ii,cc in enumerate(components):
-        sample_at_spec_time[:,ii,:] = np.apply_along_axis(sample_time_interp,-1,
-                                                    sample_at_sim_time[:,ii,:])
-
-    return sample_at_spec_time
+    if outside_policy == EOutsidePolicy.NAN:
+        sample_at_sim_time[~valid_mask,:,:] = np.nan
 
+    if sample_times is None:
+        return (sample_at_sim_time,valid_mask)
 
+    if time_plan is None:
+        time_plan = build_time_plan(sim_time_steps,sample_times)
 
+    return (interp_with_time_plan(time_plan,sample_at_sim_time),valid_mask)
@@ -11,8 +11,9 @@ from scipy.spatial.transform import Rotation
 import mooseherder as mh
 
 from pyvale.core.field import IField
-from pyvale.core.fieldconverter import conv_simdata_to_pyvista
-from pyvale.core.fieldsampler import sample_pyvista_grid
+from pyvale.core.meshregistry import get_mesh_registry
+from pyvale.core.fieldsampler import sample_pyvista_grid_with_mask
+from pyvale.core.fieldinterp import get_interp_opts
 
 class FieldScalar(IField):
     """Class for sampling (interpolating) scalar fields from simulations to
@@ -21,7 +22,7 @@ class FieldScalar(IField):
     Implements the `IField` interface.
     """
     __slots__ = ("_field_key","_spat_dims","_sim_data","_pyvista_grid",
-                 "_pyvista_vis")
+                 "_pyvista_vis","_mesh_key","_sample_plans")
 
     def __init__(self,
                  sim_data: mh.SimData,
@@ -44,11 +45,7 @@ class FieldScalar(IField):
         self._spat_dims = spat_dims
 
         self._sim_data = sim_data
-        (self._pyvista_grid,self._pyvista_vis) = conv_simdata_to_pyvista(
-            self._sim_data,
-            (self._field_key,),
-            self._spat_dims
-        )
+        self._set_grids()
 
     def set_sim_data(self, sim_data: mh.SimData) -> None:
         """Sets the `SimData` object that will be interpolated to obtain sensor
@@ -62,11 +59,18 @@ class FieldScalar(IField):
             physical field.
         """
         self._sim_data = sim_data
-        (self._pyvista_grid,self._pyvista_vis) = conv_simdata_to_pyvista(
-            sim_data,
-            (self._field_key,),
-            self._spat_dims
-        )
+        self._set_grids()
+
+    def _set_grids(self) -> None:
+        # Fields on the same mesh share the converted mesh and sample plans,
+        # the grids here are shallow copies with this field's data attached
+        mesh_entry = get_mesh_registry().get_mesh(self._sim_data,
+                                                  self._spat_dims)
+        self._mesh_key = mesh_entry.mesh_key
+        self._sample_plans = mesh_entry.sample_plans
+        (self._pyvista_grid,self._pyvista_vis) = mesh_entry.create_grids(
+            self._sim_data,
+            (self._field_key,))
 
     def get_sim_data(self) -> mh.SimData:
         """Gets the simulation data object associated with this field. Used by
@@ -132,10 +136,12 @@ class FieldScalar(IField):
     def sample_field(self,
                     points: np.ndarray,
                     times: np.ndarray | None = None,
-                    angles: tuple[Rotation,...] | None = None,
+                    angles: tuple[Rotation,...] | Rotation | None = None,
                     ) -> np.ndarray:
         """Samples (interpolates) the simulation field at the specified
-        positions, times, and angles.
+        positions, times, and angles. Points outside the mesh are sampled
+        using the outside policy in the interpolation options, see
+        `set_interp_opts`.
 
         Parameters
         ----------
@@ -146,12 +152,10 @@ class FieldScalar(IField):
             Times to sample the underlying simulation. If None then the
             simulation time steps are used and no temporal interpolation is
             performed, by default None.
-        angles : tuple[Rotation,...] | None, optional
+        angles : tuple[Rotation,...] | Rotation | None, optional
             Angles to rotate the sampled values into with rotations specified
-            with respect to the simulation world coordinates. If a single
-            rotation is specified then all points are assumed to have the same
-            angle and are batch processed for speed. If None then no rotation is
-            performed, by default None.
+            with respect to the simulation world coordinates. If None then no
+            rotation is performed, by default None.
 
         Returns
         -------
@@ -159,9 +163,67 @@ class FieldScalar(IField):
             An array of sampled (interpolated) values with the following
             dimensions: shape=(num_points,num_components,num_time_steps).
         """
-        return sample_pyvista_grid((self._field_key,),
-                                self._pyvista_grid,
-                                self._sim_data.time,
-                                points,
-                                times)
+        (field_data,_) = self.sample_field_with_mask(points,times,angles)
+        return field_data
+
+    def sample_field_with_mask(self,
+                               points: np.ndarray,
+                               times: np.ndarray | None = None,
+                               angles: tuple[Rotation,...] | Rotation | None \
+                                   = None,
+                               ) -> tuple[np.ndarray,np.ndarray]:
+        """Samples (interpolates) the simulation field at the specified
+        positions, times, and angles and returns the mask of the points inside
+        the mesh. The mask comes from the same point location as the sampled
+        values so checking for points outside the mesh has no extra cost.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Spatial points to be sampled with the rows indicating the point
+            number of the columns indicating the X,Y and Z coordinates.
+        times : np.ndarray | None, optional
+            Times to sample the underlying simulation. If None then the
+            simulation time steps are used and no temporal interpolation is
+            performed, by default None.
+        angles : tuple[Rotation,...] | Rotation | None, optional
+            Angles to rotate the sampled values into with rotations specified
+            with respect to the simulation world coordinates. Can be a tuple
+            of rotations or a stacked scipy Rotation. If a single rotation is
+            specified then all points are assumed to have the same angle and
+            are batch processed for speed. If None then no rotation is
+            performed, by default None.
+
+        Returns
+        -------
+        tuple[np.ndarray,np.ndarray]
+            An array of sampled (interpolated) values with the following
+            dimensions: shape=(num_points,num_components,num_time_steps). Mask
+            that is True for points inside the mesh with shape=(num_points,).
+        """
+        sample_plan = self._sample_plans.get_plan(self._mesh_key,
+                                                  self._pyvista_grid,
+                                                  points)
+        # Points outside the mesh are only searched for their nearest cell
+        # when probing directly with the nearest or clamp outside policies
+        locator = None
+        if sample_plan is None:
+            locator = self._sample_plans.get_outside_locator(
+                self._mesh_key,
+                self._pyvista_grid)
+
+        time_plan = None
+        if times is not None:
+            time_plan = self._sample_plans.get_time_plan(self._sim_data.time,
+                                                         times)
+
+        return sample_pyvista_grid_with_mask((self._field_key,),
+                                             self._pyvista_grid,
+                                             self._sim_data.time,
+                                             points,
+                                             times,
+                                             sample_plan,
+                                             time_plan,
+                                             get_interp_opts().outside_policy,
+                                             locator)
 
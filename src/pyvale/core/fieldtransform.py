@@ -6,6 +6,8 @@ Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
 import numpy as np
+from scipy.spatial.transform import Rotation
+from pyvale.core.sensordata import as_stacked_rotation
 
 def transform_vector_2d(trans_mat: np.ndarray, vector: np.ndarray
                         ) -> np.ndarray:
@@ -381,4 +383,205 @@ def transform_tensor_3d_batch(trans_mat: np.ndarray, tensor: np.ndarray
                                             + trans_mat[1,1]*tensor[:,yz,:]
                                             + trans_mat[1,2]*tensor[:,zz,:]))
 
-    return tensor_trans
\ No newline at end of file
+    return tensor_trans
+
+def stack_trans_matrices(angles: tuple[Rotation,...] | Rotation,
+                         n_points: int) -> np.ndarray:
+    """Creates a stack of transformation matrices (transposed rotation
+    matrices) from a tuple of scipy rotations or a stacked scipy rotation by
+    converting them to a single stacked rotation in one call.
+
+    If there are more points than rotations (e.g. integration points for
+    spatial averaging) then the points must be grouped by sensor and each
+    sensors matrix is repeated for all of its points. For a batch of
+    realisations the rotations must already be stacked per realisation, see
+    `tile_sensor_rotation`.
+
+    Parameters
+    ----------
+    angles : tuple[Rotation,...] | Rotation
+        Rotation for each sensor with respect to the simulation world
+        coordinates.
+    n_points : int
+        Number of sampled points that will be transformed.
+
+    Returns
+    -------
+    np.ndarray
+        Stack of transformation matrices with shape=(num_points,3,3).
+
+    Raises
+    ------
+    ValueError
+        The number of points is not a multiple of the number of rotations.
+    """
+    rot_mats = as_stacked_rotation(angles).as_matrix()
+    n_rots = rot_mats.shape[0]
+    if n_points % n_rots != 0:
+        raise ValueError(f"Number of points ({n_points}) is not a multiple "
+                         + f"of the number of sensor rotations ({n_rots}).")
+
+    trans_mats = np.transpose(rot_mats,(0,2,1))
+    return np.repeat(trans_mats,n_points//n_rots,axis=0)
+
+
+def _sym_upper_stack(trans_mats: np.ndarray) -> np.ndarray:
+    """Helper function for building the matrix stack used by the stacked
+    transformations. The single sensor and batch transformations in this module
+    only read the upper triangle of the transformation matrix so the stacked
+    transformations mirror the upper triangle to give identical results.
+
+    Parameters
+    ----------
+    trans_mats : np.ndarray
+        Stack of transformation matrices with shape=(num_sensors,n,n).
+
+    Returns
+    -------
+    np.ndarray
+        Stack of matrices with shape=(num_sensors,n,n).
+    """
+    upper = np.triu(trans_mats)
+    return upper + np.transpose(np.triu(trans_mats,1),(0,2,1))
+
+
+def transform_vector_2d_stack(trans_mats: np.ndarray, vector: np.ndarray
+                              ) -> np.ndarray:
+    """Performs a stacked 2D vector transformation for a series of sensors
+    where each sensor has its own transformation matrix. All sensors are
+    transformed together with a single einsum.
+
+    Parameters
+    ----------
+    trans_mats : np.ndarray
+        Stack of transformation matrices with shape=(num_sensors,2,2).
+    vector : np.ndarray
+        Input vector field to transform with shape=(num_sensors,2,num_time_steps
+        ) where the second dimension is the X and Y components of the vector
+        field.
+
+    Returns
+    -------
+    np.ndarray
+        Transformed vector field with shape=(num_sensors,2,num_time_steps),
+        where the second dimension is the X and Y components of the
+        transformed vector field.
+    """
+    return np.einsum("sij,sjt->sit",_sym_upper_stack(trans_mats),vector)
+
+
+def transform_vector_3d_stack(trans_mats: np.ndarray, vector: np.ndarray
+                              ) -> np.ndarray:
+    """Performs a stacked 3D vector transformation for a series of sensors
+    where each sensor has its own transformation matrix. All sensors are
+    transformed together with a single einsum.
+
+    Parameters
+    ----------
+    trans_mats : np.ndarray
+        Stack of transformation matrices with shape=(num_sensors,3,3).
+    vector : np.ndarray
+        Input vector field to transform with shape=(num_sensors,3,num_time_steps
+        ) where the second dimension is the X, Y and Z components of the vector
+        field.
+
+    Returns
+    -------
+    np.ndarray
+        Transformed vector field with shape=(num_sensors,3,num_time_steps),
+        where the second dimension is the X, Y and Z components of the
+        transformed vector field.
+    """
+    return np.einsum("sij,sjt->sit",_sym_upper_stack(trans_mats),vector)
+
+
+def transform_tensor_2d_stack(trans_mats: np.ndarray, tensor: np.ndarray
+                              ) -> np.ndarray:
+    """Performs a stacked transformation of a 2D tensor field assuming the
+    shear terms are symmetric. Each sensor has its own transformation matrix
+    and all sensors are transformed together with a single einsum.
+
+    Parameters
+    ----------
+    trans_mats : np.ndarray
+        Stack of transformation matrices with shape=(num_sensors,2,2).
+    tensor : np.ndarray
+        Tensor field with shape=(num_sensors,3,num_time_steps) where the rows
+        are the XX, YY and XY components of the tensor field.
+
+    Returns
+    -------
+    np.ndarray
+        Transformed tensor field with shape=(num_sensors,3,num_time_steps) where
+        the rows are the XX, YY and XY components of the tensor field.
+    """
+    # Maps the rows of the full tensor to the XX, YY, XY components
+    full_inds = np.array([[0,2],
+                          [2,1]])
+    comp_inds = ((0,0),(1,1),(0,1))
+    return _transform_tensor_stack(trans_mats,tensor,full_inds,comp_inds)
+
+
+def transform_tensor_3d_stack(trans_mats: np.ndarray, tensor: np.ndarray
+                              ) -> np.ndarray:
+    """Performs a stacked transformation of a 3D tensor field assuming all the
+    shear terms are symmetric. Each sensor has its own transformation matrix
+    and all sensors are transformed together with a single einsum.
+
+    Parameters
+    ----------
+    trans_mats : np.ndarray
+        Stack of transformation matrices with shape=(num_sensors,3,3).
+    tensor : np.ndarray
+        Tensor field with shape=(num_sensors,6,num_time_steps), where the rows
+        are the XX, YY, ZZ, XY, XZ and YZ components of the field.
+
+    Returns
+    -------
+    np.ndarray
+        Transformed tensor field with shape=(num_sensors,6,num_time_steps),
+        where the rows are the XX, YY, ZZ, XY, XZ and YZ components of the
+        field.
+    """
+    # Maps the rows of the full tensor to the XX, YY, ZZ, XY, XZ, YZ components
+    full_inds = np.array([[0,3,4],
+                          [3,1,5],
+                          [4,5,2]])
+    comp_inds = ((0,0),(1,1),(2,2),(0,1),(0,2),(1,2))
+    return _transform_tensor_stack(trans_mats,tensor,full_inds,comp_inds)
+
+
+def _transform_tensor_stack(trans_mats: np.ndarray,
+                            tensor: np.ndarray,
+                            full_inds: np.ndarray,
+                            comp_inds: tuple[tuple[int,int],...]
+                            ) -> np.ndarray:
+    """Helper function for stacked tensor transformations. Expands the tensor
+    components into a full symmetric tensor for each sensor and time step,
+    transforms it with a single einsum and then extracts the components.
+
+    Parameters
+    ----------
+    trans_mats : np.ndarray
+        Stack of transformation matrices with shape=(num_sensors,n,n).
+    tensor : np.ndarray
+        Tensor components with shape=(num_sensors,num_comps,num_time_steps).
+    full_inds : np.ndarray
+        Component index for each entry of the full tensor. shape=(n,n)
+    comp_inds : tuple[tuple[int,int],...]
+        Row and column of the full tensor for each component.
+
+    Returns
+    -------
+    np.ndarray
+        Transformed tensor components with shape=(num_sensors,num_comps,
+        num_time_steps).
+    """
+    trans_mats = _sym_upper_stack(trans_mats)
+    # shape=(n_sens,n,n,n_time_steps)
+    tensor_full = tensor[:,full_inds,:]
+    tensor_full = np.einsum("sik,skmt,sjm->sijt",
+                            trans_mats,tensor_full,trans_mats)
+
+    (rows,cols) = zip(*comp_inds)
+    return tensor_full[:,rows,cols,:]
@@ -18,19 +18,57 @@ class IGeneratorRandom(ABC):
     """
 
     @abstractmethod
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         """Abstract method. Generates an array of random numbers with a shape
-        based on the specified shape.
+        based on the specified size.
 
         Parameters
         ----------
-        shape : tuple[int,...]
+        size : tuple[int,...]
             Shape of the array of random numbers to be returns.
 
         Returns
         -------
         np.ndarray
-            Array of random numbers with shape specified by the input shape.
+            Array of random numbers with shape specified by the input size.
+        """
+        pass
+
+    @abstractmethod
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Abstract method. Replaces the underlying numpy random generator with
+        a new generator seeded from the input seed.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the new random generator. If None then fresh entropy is
+            used.
+        """
+        pass
+
+    @abstractmethod
+    def get_rng_state(self) -> dict:
+        """Abstract method. Gets the state of the underlying numpy random
+        generator so the same random numbers can be generated again.
+
+        Returns
+        -------
+        dict
+            Bit generator state of the random generator, see
+            `np.random.BitGenerator.state`.
+        """
+        pass
+
+    @abstractmethod
+    def set_rng_state(self, state: dict) -> None:
+        """Abstract method. Sets the state of the underlying numpy random
+        generator to a state returned by `get_rng_state`.
+
+        Parameters
+        ----------
+        state : dict
+            Bit generator state of the random generator.
         """
         pass
 
@@ -62,13 +100,22 @@ class GeneratorNormal(IGeneratorRandom):
         self._mean = mean
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         """Initialiser taking the parameters of the probability distribution and
         an optional seed for the random generator to allow for reproducibility.
 
         Parameters
         ----------
-        shape : tuple[int,...]
+        size : tuple[int,...]
             _description_
 
         Returns
@@ -78,7 +125,7 @@ class GeneratorNormal(IGeneratorRandom):
         """
         return self._rng.normal(loc = self._mean,
                                 scale = self._std,
-                                shape = shape)
+                                size = size)
 
 
 class GeneratorLogNormal(IGeneratorRandom):
@@ -108,12 +155,21 @@ class GeneratorLogNormal(IGeneratorRandom):
         self._mean = mean
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         """_summary_
 
         Parameters
         ----------
-        shape : tuple[int,...]
+        size : tuple[int,...]
             _description_
 
         Returns
@@ -123,7 +179,7 @@ class GeneratorLogNormal(IGeneratorRandom):
         """
         return self._rng.lognormal(mean = self._mean,
                                    sigma = self._std,
-                                   shape = shape)
+                                   size = size)
 
 
 class GeneratorUniform(IGeneratorRandom):
@@ -154,10 +210,19 @@ class GeneratorUniform(IGeneratorRandom):
         self._high = high
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         return self._rng.uniform(low = self._low,
                                  high = self._high,
-                                 shape = shape)
+                                 size = size)
 
 
 class GeneratorExponential(IGeneratorRandom):
@@ -182,12 +247,21 @@ class GeneratorExponential(IGeneratorRandom):
         self._scale = scale
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         """_summary_
 
         Parameters
         ----------
-        shape : tuple[int,...]
+        size : tuple[int,...]
             _description_
 
         Returns
@@ -196,7 +270,7 @@ class GeneratorExponential(IGeneratorRandom):
             _description_
         """
         return self._rng.exponential(scale = self._scale,
-                                     shape = shape)
+                                     size = size)
 
 
 class GeneratorChiSquare(IGeneratorRandom):
@@ -220,12 +294,21 @@ class GeneratorChiSquare(IGeneratorRandom):
         self._dofs = np.abs(dofs)
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         """_summary_
 
         Parameters
         ----------
-        shape : tuple[int,...]
+        size : tuple[int,...]
             _description_
 
         Returns
@@ -234,7 +317,7 @@ class GeneratorChiSquare(IGeneratorRandom):
             _description_
         """
         return self._rng.chisquare(df = self._dofs,
-                                   shape = shape)
+                                   size = size)
 
 
 class GeneratorDirichlet(IGeneratorRandom):
@@ -248,8 +331,17 @@ class GeneratorDirichlet(IGeneratorRandom):
         self._alpha = alpha
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
-        return self._rng.dirichlet(alpha = self._alpha, shape = shape)
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
+        return self._rng.dirichlet(alpha = self._alpha, size = size)
 
 
 class GeneratorF(IGeneratorRandom):
@@ -263,8 +355,17 @@ class GeneratorF(IGeneratorRandom):
         self._dofs = np.abs(dofs)
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
-        return self._rng.f(dfnum = self._dofs, shape = shape)
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
+        return self._rng.f(dfnum = self._dofs, size = size)
 
 
 class GeneratorGamma(IGeneratorRandom):
@@ -280,9 +381,19 @@ class GeneratorGamma(IGeneratorRandom):
         self._scale = scale
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
-        return self._rng.gamma(scale = self._scale,
-                                     shape = shape)
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
+        return self._rng.gamma(shape = self._shape,
+                               scale = self._scale,
+                               size = size)
 
 
 class GeneratorStudentT(IGeneratorRandom):
@@ -296,9 +407,18 @@ class GeneratorStudentT(IGeneratorRandom):
         self._dofs = np.abs(dofs)
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         return self._rng.standard_t(df = self._dofs,
-                                   shape = shape)
+                                   size = size)
 
 
 class GeneratorBeta(IGeneratorRandom):
@@ -314,10 +434,19 @@ class GeneratorBeta(IGeneratorRandom):
         self._b = np.abs(b)
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         return self._rng.beta(a = self._a,
                               b = self._b,
-                              shape = shape)
+                              size = size)
 
 
 class GeneratorTriangular(IGeneratorRandom):
@@ -336,8 +465,18 @@ class GeneratorTriangular(IGeneratorRandom):
 
         self._rng = np.random.default_rng(seed)
 
-    def generate(self, shape: tuple[int,...]) -> np.ndarray:
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self._rng.bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self._rng.bit_generator.state = state
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
         return self._rng.triangular(left = self._left,
                                     mode = self._mode,
                                     right = self._right,
-                                    shape = shape)
\ No newline at end of file
+                                    size = size)
+
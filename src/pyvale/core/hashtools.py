@@ -0,0 +1,54 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import hashlib
+from typing import Iterable
+import numpy as np
+
+
+def hash_array(array: np.ndarray) -> str:
+    """Creates a hash key for the values in an array such as a set of sample
+    points or sample times.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        Array to hash, for example the coordinates of the sample points with
+        shape=(num_points,3).
+
+    Returns
+    -------
+    str
+        Hexadecimal hash string identifying the array values, dtype and shape.
+    """
+    return hash_arrays((array,))
+
+
+def hash_arrays(arrays: Iterable[np.ndarray]) -> str:
+    """Creates a single hash key for the values and shapes of a sequence of
+    arrays such as the connectivity of each element block of a mesh. The order
+    of the arrays changes the key. The raw bytes of each array are hashed
+    together with its dtype and shape so the values are not converted and the
+    boundaries between arrays are unambiguous.
+
+    Parameters
+    ----------
+    arrays : Iterable[np.ndarray]
+        Arrays to hash.
+
+    Returns
+    -------
+    str
+        Hexadecimal hash string identifying the array values, dtypes and
+        shapes.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for aa in arrays:
+        aa = np.asarray(aa)
+        hasher.update(f"{aa.dtype.str}{aa.shape}".encode())
+        hasher.update(np.ascontiguousarray(aa).reshape(-1).view(np.uint8))
+    return hasher.hexdigest()
@@ -12,9 +12,16 @@ from pyvale.core.integratorspatial import IIntegratorSpatial
 from pyvale.core.integratortype import EIntSpatialType
 from pyvale.core.integratorrectangle import Rectangle2D
 from pyvale.core.integratorquadrature import (Quadrature2D,
+                                              QuadratureGauss,
                                               create_gauss_weights_2d_4pts,
                                               create_gauss_weights_2d_9pts)
 
+# Gauss integrators with the region and order set by the sensor data
+_GAUSS_INT_TYPES = (EIntSpatialType.GAUSSRECT,
+                    EIntSpatialType.GAUSSBOX,
+                    EIntSpatialType.GAUSSDISK,
+                    EIntSpatialType.GAUSSCYL)
+
 class IntegratorSpatialFactory:
     """Namespace for static methods used to build spatial integrators.
     """
@@ -78,12 +85,10 @@ class IntegratorSpatialFactory:
                                                         [1,-1,0],
                                                         [1,1,0]]))
 
-        gauss_weight_func = create_gauss_weights_2d_4pts
-
         return Quadrature2D(field,
                             sensor_data,
                             gauss_pt_offsets,
-                            gauss_weight_func)
+                            create_gauss_weights_2d_4pts())
 
 
     @staticmethod
@@ -102,12 +107,26 @@ class IntegratorSpatialFactory:
                                         [np.sqrt(0.6),0,0],
                                         [0,0,0]]))
 
-        gauss_weight_func = create_gauss_weights_2d_9pts
-
         return Quadrature2D(field,
                             sensor_data,
                             gauss_pt_offsets,
-                            gauss_weight_func)
+                            create_gauss_weights_2d_9pts())
+
+
+    @staticmethod
+    def gauss(field: IField,
+              sensor_data: SensorData,
+              ) -> IIntegratorSpatial:
+
+        order = sensor_data.spatial_order
+        if order is None:
+            order = 3 if sensor_data.spatial_tol is None else 8
+
+        return QuadratureGauss(field,
+                               sensor_data,
+                               sensor_data.spatial_averager,
+                               order,
+                               sensor_data.spatial_tol)
 
 
 def build_spatial_averager(field: IField, sensor_data: SensorData,
@@ -130,5 +149,71 @@ def build_spatial_averager(field: IField, sensor_data: SensorData,
     elif sensor_data.spatial_averager == EIntSpatialType.QUAD9PT:
         return IntegratorSpatialFactory.quad_2d_9pt(field,
                                                     sensor_data)
+    elif sensor_data.spatial_averager in _GAUSS_INT_TYPES:
+        return IntegratorSpatialFactory.gauss(field,
+                                              sensor_data)
     else:
-        return None
\ No newline at end of file
+        return None
+
+
+class SpatialAveragerCache:
+    """Holds a persistent spatial integrator for a sensor array so that the
+    integrator is not rebuilt every time the sensor array is sampled. The
+    integrator is only rebuilt if the field, type of spatial averaging, the
+    spatial dimensions or the quadrature order and tolerance change. The
+    integrator itself only recalculates its integration points if the sensor
+    positions or angles change so re-evaluating with new sample times is cheap.
+    """
+    __slots__ = ("_field","_spatial_averager","_spatial_dims","_spatial_order",
+                 "_spatial_tol","_integrator")
+
+    def __init__(self) -> None:
+        """Initialiser for the `SpatialAveragerCache` class.
+        """
+        self._field = None
+        self._spatial_averager = None
+        self._spatial_dims = None
+        self._spatial_order = None
+        self._spatial_tol = None
+        self._integrator = None
+
+    def get_integrator(self,
+                       field: IField,
+                       sensor_data: SensorData,
+                       ) -> IIntegratorSpatial | None:
+        """Gets the spatial integrator for the field and sensor array
+        parameters, building a new integrator if the stored one does not match.
+
+        Parameters
+        ----------
+        field : IField
+            The simulated physical field that the sensors sample from.
+        sensor_data : SensorData
+            Contains the parameters of the sensor array including the spatial
+            averaging type and spatial dimensions.
+
+        Returns
+        -------
+        IIntegratorSpatial | None
+            The spatial integrator or None if the sensors do not use spatial
+            averaging.
+        """
+        if (sensor_data.spatial_averager is None
+            or sensor_data.spatial_dims is None):
+            return None
+
+        if (self._integrator is not None
+            and field is self._field
+            and sensor_data.spatial_averager == self._spatial_averager
+            and sensor_data.spatial_order == self._spatial_order
+            and sensor_data.spatial_tol == self._spatial_tol
+            and np.array_equal(sensor_data.spatial_dims,self._spatial_dims)):
+            return self._integrator
+
+        self._integrator = build_spatial_averager(field,sensor_data)
+        self._field = field
+        self._spatial_averager = sensor_data.spatial_averager
+        self._spatial_dims = np.array(sensor_data.spatial_dims,copy=True)
+        self._spatial_order = sensor_data.spatial_order
+        self._spatial_tol = sensor_data.spatial_tol
+        return self._integrator
@@ -5,23 +5,25 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
-from typing import Callable
 import numpy as np
 from pyvale.core.field import IField
 from pyvale.core.integratorspatial import (IIntegratorSpatial,
-                                           create_int_pt_array)
+                                           IntPtCache,
+                                           contract_int_pt_vals)
 from pyvale.core.sensordata import SensorData
+from pyvale.core.integratortype import EIntSpatialType
+from pyvale.core.integratorrules import get_quadrature_rule
 
 
 class Quadrature2D(IIntegratorSpatial):
-    __slots__ = ("_field","_area","_n_gauss_pts","_gauss_pt_offsets"
-                 ,"_gauss_weight_func","_gauss_pts","_averages","_sens_data")
+    __slots__ = ("_field","_area","_n_gauss_pts","_gauss_pt_cache"
+                 ,"_gauss_weights","_averages","_sens_data")
 
     def __init__(self,
                  field: IField,
                  sens_data: SensorData,
                  gauss_pt_offsets: np.ndarray,
-                 gauss_weight_func: Callable) -> None:
+                 gauss_weights: np.ndarray) -> None:
 
         self._field = field
         self._sens_data = sens_data
@@ -29,11 +31,14 @@ class Quadrature2D(IIntegratorSpatial):
             self._sens_data.spatial_dims[1]
 
         self._n_gauss_pts = gauss_pt_offsets.shape[0]
-        self._gauss_pt_offsets = gauss_pt_offsets
-        self._gauss_weight_func = gauss_weight_func
-
-        self._gauss_pts = create_int_pt_array(self._sens_data,
-                                              self._gauss_pt_offsets)
+        # Points are created on the first evaluation and reused until the
+        # sensor positions or angles change
+        self._gauss_pt_cache = IntPtCache(gauss_pt_offsets)
+        # NOTE: coeff comes from changing gauss interval from [-1,1] to [a,b] -
+        # so (a-b)/2 * (a-b)/2 = sensor_area / 4, then need to divide by the
+        # integration area to convert to an average so the weights are scaled
+        # by 1/4 once here. shape=(n_gauss_pts,)
+        self._gauss_weights = gauss_weights/4
         self._averages = None
 
     def calc_integrals(self, sens_data: SensorData | None = None) -> np.ndarray:
@@ -49,33 +54,109 @@ class Quadrature2D(IIntegratorSpatial):
             self._sens_data = sens_data
 
         # shape=(n_sens*n_gauss_pts,n_dims)
-        self._gauss_pts = create_int_pt_array(self._sens_data,
-                                              self._gauss_pt_offsets)
+        gauss_pts = self._gauss_pt_cache.get_int_pts(self._sens_data)
 
-        # shape=(n_gauss_pts*n_sens,n_comps,n_timesteps)
-        gauss_vals = self._field.sample_field(self._gauss_pts,
+        # shape=(n_sens*n_gauss_pts,n_comps,n_timesteps)
+        gauss_vals = self._field.sample_field(gauss_pts,
                                               self._sens_data.sample_times,
                                               self._sens_data.angles)
 
-        meas_shape = (self._sens_data.positions.shape[0],
-                      gauss_vals.shape[1],
-                      gauss_vals.shape[2])
+        # shape=(n_sensors,n_comps,n_timsteps)=meas_shape
+        self._averages = contract_int_pt_vals(gauss_vals,self._gauss_weights)
+        return self._averages
 
-        # shape=(n_gauss_pts,n_sens,n_comps,n_timesteps)
-        gauss_vals = gauss_vals.reshape((self._n_gauss_pts,)+meas_shape,
-                                         order='F')
+    def get_averages(self) -> np.ndarray:
+        if self._averages is None:
+            self._averages = self.calc_averages()
 
-        # shape=(n_gauss_pts,n_sens,n_comps,n_timesteps)
-        gauss_weights = self._gauss_weight_func(meas_shape)
+        return self._averages
 
-        # NOTE: coeff comes from changing gauss interval from [-1,1] to [a,b] -
-        # so (a-b)/2 * (a-b)/2 = sensor_area / 4, then need to divide by the
-        # integration area to convert to an average:
-        # integrals = self._area/4 * np.sum(gauss_weights*gauss_vals,axis=0)
-        # self._averages = (1/self._area)*integrals
 
-        # shape=(n_sensors,n_comps,n_timsteps)=meas_shape
-        self._averages = 1/4 * np.sum(gauss_weights*gauss_vals,axis=0)
+class QuadratureGauss(IIntegratorSpatial):
+    """Spatial integrator using a Gauss quadrature rule of a given order over a
+    rectangle, cuboid, disk or cylinder, see `get_quadrature_rule`. The points
+    of all sensors are sampled in a single call to the field.
+
+    If a tolerance is specified the order is selected on the first evaluation
+    as the lowest order whose averages change by less than the tolerance
+    relative to the next order. Later evaluations (e.g. new sample times or
+    perturbed positions) reuse the selected order without further probes.
+    """
+    __slots__ = ("_field","_sens_data","_int_type","_max_order","_tol",
+                 "_order","_measure","_int_pt_cache","_int_weights",
+                 "_averages")
+
+    def __init__(self,
+                 field: IField,
+                 sens_data: SensorData,
+                 int_type: EIntSpatialType,
+                 order: int = 3,
+                 tol: float | None = None) -> None:
+        """Initialiser for the `QuadratureGauss` class.
+
+        Parameters
+        ----------
+        field : IField
+            The simulated physical field to average.
+        sens_data : SensorData
+            Contains the parameters of the sensor array including: positions,
+            sample times, angles and spatial dimensions.
+        int_type : EIntSpatialType
+            Region to average over, one of the Gauss spatial integrator types.
+        order : int, optional
+            Order of the quadrature rule or the maximum order if a tolerance is
+            specified, by default 3.
+        tol : float | None, optional
+            Relative tolerance for adaptive selection of the order, by default
+            None which uses the specified order.
+        """
+        self._field = field
+        self._sens_data = sens_data
+        self._int_type = int_type
+        self._max_order = order
+        self._tol = tol
+
+        rule = get_quadrature_rule(int_type,order)
+        self._measure = (rule.measure
+                         * np.prod(sens_data.spatial_dims[:rule.n_dims]))
+
+        self._order = None
+        self._int_pt_cache = None
+        self._int_weights = None
+        if tol is None:
+            self._set_order(order,IntPtCache(self._get_pt_offsets(order)))
+
+        self._averages = None
+
+    def get_order(self) -> int | None:
+        """Gets the order of the quadrature rule, None if the order is selected
+        adaptively and has not been selected yet.
+
+        Returns
+        -------
+        int | None
+            Order of the quadrature rule.
+        """
+        return self._order
+
+    def calc_integrals(self, sens_data: SensorData | None = None) -> np.ndarray:
+        self._averages = self.calc_averages(sens_data)
+        return self._measure*self.get_averages()
+
+    def get_integrals(self) -> np.ndarray:
+        return self._measure*self.get_averages()
+
+    def calc_averages(self, sens_data: SensorData | None = None) -> np.ndarray:
+
+        if sens_data is not None:
+            self._sens_data = sens_data
+
+        if self._int_pt_cache is None:
+            self._averages = self._select_order()
+            return self._averages
+
+        self._averages = self._calc_rule_averages(self._int_pt_cache,
+                                                  self._int_weights)
         return self._averages
 
     def get_averages(self) -> np.ndarray:
@@ -84,15 +165,58 @@ class Quadrature2D(IIntegratorSpatial):
 
         return self._averages
 
+    def _get_pt_offsets(self, order: int) -> np.ndarray:
+        rule = get_quadrature_rule(self._int_type,order)
+        return rule.pt_offsets*self._sens_data.spatial_dims
+
+    def _set_order(self, order: int, int_pt_cache: IntPtCache) -> None:
+        self._order = order
+        self._int_pt_cache = int_pt_cache
+        self._int_weights = get_quadrature_rule(self._int_type,order).weights
+
+    def _calc_rule_averages(self,
+                            int_pt_cache: IntPtCache,
+                            int_weights: np.ndarray) -> np.ndarray:
+        # shape=(n_sens*n_int_pts,n_dims)
+        int_pts = int_pt_cache.get_int_pts(self._sens_data)
+
+        # shape=(n_sens*n_int_pts,n_comps,n_timesteps)
+        int_vals = self._field.sample_field(int_pts,
+                                            self._sens_data.sample_times,
+                                            self._sens_data.angles)
+
+        # shape=(n_sensors,n_comps,n_timsteps)
+        return contract_int_pt_vals(int_vals,int_weights)
+
+    def _select_order(self) -> np.ndarray:
+        prev_cache = IntPtCache(self._get_pt_offsets(1))
+        prev_avgs = self._calc_rule_averages(
+            prev_cache,
+            get_quadrature_rule(self._int_type,1).weights)
+
+        for oo in range(2,self._max_order+1):
+            curr_cache = IntPtCache(self._get_pt_offsets(oo))
+            curr_avgs = self._calc_rule_averages(
+                curr_cache,
+                get_quadrature_rule(self._int_type,oo).weights)
+
+            # Difference to the next order estimates the error of this order
+            avg_scale = np.max(np.abs(curr_avgs))
+            if np.max(np.abs(curr_avgs-prev_avgs)) <= self._tol*avg_scale:
+                self._set_order(oo-1,prev_cache)
+                return prev_avgs
+
+            (prev_cache,prev_avgs) = (curr_cache,curr_avgs)
+
+        self._set_order(self._max_order,prev_cache)
+        return prev_avgs
 
-def create_gauss_weights_2d_4pts(meas_shape: tuple[int,int,int]) -> np.ndarray:
-    return np.ones((4,)+meas_shape)
 
+def create_gauss_weights_2d_4pts() -> np.ndarray:
+    # shape=(4,)
+    return np.ones((4,))
 
-def create_gauss_weights_2d_9pts(meas_shape: tuple[int,int,int]) -> np.ndarray:
-    # shape=(9,)+meas_shape
-    gauss_weights = np.vstack((25/81 * np.ones((4,)+meas_shape),
-                               40/81 * np.ones((4,)+meas_shape),
-                               64/81 * np.ones((1,)+meas_shape)))
-    return gauss_weights
 
+def create_gauss_weights_2d_9pts() -> np.ndarray:
+    # shape=(9,) matching the order of the gauss point offsets
+    return np.array(4*[25/81] + 4*[40/81] + [64/81])
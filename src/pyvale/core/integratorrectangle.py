@@ -8,15 +8,16 @@ Copyright (C) 2024 The Computer Aided Validation Team
 import numpy as np
 from pyvale.core.field import IField
 from pyvale.core.integratorspatial import (IIntegratorSpatial,
-                                           create_int_pt_array)
+                                           IntPtCache,
+                                           contract_int_pt_vals)
 from pyvale.core.sensordata import SensorData
 
 # NOTE: code below is very similar to quadrature integrator should be able to
 # refactor into injected classes/functions
 
 class Rectangle2D(IIntegratorSpatial):
-    __slots__ = ("_field","sens_data","_area","_area_int","_n_int_pts",
-                 "_int_pt_offsets","_int_pts","_averages")
+    __slots__ = ("_field","_sens_data","_area","_area_int","_n_int_pts",
+                 "_int_pt_cache","_int_weights","_averages")
 
     def __init__(self,
                  field: IField,
@@ -31,9 +32,12 @@ class Rectangle2D(IIntegratorSpatial):
         self._area_int = self._area/int_pt_offsets.shape[0]
 
         self._n_int_pts = int_pt_offsets.shape[0]
-        self._int_pt_offsets = int_pt_offsets
-        self._int_pts = create_int_pt_array(self._sens_data,
-                                            self._int_pt_offsets)
+        # Points are created on the first evaluation and reused until the
+        # sensor positions or angles change
+        self._int_pt_cache = IntPtCache(int_pt_offsets)
+        # Each point averages an equal area, shape=(n_int_pts,)
+        self._int_weights = np.full((self._n_int_pts,),
+                                    self._area_int/self._area)
 
         self._averages = None
 
@@ -52,25 +56,15 @@ class Rectangle2D(IIntegratorSpatial):
             self._sens_data = sens_data
 
         # shape=(n_sens*n_int_pts,n_dims)
-        self._int_pts = create_int_pt_array(self._sens_data,
-                                            self._int_pt_offsets)
+        int_pts = self._int_pt_cache.get_int_pts(self._sens_data)
 
-
-        # shape=(n_int_pts*n_sens,n_comps,n_timesteps)
-        int_vals = self._field.sample_field(self._int_pts,
+        # shape=(n_sens*n_int_pts,n_comps,n_timesteps)
+        int_vals = self._field.sample_field(int_pts,
                                             self._sens_data.sample_times,
                                             self._sens_data.angles)
 
-        meas_shape = (self._sens_data.positions.shape[0],
-                      int_vals.shape[1],
-                      int_vals.shape[2])
-
-        # shape=(n_gauss_pts,n_sens,n_comps,n_timesteps)
-        int_vals = int_vals.reshape((self._n_int_pts,)+meas_shape,
-                                     order='F')
-
         # shape=(n_sensors,n_comps,n_timsteps)
-        self._averages = 1/self._area * np.sum(self._area_int*int_vals,axis=0)
+        self._averages = contract_int_pt_vals(int_vals,self._int_weights)
 
         return self._averages
 
@@ -0,0 +1,206 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import threading
+from dataclasses import dataclass
+import numpy as np
+from scipy.special import roots_jacobi
+from pyvale.core.integratortype import EIntSpatialType
+
+
+@dataclass(slots=True)
+class QuadratureRule:
+    """Dataclass for a quadrature rule used to average a field over the area or
+    volume of a sensor. The rule is defined for a sensor with unit spatial
+    dimensions centred on the sensor position and is scaled by the spatial
+    dimensions of the sensor, see `SensorData`. Rules are shared between
+    integrators so the arrays are read only.
+    """
+
+    pt_offsets: np.ndarray
+    """Offsets of the quadrature points from the sensor position in local
+    coordinates for a sensor with unit spatial dimensions. shape=(num_pts,3)
+    """
+
+    weights: np.ndarray
+    """Weights of the quadrature points normalised to sum to one so the
+    weighted sum of the sampled values is the average. shape=(num_pts,)
+    """
+
+    measure: float
+    """Area or volume of the region for a sensor with unit spatial dimensions.
+    Multiplied by the product of the spatial dimensions used by the region to
+    convert averages to integrals.
+    """
+
+    n_dims: int
+    """Number of spatial dimensions of the region (2 for areas, 3 for volumes).
+    """
+
+
+def create_gauss_legendre_1d(order: int) -> tuple[np.ndarray,np.ndarray]:
+    """Creates a Gauss-Legendre rule on the unit interval [-0.5,0.5] with
+    weights summing to one. Exact for polynomials up to degree 2*order-1.
+
+    Parameters
+    ----------
+    order : int
+        Number of quadrature points.
+
+    Returns
+    -------
+    tuple[np.ndarray,np.ndarray]
+        Point coordinates and weights. shape=(order,)
+    """
+    (pts,weights) = np.polynomial.legendre.leggauss(order)
+    return (pts/2,weights/2)
+
+
+def create_gauss_rule_rect(order: int) -> QuadratureRule:
+    """Creates a tensor product Gauss-Legendre rule over a rectangle in the
+    local X-Y plane.
+
+    Parameters
+    ----------
+    order : int
+        Number of quadrature points along each axis.
+
+    Returns
+    -------
+    QuadratureRule
+        Quadrature rule with order**2 points.
+    """
+    (pts,weights) = create_gauss_legendre_1d(order)
+    (pts_x,pts_y) = np.meshgrid(pts,pts,indexing="ij")
+    pt_offsets = np.column_stack((pts_x.ravel(),
+                                  pts_y.ravel(),
+                                  np.zeros(order**2)))
+    return QuadratureRule(pt_offsets,np.outer(weights,weights).ravel(),1.0,2)
+
+
+def create_gauss_rule_box(order: int) -> QuadratureRule:
+    """Creates a tensor product Gauss-Legendre rule over a cuboid.
+
+    Parameters
+    ----------
+    order : int
+        Number of quadrature points along each axis.
+
+    Returns
+    -------
+    QuadratureRule
+        Quadrature rule with order**3 points.
+    """
+    (pts,weights) = create_gauss_legendre_1d(order)
+    pts_xyz = np.meshgrid(pts,pts,pts,indexing="ij")
+    pt_offsets = np.column_stack([pp.ravel() for pp in pts_xyz])
+    weights = np.einsum("i,j,k->ijk",weights,weights,weights).ravel()
+    return QuadratureRule(pt_offsets,weights,1.0,3)
+
+
+def create_gauss_rule_disk(order: int) -> QuadratureRule:
+    """Creates a polar product rule over a disk in the local X-Y plane. The
+    radial points are Gauss-Jacobi points which include the radial weighting of
+    the area and the angular points are equally spaced. Exact for polynomials
+    in X and Y up to degree 2*order-1. The disk has unit diameter so spatial
+    dimensions with different X and Y sizes give an ellipse.
+
+    Parameters
+    ----------
+    order : int
+        Number of radial points, there are 2*order angular points.
+
+    Returns
+    -------
+    QuadratureRule
+        Quadrature rule with 2*order**2 points.
+    """
+    # Roots and weights for the weight function (1+x) on [-1,1], which maps to
+    # the weight r on the radius, the weights sum to 2
+    (roots,rad_weights) = roots_jacobi(order,0.0,1.0)
+    radii = (1.0+roots)/4
+    n_angles = 2*order
+    angles = 2*np.pi*(np.arange(n_angles)+0.5)/n_angles
+
+    pt_offsets = np.column_stack((np.outer(radii,np.cos(angles)).ravel(),
+                                  np.outer(radii,np.sin(angles)).ravel(),
+                                  np.zeros(order*n_angles)))
+    weights = np.repeat(rad_weights/(2*n_angles),n_angles)
+    return QuadratureRule(pt_offsets,weights,np.pi/4,2)
+
+
+def create_gauss_rule_cylinder(order: int) -> QuadratureRule:
+    """Creates a rule over a cylinder with its axis along the local Z axis as
+    the product of the disk rule and a Gauss-Legendre rule along the axis.
+
+    Parameters
+    ----------
+    order : int
+        Number of radial and axial points, see `create_gauss_rule_disk`.
+
+    Returns
+    -------
+    QuadratureRule
+        Quadrature rule with 2*order**3 points.
+    """
+    disk_rule = create_gauss_rule_disk(order)
+    (pts_z,weights_z) = create_gauss_legendre_1d(order)
+
+    pt_offsets = np.tile(disk_rule.pt_offsets,(order,1))
+    pt_offsets[:,2] = np.repeat(pts_z,disk_rule.pt_offsets.shape[0])
+    weights = np.outer(weights_z,disk_rule.weights).ravel()
+    return QuadratureRule(pt_offsets,weights,np.pi/4,3)
+
+
+_RULE_BUILDERS = {EIntSpatialType.GAUSSRECT: create_gauss_rule_rect,
+                  EIntSpatialType.GAUSSBOX: create_gauss_rule_box,
+                  EIntSpatialType.GAUSSDISK: create_gauss_rule_disk,
+                  EIntSpatialType.GAUSSCYL: create_gauss_rule_cylinder}
+
+# NOTE: rules only depend on the region and order so are built once per process
+_rule_cache = {}
+_rule_lock = threading.Lock()
+
+
+def get_quadrature_rule(int_type: EIntSpatialType,
+                        order: int) -> QuadratureRule:
+    """Gets the quadrature rule for the given region and order, the rule is
+    built on the first request and then cached.
+
+    Parameters
+    ----------
+    int_type : EIntSpatialType
+        Region of the rule, one of the Gauss spatial integrator types.
+    order : int
+        Order of the rule, see the rule creation functions for each region.
+
+    Returns
+    -------
+    QuadratureRule
+        The shared quadrature rule with read only arrays.
+
+    Raises
+    ------
+    ValueError
+        The integrator type is not a Gauss rule or the order is less than 1.
+    """
+    if int_type not in _RULE_BUILDERS:
+        raise ValueError(f"{int_type} does not have a Gauss quadrature rule.")
+    if order < 1:
+        raise ValueError("Quadrature rule order must be at least 1.")
+
+    key = (int_type,order)
+    with _rule_lock:
+        if key in _rule_cache:
+            return _rule_cache[key]
+
+        rule = _RULE_BUILDERS[int_type](order)
+        rule.pt_offsets.flags.writeable = False
+        rule.weights.flags.writeable = False
+        _rule_cache[key] = rule
+
+    return rule
@@ -7,7 +7,7 @@ Copyright (C) 2024 The Computer Aided Validation Team
 """
 from abc import ABC, abstractmethod
 import numpy as np
-from pyvale.core.sensordata import SensorData
+from pyvale.core.sensordata import SensorData, tile_sensor_rotation
 
 
 def create_int_pt_array(sens_data: SensorData,
@@ -21,7 +21,8 @@ def create_int_pt_array(sens_data: SensorData,
     sens_data : SensorData
         Contains the parameters of the sensor array including: positions, sample
         times and orientations. If specified the sensor orientations are used
-        to rotate the positions of the integration points.
+        to rotate the positions of the integration points with all sensors
+        rotated together as a stacked rotation.
     int_pt_offsets : np.ndarray
         Offsets of the intergation points in non-rotated local coordinates.
 
@@ -30,23 +31,108 @@ def create_int_pt_array(sens_data: SensorData,
     np.ndarray
         The integration point locations in world (simulation) coordinates. The
         rows of the array are all the integration points for all sensors and the
-        columns are the X,Y,Z coordinates. shape=(num_sensors*num_int_points,3).
+        columns are the X,Y,Z coordinates. The integration points of each
+        sensor are contiguous so sampled values can be reshaped to shape=(
+        num_sensors,num_int_points,...) without a copy.
+        shape=(num_sensors*num_int_points,3).
     """
-    n_sens = sens_data.positions.shape[0]
-    n_int_pts = int_pt_offsets.shape[0]
+    if sens_data.angles is None:
+        # shape=(1,n_int_pts,n_dims)
+        offset_array = int_pt_offsets[np.newaxis,:,:]
+    else:
+        # shape=(n_sens|1,n_dims,n_dims), a single rotation applies to all and
+        # rotations per sensor are repeated for stacked batch positions
+        rot_mats = tile_sensor_rotation(
+            sens_data.angles,
+            sens_data.positions.shape[0]).as_matrix()
+        # shape=(n_sens|1,n_int_pts,n_dims)
+        offset_array = np.einsum("sij,pj->spi",rot_mats,int_pt_offsets)
+
+    # Broadcast sum so the points are written once, shape=(n_sens,n_int_pts,
+    # n_dims) flattened to shape=(n_sens*n_int_pts,n_dims)
+    int_pt_array = sens_data.positions[:,np.newaxis,:] + offset_array
+    return int_pt_array.reshape(-1,int_pt_offsets.shape[1])
+
+
+class IntPtCache:
+    """Cache of the integration point locations of a spatial integrator. The
+    points are only recalculated when the sensor positions or angles change so
+    repeated evaluations with new sample times (e.g. measurement windows or new
+    simulation data) reuse the same point array. Reusing the same point array
+    also means the sample plan is found in the plan cache of the mesh without
+    locating the points again.
+    """
+    __slots__ = ("_int_pt_offsets","_positions","_angles","_int_pts")
+
+    def __init__(self, int_pt_offsets: np.ndarray) -> None:
+        """Initialiser for the `IntPtCache` class.
 
-    # shape=(n_sens*n_int_pts,n_dims)
-    offset_array = np.tile(int_pt_offsets,(n_sens,1))
+        Parameters
+        ----------
+        int_pt_offsets : np.ndarray
+            Offsets of the integration points in non-rotated local coordinates.
+            shape=(num_int_points,3)
+        """
+        self._int_pt_offsets = int_pt_offsets
+        self._positions = None
+        self._angles = None
+        self._int_pts = None
 
-    if sens_data.angles is not None:
-        for ii,rr in enumerate(sens_data.angles):
-            offset_array[ii*n_int_pts:(ii+1)*n_int_pts,:] = \
-                np.matmul(rr.as_matrix(),int_pt_offsets.T).T
+    def get_int_pts(self, sens_data: SensorData) -> np.ndarray:
+        """Gets the integration point locations for the sensor array,
+        recalculating them only if the sensor positions or angles have changed
+        since the last call.
 
-    # shape=(n_sens*n_int_pts,n_dims)
-    int_pt_array = np.repeat(sens_data.positions,int_pt_offsets.shape[0],axis=0)
+        Parameters
+        ----------
+        sens_data : SensorData
+            Contains the parameters of the sensor array including: positions
+            and orientations.
 
-    return int_pt_array + offset_array
+        Returns
+        -------
+        np.ndarray
+            The integration point locations in world (simulation) coordinates,
+            see `create_int_pt_array`. shape=(num_sensors*num_int_points,3).
+        """
+        # NOTE: rotations and tuples are immutable so the angles are compared by
+        # identity but the positions can be modified in place so are copied
+        if (self._int_pts is not None
+            and sens_data.angles is self._angles
+            and np.array_equal(sens_data.positions,self._positions)):
+            return self._int_pts
+
+        self._int_pts = create_int_pt_array(sens_data,self._int_pt_offsets)
+        self._positions = sens_data.positions.copy()
+        self._angles = sens_data.angles
+        return self._int_pts
+
+
+def contract_int_pt_vals(int_vals: np.ndarray,
+                         int_weights: np.ndarray) -> np.ndarray:
+    """Contracts the values sampled at the integration points of each sensor
+    with the integration weights without broadcasting the weights to the full
+    size of the sampled values.
+
+    Parameters
+    ----------
+    int_vals : np.ndarray
+        Values sampled at the integration points in the order given by
+        `create_int_pt_array`. shape=(num_sensors*num_int_points,
+        num_field_components,num_time_steps)
+    int_weights : np.ndarray
+        Weight of each integration point. shape=(num_int_points,)
+
+    Returns
+    -------
+    np.ndarray
+        Weighted sum over the integration points of each sensor.
+        shape=(num_sensors,num_field_components,num_time_steps)
+    """
+    n_int_pts = int_weights.shape[0]
+    # shape=(n_sens,n_int_pts,n_comps,n_timesteps), a view of the input
+    int_vals = int_vals.reshape((-1,n_int_pts)+int_vals.shape[1:])
+    return np.einsum("spct,p->sct",int_vals,int_weights)
 
 
 class IIntegratorSpatial(ABC):
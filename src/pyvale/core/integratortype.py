@@ -26,9 +26,29 @@ class EIntSpatialType(enum.Enum):
 
     QUAD9PT
         Gaussia quadrature 2D integrator over 9 points.
+
+    GAUSSRECT
+        Tensor product Gauss-Legendre 2D integrator over a rectangle with the
+        order set by the sensor data.
+
+    GAUSSBOX
+        Tensor product Gauss-Legendre 3D integrator over a cuboid with the
+        order set by the sensor data.
+
+    GAUSSDISK
+        Polar Gauss 2D integrator over a disk (or ellipse) in the local X-Y
+        plane with the order set by the sensor data.
+
+    GAUSSCYL
+        Gauss 3D integrator over a cylinder with its axis along the local Z
+        axis with the order set by the sensor data.
     """
     RECT1PT = enum.auto()
     RECT4PT = enum.auto()
     RECT9PT = enum.auto()
     QUAD4PT = enum.auto()
     QUAD9PT = enum.auto()
+    GAUSSRECT = enum.auto()
+    GAUSSBOX = enum.auto()
+    GAUSSDISK = enum.auto()
+    GAUSSCYL = enum.auto()
@@ -0,0 +1,141 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+from collections.abc import Iterator
+from dataclasses import dataclass, replace
+import numpy as np
+from pyvale.core.field import IField
+from pyvale.core.sensordata import SensorData
+from pyvale.core.errorintegrator import ErrIntegrator
+from pyvale.core.fieldsampler import sample_field_with_sensor_data
+from pyvale.core.integratorfactory import SpatialAveragerCache
+
+
+@dataclass(slots=True)
+class MeasurementWindow:
+    """Dataclass holding the truth, errors and measurements of a sensor array
+    for a window of its sample times. Created by the `iter_measurements()`
+    method of sensor arrays so that long time series can be processed in
+    chunks with bounded memory.
+    """
+
+    time_start: int
+    """Index of the first sample time in this window.
+    """
+
+    time_stop: int
+    """Index one past the last sample time in this window.
+    """
+
+    sample_times: np.ndarray
+    """Sample times in this window. shape=(num_window_time_steps,)
+    """
+
+    truth: np.ndarray
+    """Ground truth sensor values. shape=(num_sensors,num_field_components,
+    num_window_time_steps)
+    """
+
+    measurements: np.ndarray
+    """Simulated sensor measurements including errors. shape=(num_sensors,
+    num_field_components,num_window_time_steps)
+    """
+
+    errs_total: np.ndarray | None = None
+    """Total errors, None if the sensor array has no error integrator.
+    shape=(num_sensors,num_field_components,num_window_time_steps)
+    """
+
+    errs_systematic: np.ndarray | None = None
+    """Summed systematic errors, None if the sensor array has no error
+    integrator. shape=(num_sensors,num_field_components,num_window_time_steps)
+    """
+
+    errs_random: np.ndarray | None = None
+    """Summed random errors, None if the sensor array has no error integrator.
+    shape=(num_sensors,num_field_components,num_window_time_steps)
+    """
+
+
+def iter_measurement_windows(field: IField,
+                             sensor_data: SensorData,
+                             err_int: ErrIntegrator | None,
+                             dtype: np.dtype,
+                             chunk_steps: int,
+                             averager: SpatialAveragerCache | None = None,
+                             ) -> Iterator[MeasurementWindow]:
+    """Generator calculating one simulated experiment for a sensor array in
+    windows of its sample times. Only the arrays for the current window are
+    allocated so the peak memory is bounded by the window size rather than the
+    number of sample times.
+
+    The window of the sample times is passed to the field sampler and error
+    chain as the nominal sensor state of the window. Systematic errors are held
+    constant over all windows of the experiment and drift is calculated from
+    the absolute sample times so the windows are consistent with each other.
+    Random errors are drawn per window so only the systematic errors match a
+    full experiment, see `ErrIntegrator.calc_errors_time_window()`.
+
+    Parameters
+    ----------
+    field : IField
+        The simulated physical field that the sensors sample from.
+    sensor_data : SensorData
+        Nominal sensor array parameters.
+    err_int : ErrIntegrator | None
+        Error integrator for the sensor array, if None only the truth is
+        calculated.
+    dtype : np.dtype
+        Floating point type of the truth and measurement arrays.
+    chunk_steps : int
+        Maximum number of sample times in each window.
+    averager : SpatialAveragerCache | None, optional
+        Persistent spatial integrator of the sensor array. If None then one is
+        created for this experiment. The integration points and sample plan are
+        shared by all windows as only the sample times change, by default None.
+
+    Yields
+    ------
+    MeasurementWindow
+        Truth, errors and measurements for each window of sample times in
+        order. If the error integrator reuses its buffers then the error arrays
+        are overwritten by the next window.
+    """
+    chunk_steps = max(chunk_steps,1)
+
+    sample_times = sensor_data.sample_times
+    if sample_times is None:
+        sample_times = field.get_time_steps()
+
+    if averager is None:
+        averager = SpatialAveragerCache()
+    integrator = averager.get_integrator(field,sensor_data)
+
+    for ss in range(0,sample_times.shape[0],chunk_steps):
+        tt = min(ss+chunk_steps,sample_times.shape[0])
+        window_data = replace(sensor_data,sample_times=sample_times[ss:tt])
+
+        truth = sample_field_with_sensor_data(
+            field,
+            window_data,
+            integrator).astype(dtype,copy=False)
+
+        if err_int is None:
+            yield MeasurementWindow(ss,tt,window_data.sample_times,truth,truth)
+            continue
+
+        errs_total = err_int.calc_errors_time_window(truth,
+                                                     window_data,
+                                                     ss)
+        yield MeasurementWindow(ss,
+                                tt,
+                                window_data.sample_times,
+                                truth,
+                                truth + errs_total,
+                                errs_total,
+                                err_int.get_errs_systematic(),
+                                err_int.get_errs_random())
@@ -0,0 +1,216 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+import pyvista as pv
+import mooseherder as mh
+from pyvale.core.fieldconverter import (conv_simdata_to_cells,
+                                        build_pyvista_grid)
+from pyvale.core.fieldsampleplan import SamplePlanCache
+from pyvale.core.diskcache import get_disk_cache
+from pyvale.core.hashtools import hash_arrays
+
+
+def hash_sim_mesh(sim_data: mh.SimData, spat_dim: int) -> str:
+    """Creates a hash key for the mesh in a `SimData` object based on the nodal
+    coordinates and the connectivity of every element block. The field data is
+    not included so different simulations on the same mesh share the same key.
+
+    Parameters
+    ----------
+    sim_data : mh.SimData
+        Object containing a mesh and associated field data from a simulation.
+    spat_dim : int
+        Number of spatial dimensions (2 or 3) used to determine the element
+        types, included in the key as it changes the converted mesh.
+
+    Returns
+    -------
+    str
+        Hexadecimal hash string identifying the mesh.
+    """
+    mesh_arrays = [np.array(spat_dim),sim_data.coords]
+    for cc in sim_data.connect:
+        mesh_arrays.extend((np.array(cc),sim_data.connect[cc]))
+    return hash_arrays(mesh_arrays)
+
+
+@dataclass(slots=True)
+class MeshEntry:
+    """Dataclass for a converted mesh shared by all fields and sensor arrays on
+    the same simulation mesh, see `MeshRegistry`.
+    """
+
+    mesh_key: str
+    """Hash key identifying the mesh, see `hash_sim_mesh`.
+    """
+
+    grid: pv.UnstructuredGrid
+    """Pyvista grid holding only the mesh without any field data. This grid is
+    shared and should not be modified, use `create_grids()` to get grids with
+    field data attached.
+    """
+
+    sample_plans: SamplePlanCache
+    """Cache of sample plans (point locations and interpolation weights) on this
+    mesh shared by all fields so each set of sensor points is only located once.
+    """
+
+    def create_grids(self,
+                     sim_data: mh.SimData,
+                     components: tuple[str,...] | None,
+                     ) -> tuple[pv.UnstructuredGrid,pv.UnstructuredGrid]:
+        """Creates a sampling grid and a visualisation grid as shallow copies of
+        the shared mesh so the points and cells are not copied. The field
+        components are attached to the sampling grid only.
+
+        Parameters
+        ----------
+        sim_data : mh.SimData
+            Simulation data object containing the field to attach. The mesh
+            must be the mesh of this entry.
+        components : tuple[str,...] | None
+            String keys for the components of the field to attach to the
+            sampling grid. If None then no field data is attached.
+
+        Returns
+        -------
+        tuple[pv.UnstructuredGrid,pv.UnstructuredGrid]
+            The first UnstructuredGrid has the field components attached as
+            dataset arrays. The second has no field data attached for
+            visualisation.
+        """
+        pv_grid = self.grid.copy(deep=False)
+        pv_grid_vis = self.grid.copy(deep=False)
+
+        if components is not None and sim_data.node_vars is not None:
+            for cc in components:
+                pv_grid[cc] = sim_data.node_vars[cc]
+
+        return (pv_grid,pv_grid_vis)
+
+
+class MeshRegistry:
+    """Least recently used (LRU) registry of converted simulation meshes keyed
+    by the hash of the nodal coordinates and connectivity. Fields and sensor
+    arrays that sample the same mesh (e.g. temperature, displacement and strain
+    fields from one thermo-mechanical simulation, or many simulations on the
+    same mesh) share one converted pyvista mesh and one cache of sample plans
+    rather than converting the mesh and locating the sensors for each field.
+
+    If an on disk cache has been set (see `set_disk_cache`) then converted
+    meshes are stored on disk and loaded instead of being converted again in
+    later processes.
+
+    The registry holds a reference to each stored mesh and its sample plan
+    cache (including up to two NumPy cell locators, see `SamplePlanCache`)
+    until the mesh is evicted as the least recently used or `clear()` is
+    called. At most `max_meshes` meshes are kept alive by the registry even
+    after all fields using them have been deleted. Sampled values do not
+    depend on which plans are stored so clearing the registry only affects
+    the speed of sampling.
+    """
+    __slots__ = ("_max_meshes","_meshes","_lock")
+
+    def __init__(self, max_meshes: int = 8) -> None:
+        """Initialiser for the `MeshRegistry` class.
+
+        Parameters
+        ----------
+        max_meshes : int, optional
+            Maximum number of meshes to store before the least recently used
+            mesh is discarded, by default 8.
+        """
+        self._max_meshes = max_meshes
+        self._meshes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_mesh(self, sim_data: mh.SimData, spat_dim: int) -> MeshEntry:
+        """Gets the converted mesh for the simulation data, converting and
+        storing the mesh if it has not been requested before.
+
+        Parameters
+        ----------
+        sim_data : mh.SimData
+            Object containing a mesh and associated field data from a
+            simulation.
+        spat_dim : int
+            Number of spatial dimensions (2 or 3) used to determine the element
+            types in the mesh.
+
+        Returns
+        -------
+        MeshEntry
+            The shared converted mesh and sample plan cache.
+        """
+        mesh_key = hash_sim_mesh(sim_data,spat_dim)
+
+        with self._lock:
+            if mesh_key in self._meshes:
+                self._meshes.move_to_end(mesh_key)
+                return self._meshes[mesh_key]
+
+            mesh_grid = _load_or_conv_mesh(mesh_key,sim_data,spat_dim)
+            mesh_entry = MeshEntry(mesh_key,mesh_grid,SamplePlanCache())
+            self._meshes[mesh_key] = mesh_entry
+            if len(self._meshes) > self._max_meshes:
+                self._meshes.popitem(last=False)
+
+        return mesh_entry
+
+    def clear(self) -> None:
+        """Removes all stored meshes and their sample plans.
+        """
+        with self._lock:
+            self._meshes.clear()
+
+
+def _load_or_conv_mesh(mesh_key: str,
+                       sim_data: mh.SimData,
+                       spat_dim: int) -> pv.UnstructuredGrid:
+    disk_cache = get_disk_cache()
+    disk_key = f"mesh-{mesh_key}"
+
+    cells = None
+    if disk_cache is not None:
+        cells = disk_cache.load(disk_key)
+
+    if cells is None:
+        (offsets,connect,cell_types) = conv_simdata_to_cells(sim_data,spat_dim)
+        cells = {"offsets": offsets,
+                 "connect": connect,
+                 "cell_types": cell_types}
+        if disk_cache is not None:
+            disk_cache.save(disk_key,cells)
+
+    # Nodal coordinates are part of the key and already in memory so only the
+    # cells are stored on disk
+    return build_pyvista_grid(sim_data.coords,
+                              cells["offsets"],
+                              cells["connect"],
+                              cells["cell_types"])
+
+
+# NOTE: fields get the registry when their simulation data is set rather than
+# holding a reference so copies of fields (e.g. for worker threads) share it
+_mesh_registry = MeshRegistry()
+
+
+def get_mesh_registry() -> MeshRegistry:
+    """Gets the registry of converted meshes shared by all fields. Call
+    `clear()` on the registry to release the stored meshes, sample plans and
+    cell locators.
+
+    Returns
+    -------
+    MeshRegistry
+        The shared mesh registry.
+    """
+    return _mesh_registry
@@ -6,8 +6,10 @@ Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 import numpy as np
 from pyvale.core.field import IField
+from pyvale.core.measurementwindow import MeasurementWindow
 
 
 class ISensorArray(ABC):
@@ -66,6 +68,21 @@ class ISensorArray(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_dtype(self) -> np.dtype:
+        """Abstract method. Gets the floating point type of the truth, error
+        and measurement arrays calculated by this sensor array. Interpolation
+        and other accuracy sensitive calculations can be performed at higher
+        precision internally but the returned arrays will have this type.
+
+        Returns
+        -------
+        np.dtype
+            Floating point type of the measurement arrays, e.g. float64 or
+            float32.
+        """
+        pass
+
     @abstractmethod
     def get_field(self) -> IField:
         """Abstract method. Gets the field object that this array of sensors is
@@ -92,6 +109,21 @@ class ISensorArray(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_valid_mask(self) -> np.ndarray:
+        """Abstract method. Gets the mask of the nominal sensor positions that
+        are inside the mesh, found when the ground truth values are calculated.
+        If the ground truth values have not been calculated then
+        `calc_truth_values()` is called first.
+
+        Returns
+        -------
+        np.ndarray
+            Mask that is True for the sensors inside the mesh.
+            shape=(num_sensors,)
+        """
+        pass
+
     @abstractmethod
     def get_errors_systematic(self) -> np.ndarray | None:
         """Abstract method. Gets the systematic error array from the previously
@@ -156,6 +188,72 @@ class ISensorArray(ABC):
         """
         pass
 
+    @abstractmethod
+    def calc_measurements_batch(self, n_real: int) -> np.ndarray:
+        """Abstract method. Calculates a batch of independent sets of
+        measurements (simulated experiments) for this sensor array in one pass
+        over the error chain.
+
+        NOTE: this is a 'calc' method and will sample all probability
+        distributions in the error chain returning new simulated experiments
+        for this sensor array.
+
+        Parameters
+        ----------
+        n_real : int
+            Number of realisations (simulated experiments) to calculate.
+
+        Returns
+        -------
+        np.ndarray
+            The calculated measurements for this sensor array with shape:
+            (num_real,num_sensors,num_field_components,num_time_steps)
+        """
+        pass
+
+    @abstractmethod
+    def iter_measurements(self,
+                          chunk_steps: int) -> Iterator[MeasurementWindow]:
+        """Abstract method. Calculates one set of measurements (simulated
+        experiment) for this sensor array in windows of the sample times,
+        yielding the truth, errors and measurements of each window in turn so
+        that long time series can be processed with peak memory bounded by the
+        window size. Systematic errors are constant and drift is continuous
+        across the windows of the experiment. Random errors are drawn per
+        window so they are not the same draws as a full `calc_measurements()`
+        call.
+
+        NOTE: this is a 'calc' method and will sample all probability
+        distributions in the error chain returning a new simulated experiment
+        for this sensor array. The stored truth and measurements returned by
+        the 'get' methods are not modified.
+
+        Parameters
+        ----------
+        chunk_steps : int
+            Maximum number of sample times in each window.
+
+        Yields
+        ------
+        MeasurementWindow
+            Truth, errors and measurements for each window of sample times.
+        """
+        pass
+
+    @abstractmethod
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Abstract method. Reseeds the random generators of all errors in the
+        error chain of this sensor array so that the simulated experiments are
+        reproducible for a given seed. Does nothing if there is no error
+        integrator.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the error chain. If None then fresh entropy is used.
+        """
+        pass
+
     @abstractmethod
     def get_measurements(self) -> np.ndarray:
         """Abstract method. Returns the current set of simulated measurements if
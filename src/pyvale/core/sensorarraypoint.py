@@ -5,13 +5,17 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
+from collections.abc import Iterator
 import numpy as np
 from pyvale.core.field import IField
 from pyvale.core.sensorarray import ISensorArray
 from pyvale.core.errorintegrator import ErrIntegrator
 from pyvale.core.sensordescriptor import SensorDescriptor
 from pyvale.core.sensordata import SensorData
-from pyvale.core.fieldsampler import sample_field_with_sensor_data
+from pyvale.core.fieldsampler import sample_field_with_sensor_mask
+from pyvale.core.integratorfactory import SpatialAveragerCache
+from pyvale.core.measurementwindow import (MeasurementWindow,
+                                           iter_measurement_windows)
 
 
 class SensorArrayPoint(ISensorArray):
@@ -54,12 +58,14 @@ class SensorArrayPoint(ISensorArray):
     """
 
     __slots__ = ("field","descriptor","sensor_data","_truth","_measurements",
-                 "error_integrator")
+                 "error_integrator","_dtype","_spatial_averager",
+                 "_valid_mask")
 
     def __init__(self,
                  sensor_data: SensorData,
                  field: IField,
                  descriptor: SensorDescriptor | None = None,
+                 dtype: np.dtype | type = np.float64,
                  ) -> None:
         """Initialiser for the `SensorArrayPoint` class.
 
@@ -75,6 +81,11 @@ class SensorArrayPoint(ISensorArray):
         descriptor : SensorDescriptor | None, optional
             Contains descriptive information about the sensor array for display
             and visualisations, by default None.
+        dtype : np.dtype | type, optional
+            Floating point type of the truth, error and measurement arrays, by
+            default np.float64. Using np.float32 halves the memory and
+            bandwidth of large sensor arrays, the field interpolation is still
+            performed in double precision and then cast to this type.
         """
         self.sensor_data = sensor_data
         self.field = field
@@ -84,8 +95,14 @@ class SensorArrayPoint(ISensorArray):
         if descriptor is not None:
             self.descriptor = descriptor
 
+        self._dtype = np.dtype(dtype)
         self._truth = None
+        self._valid_mask = None
         self._measurements = None
+        # Persistent spatial integrator, only rebuilt if the field or spatial
+        # averaging changes and only relocates its integration points if the
+        # sensor positions or angles change
+        self._spatial_averager = SpatialAveragerCache()
 
     def get_sample_times(self) -> np.ndarray:
         """Gets the times at which the sensors sample the given physical field.
@@ -117,6 +134,17 @@ class SensorArrayPoint(ISensorArray):
                 len(self.field.get_all_components()),
                 self.get_sample_times().shape[0])
 
+    def get_dtype(self) -> np.dtype:
+        """Gets the floating point type of the truth, error and measurement
+        arrays calculated by this sensor array.
+
+        Returns
+        -------
+        np.dtype
+            Floating point type of the measurement arrays.
+        """
+        return self._dtype
+
     def get_field(self) -> IField:
         """Gets a reference to the physical field that this sensor array
         is applied to.
@@ -140,8 +168,13 @@ class SensorArrayPoint(ISensorArray):
             Array of ground truth sensor values. shape=(num_sensors,
             num_field_components,num_time_steps).
         """
-        self._truth = sample_field_with_sensor_data(self.field,
-                                                    self.sensor_data)
+        integrator = self._spatial_averager.get_integrator(self.field,
+                                                           self.sensor_data)
+        (truth,self._valid_mask) = sample_field_with_sensor_mask(
+            self.field,
+            self.sensor_data,
+            integrator)
+        self._truth = truth.astype(self._dtype,copy=False)
 
         return self._truth
 
@@ -161,6 +194,23 @@ class SensorArrayPoint(ISensorArray):
 
         return self._truth
 
+    def get_valid_mask(self) -> np.ndarray:
+        """Gets the mask of the nominal sensor positions that are inside the
+        mesh. The mask is found when the ground truth values are calculated so
+        `calc_truth_values()` is called first if needed. Sensors outside the
+        mesh are sampled using the outside policy, see `EOutsidePolicy`.
+
+        Returns
+        -------
+        np.ndarray
+            Mask that is True for the sensors inside the mesh.
+            shape=(num_sensors,)
+        """
+        if self._valid_mask is None:
+            self.calc_truth_values()
+
+        return self._valid_mask
+
     def set_error_integrator(self, err_int: ErrIntegrator) -> None:
         """Sets the error intergrator that will be used to calculate the sensor
         array measurement errors when `calc_measurements()` is called. See the
@@ -173,6 +223,20 @@ class SensorArrayPoint(ISensorArray):
         """
         self.error_integrator = err_int
 
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        """Reseeds the random generators of all errors in the error chain so
+        that the simulated experiments are reproducible for a given seed. See
+        `ErrIntegrator.reseed()`. Does nothing if no error integrator is
+        specified.
+
+        Parameters
+        ----------
+        seed : int | np.random.SeedSequence | None
+            Seed for the error chain. If None then fresh entropy is used.
+        """
+        if self.error_integrator is not None:
+            self.error_integrator.reseed(seed)
+
     def get_sensor_data_perturbed(self) -> SensorData | None:
         """Gets the final sensor array parameters after all errors in the error
         integrator have been applied. If no error integrator is specified then
@@ -262,6 +326,61 @@ class SensorArrayPoint(ISensorArray):
 
         return self._measurements
 
+    def calc_measurements_batch(self, n_real: int) -> np.ndarray:
+        """Calculates a batch of independent sets of sensor measurements
+        (simulated experiments) in one pass over the error chain. Field based
+        errors sample the field once for the perturbed sensor states of all
+        realisations. If no error integrator is specified then the truth is
+        repeated for each realisation.
+
+        Parameters
+        ----------
+        n_real : int
+            Number of realisations (simulated experiments) to calculate.
+
+        Returns
+        -------
+        np.ndarray
+            Array of sensor measurements for each realisation. shape=(num_real,
+            num_sensors,num_field_components,num_time_steps).
+        """
+        truth = self.get_truth()
+        if self.error_integrator is None:
+            return np.repeat(truth[np.newaxis,...],n_real,axis=0)
+
+        return truth + self.error_integrator.calc_errors_batch(truth,n_real)
+
+    def iter_measurements(self,
+                          chunk_steps: int) -> Iterator[MeasurementWindow]:
+        """Calculates a set of sensor measurements in windows of the sample
+        times so that long transients can be simulated with the peak memory
+        bounded by the window size. Each window holds the truth, errors and
+        measurements for its sample times. Systematic errors are held constant
+        and drift is calculated from the absolute sample times so the windows
+        join up into one simulated experiment. Random errors are drawn per
+        window so they are not the same draws as a full `calc_measurements()`
+        call. The truth and measurements stored in this sensor array are not
+        modified.
+
+        Parameters
+        ----------
+        chunk_steps : int
+            Maximum number of sample times in each window.
+
+        Yields
+        ------
+        MeasurementWindow
+            Truth, errors and measurements for each window of sample times in
+            order. shape=(num_sensors,num_field_components,
+            num_window_time_steps).
+        """
+        yield from iter_measurement_windows(self.field,
+                                            self.sensor_data,
+                                            self.error_integrator,
+                                            self._dtype,
+                                            chunk_steps,
+                                            self._spatial_averager)
+
     def get_measurements(self) -> np.ndarray:
         """Returns the current set of simulated measurements if theses have been
         calculated. If these have not been calculated then 'calc_measurements()'
@@ -5,7 +5,7 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import numpy as np
 from scipy.spatial.transform import Rotation
 from pyvale.core.integratortype import EIntSpatialType
@@ -26,6 +26,12 @@ class SensorData:
     of the position array determines the number of sensors in the array.
 
     shape=(num_sensors,3)
+
+    For a batch of perturbed sensor states (one per Monte-Carlo realisation)
+    the positions have a leading realisation axis with shape=(num_real,
+    num_sensors,3). The angles are then stacked realisation by realisation and
+    the sample times can be per realisation with shape=(num_real,
+    num_time_steps).
     """
 
     sample_times: np.ndarray | None = None
@@ -37,13 +43,15 @@ class SensorData:
     shape=(num_time_steps,)
     """
 
-    angles: tuple[Rotation,...] | None = None
+    angles: tuple[Rotation,...] | Rotation | None = None
     """The angles for each sensor in the array specified using scipy Rotation
-    objects. For scalar fields the rotation only has an effect if a spatial
-    averager is specified and the locations of the integration points are
-    rotated. For vector and tensor fields the field is transformed using this
-    rotation as well as rotating the positions of the integration points if a
-    spatial averager is specified.
+    objects. This can be a tuple of rotations or a single stacked rotation
+    with one rotation per sensor (see `as_stacked_rotation`). For scalar fields
+    the rotation only has an effect if a spatial averager is specified and the
+    locations of the integration points are rotated. For vector and tensor
+    fields the field is transformed using this rotation as well as rotating
+    the positions of the integration points if a spatial averager is
+    specified.
 
     Specifying a single rotation in the tuple will cause all sensors to have the
     same rotation and they will be batch processed increasing speed. Otherwise
@@ -61,12 +69,118 @@ class SensorData:
 
     spatial_dims: np.ndarray | None = None
     """The spatial dimension of the sensor array in its local X,Y,Z coordinates.
-    Only used if spatial averager is specified above.
+    Only used if spatial averager is specified above. For disks and cylinders
+    these are the diameters in X and Y and the length along Z.
 
     shape=(3,)
     """
 
+    spatial_order: int | None = None
+    """Order of the quadrature rule for the Gauss spatial averagers (e.g.
+    `EIntSpatialType.GAUSSBOX`), see `get_quadrature_rule`. If None then an
+    order of 3 is used. If a spatial tolerance is specified this is the maximum
+    order for the adaptive selection and defaults to 8.
+    """
+
+    spatial_tol: float | None = None
+    """Relative tolerance for adaptive selection of the order of the Gauss
+    spatial averagers. If specified the lowest order whose averages change by
+    less than this tolerance relative to the next order is used. If None then
+    the order is fixed by `spatial_order`.
+    """
+
 
+def as_stacked_rotation(angles: tuple[Rotation,...] | Rotation) -> Rotation:
+    """Converts sensor angles into a single stacked scipy Rotation so that
+    the rotations of all sensors can be processed together without looping
+    over individual Rotation objects.
+
+    Parameters
+    ----------
+    angles : tuple[Rotation,...] | Rotation
+        Sensor angles as a tuple of rotations or as a scipy Rotation which can
+        be single or stacked.
+
+    Returns
+    -------
+    Rotation
+        Stacked rotation with one rotation per element of the input.
+    """
+    if isinstance(angles,Rotation):
+        angles = (angles,)
+
+    return Rotation.concatenate(angles)
+
+
+def tile_sensor_rotation(angles: tuple[Rotation,...] | Rotation,
+                         n_stacked: int) -> Rotation:
+    """Converts sensor angles into a stacked rotation matching a stack of
+    sensor positions. For a batch of realisations the positions are stacked
+    realisation by realisation so rotations given once per sensor are repeated
+    for each realisation, the rotation of sensor ii in realisation rr is then
+    at index rr*num_sensors+ii.
+
+    Parameters
+    ----------
+    angles : tuple[Rotation,...] | Rotation
+        Sensor angles as a tuple of rotations or as a scipy Rotation which can
+        be single or stacked.
+    n_stacked : int
+        Number of stacked sensor positions the rotations are applied to.
+
+    Returns
+    -------
+    Rotation
+        Stacked rotation with one rotation per stacked sensor position or a
+        single rotation that applies to all positions.
+
+    Raises
+    ------
+    ValueError
+        The number of stacked positions is not a multiple of the number of
+        rotations.
+    """
+    angles = as_stacked_rotation(angles)
+    n_rots = len(angles)
+    if n_rots in (1,n_stacked):
+        return angles
+
+    if n_stacked % n_rots != 0:
+        raise ValueError(f"Number of sensor rotations ({n_rots}) does not "
+                         + "match the number of sensor positions "
+                         + f"({n_stacked}).")
+
+    return angles[np.tile(np.arange(n_rots),n_stacked//n_rots)]
+
+
+def freeze_sensor_data(sens_data: SensorData) -> SensorData:
+    """Creates an immutable copy of a `SensorData` object. The arrays are
+    copied once and set to read only so the copy can be shared between error
+    calculators without further copying. Perturbed sensor states are then
+    created as lightweight overlays with `dataclasses.replace` which share all
+    unchanged arrays and rotations with the original.
+
+    Parameters
+    ----------
+    sens_data : SensorData
+        Sensor data to copy.
+
+    Returns
+    -------
+    SensorData
+        Copy of the sensor data with read only arrays. The scipy Rotation
+        objects are immutable so they are shared and not copied.
+    """
+    return replace(sens_data,
+                   positions=_frozen_copy(sens_data.positions),
+                   sample_times=_frozen_copy(sens_data.sample_times),
+                   spatial_dims=_frozen_copy(sens_data.spatial_dims))
 
 
+def _frozen_copy(array: np.ndarray | None) -> np.ndarray | None:
+    if array is None:
+        return None
 
+    frozen = np.array(array)
+    frozen.flags.writeable = False
+    return frozen
@@ -0,0 +1,237 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+
+
+class P2Quantile:
+    """Streaming quantile estimator using the P-squared (P²) algorithm of Jain
+    and Chlamtac (1985). Tracks five markers per quantile per element so
+    quantiles of an arbitrarily long stream of arrays can be estimated in
+    constant memory. All elements of the input arrays are updated together so
+    every element must receive the same number of observations.
+
+    For five or fewer observations the quantiles are calculated exactly (with
+    linear interpolation consistent with `np.quantile`).
+    """
+    __slots__ = ("_probs","_count","_heights","_pos","_pos_desired",
+                 "_pos_inc")
+
+    def __init__(self,
+                 probs: tuple[float,...],
+                 shape: tuple[int,...]) -> None:
+        """Initialiser for the `P2Quantile` class.
+
+        Parameters
+        ----------
+        probs : tuple[float,...]
+            Probabilities of the quantiles to estimate in the range [0,1], e.g.
+            (0.5,) for the median.
+        shape : tuple[int,...]
+            Shape of the arrays that will be streamed into the estimator.
+        """
+        self._probs = np.array(probs,dtype=np.float64)
+        self._count = 0
+
+        n_probs = self._probs.shape[0]
+        # shape=(5,n_probs)+shape
+        self._heights = np.zeros((5,n_probs)+shape)
+        self._pos = np.broadcast_to(
+            np.arange(5.0).reshape((5,1)+(1,)*len(shape)),
+            self._heights.shape).copy()
+
+        # shape=(5,n_probs)+(1,...) to broadcast over the elements
+        pp = self._probs
+        self._pos_desired = np.stack((np.zeros_like(pp),2.0*pp,4.0*pp,
+                                      2.0+2.0*pp,np.full_like(pp,4.0)))
+        self._pos_inc = np.stack((np.zeros_like(pp),pp/2.0,pp,(1.0+pp)/2.0,
+                                  np.ones_like(pp)))
+        self._pos_desired = self._pos_desired.reshape(
+            (5,n_probs)+(1,)*len(shape))
+        self._pos_inc = self._pos_inc.reshape((5,n_probs)+(1,)*len(shape))
+
+    def update(self, values: np.ndarray) -> None:
+        """Updates the quantile estimates with a new observation for every
+        element.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            New observation for each element. shape=shape
+        """
+        if self._count < 5:
+            self._heights[self._count] = values
+            self._count += 1
+            if self._count == 5:
+                self._heights = np.sort(self._heights,axis=0)
+            return
+
+        self._count += 1
+        qq = self._heights
+        nn = self._pos
+
+        np.minimum(qq[0],values,out=qq[0])
+        np.maximum(qq[4],values,out=qq[4])
+
+        # Cell containing each observation, k in [0,3]
+        cell = ((values >= qq[1]).astype(np.int64) + (values >= qq[2])
+                + (values >= qq[3]))
+        for ii in range(1,5):
+            nn[ii] += cell < ii
+
+        self._pos_desired += self._pos_inc
+        self._adjust_markers()
+
+    def _adjust_markers(self) -> None:
+        qq = self._heights
+        nn = self._pos
+
+        for ii in range(1,4):
+            diff = self._pos_desired[ii] - nn[ii]
+            move = (((diff >= 1.0) & (nn[ii+1] - nn[ii] > 1.0))
+                    | ((diff <= -1.0) & (nn[ii-1] - nn[ii] < -1.0)))
+            if not np.any(move):
+                continue
+
+            step = np.where(move,np.sign(diff),0.0)
+
+            q_para = qq[ii] + step/(nn[ii+1] - nn[ii-1])*(
+                (nn[ii] - nn[ii-1] + step)*(qq[ii+1] - qq[ii])
+                    /(nn[ii+1] - nn[ii])
+                + (nn[ii+1] - nn[ii] - step)*(qq[ii] - qq[ii-1])
+                    /(nn[ii] - nn[ii-1]))
+
+            q_adj = np.where(step > 0.0,qq[ii+1],qq[ii-1])
+            n_adj = np.where(step > 0.0,nn[ii+1],nn[ii-1])
+            q_lin = qq[ii] + step*(q_adj - qq[ii])/(n_adj - nn[ii])
+
+            para_ok = (qq[ii-1] < q_para) & (q_para < qq[ii+1])
+            qq[ii] = np.where(move,np.where(para_ok,q_para,q_lin),qq[ii])
+            nn[ii] += step
+
+    def get_quantiles(self) -> np.ndarray | None:
+        """Gets the current quantile estimates.
+
+        Returns
+        -------
+        np.ndarray | None
+            Quantile estimates for each element, None if there have been no
+            observations. shape=(n_probs,)+shape
+        """
+        if self._count == 0:
+            return None
+
+        if self._count <= 5:
+            # All quantiles hold the same observations until initialised
+            return np.quantile(self._heights[:self._count,0],self._probs,
+                               axis=0)
+
+        return self._heights[2].copy()
+
+
+class StreamStats:
+    """Streaming summary statistics accumulator for a series of arrays. Uses
+    Welford's algorithm for the mean and variance, tracks the minimum and
+    maximum, and uses P² estimators for the quartiles and median so that the
+    statistics of a very large number of experiments can be calculated in
+    constant memory.
+
+    The median absolute deviation (MAD) is estimated with a P² estimator
+    applied to the absolute deviation from the running median estimate so is
+    only approximate until the median estimate has converged.
+    """
+    __slots__ = ("_count","_mean","_m2","_min","_max","_quarts","_mad")
+
+    def __init__(self, shape: tuple[int,...]) -> None:
+        """Initialiser for the `StreamStats` class.
+
+        Parameters
+        ----------
+        shape : tuple[int,...]
+            Shape of the arrays that will be streamed into the accumulator,
+            e.g. the sensor array measurement shape.
+        """
+        self._count = 0
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._min = np.full(shape,np.inf)
+        self._max = np.full(shape,-np.inf)
+        # Lower quartile, median and upper quartile in that order
+        self._quarts = P2Quantile((0.25,0.5,0.75),shape)
+        self._mad = P2Quantile((0.5,),shape)
+
+    def update(self, values: np.ndarray) -> None:
+        """Updates the statistics with a batch of observations.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Batch of observations stacked along the first axis. shape=(
+            num_obs,)+shape
+        """
+        n_batch = values.shape[0]
+        if n_batch == 0:
+            return
+
+        # Chan et al. parallel combination of the batch mean and variance
+        batch_mean = np.mean(values,axis=0)
+        batch_m2 = np.sum((values - batch_mean)**2,axis=0)
+        n_total = self._count + n_batch
+        delta = batch_mean - self._mean
+        self._mean += delta*n_batch/n_total
+        self._m2 += batch_m2 + delta**2*self._count*n_batch/n_total
+        self._count = n_total
+
+        self._min = np.minimum(self._min,np.min(values,axis=0))
+        self._max = np.maximum(self._max,np.max(values,axis=0))
+
+        for vv in values:
+            self._quarts.update(vv)
+            self._mad.update(np.abs(vv - self.get_median()))
+
+    def get_count(self) -> int:
+        return self._count
+
+    def get_mean(self) -> np.ndarray:
+        return self._mean.copy()
+
+    def get_std(self) -> np.ndarray:
+        """Gets the population standard deviation consistent with `np.std`.
+
+        Returns
+        -------
+        np.ndarray
+            Standard deviation of each element.
+        """
+        return np.sqrt(self._m2/max(self._count,1))
+
+    def get_min(self) -> np.ndarray:
+        return self._min.copy()
+
+    def get_max(self) -> np.ndarray:
+        return self._max.copy()
+
+    def get_median(self) -> np.ndarray | None:
+        return self._get_quart(1)
+
+    def get_q25(self) -> np.ndarray | None:
+        return self._get_quart(0)
+
+    def get_q75(self) -> np.ndarray | None:
+        return self._get_quart(2)
+
+    def get_mad(self) -> np.ndarray | None:
+        mad = self._mad.get_quantiles()
+        if mad is None:
+            return None
+        return mad[0]
+
+    def _get_quart(self, ind: int) -> np.ndarray | None:
+        quarts = self._quarts.get_quantiles()
+        if quarts is None:
+            return None
+        return quarts[ind]
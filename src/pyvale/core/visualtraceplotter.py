@@ -148,7 +148,8 @@ def plot_exp_traces(exp_sim: ExperimentSimulator,
 
     #---------------------------------------------------------------------------
     # Plot all simulated experimental points
-    if trace_opts.plot_all_exp_points:
+    if (trace_opts.plot_all_exp_points
+        and exp_data[sens_array_num] is not None):
         for ss in sensors_to_plot:
             for ee in range(exp_sim.num_exp_per_sim):
                 ax.plot(samp_time,
@@ -0,0 +1,293 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+
+(XI,YI) = (0,1)
+
+# Tolerance on the natural coordinates so points on shared element edges are
+# found in at least one of the elements
+_NAT_TOL = 1e-9
+# Natural coordinates of the corner nodes of a quad in exodus node order
+_QUAD_NAT = np.array([[-1.0,-1.0],[1.0,-1.0],[1.0,1.0],[-1.0,1.0]])
+# Coefficients of the corner coordinates giving the constant, xi, eta and
+# xi*eta terms of the bilinear map of a quad
+_QUAD_NAT_COEFFS = np.array([[1.0,1.0,1.0,1.0],
+                             [-1.0,1.0,1.0,-1.0],
+                             [-1.0,-1.0,1.0,1.0],
+                             [1.0,-1.0,1.0,-1.0]])
+# Newton converges quadratically so the error after a step smaller than the
+# tolerance is of the order of the tolerance squared
+_QUAD_NEWTON_ITERS = 10
+_QUAD_NEWTON_TOL = 1e-8
+
+
+def raster_elems(nodes: np.ndarray,
+                 connect: dict[str,np.ndarray],
+                 grid_vec_x: np.ndarray,
+                 grid_vec_y: np.ndarray,
+                 node_vals: np.ndarray | None = None,
+                 chunk_size: int = 2**20,
+                 ) -> tuple[np.ndarray | None,np.ndarray]:
+    """Rasterises a 2D finite element mesh onto a regular grid of points using
+    the element connectivity. For each element only the grid points in its
+    bounding box are tested so the cost is linear in the number of elements
+    and covered grid points. Nodal values are interpolated to the covered grid
+    points with the element shape functions. Elements are processed in
+    vectorised batches with a bounded number of candidate grid points.
+
+    Triangles use linear shape functions and quads use bilinear shape
+    functions. Higher order elements (TRI6, QUAD8 and QUAD9) are rasterised
+    using their corner nodes.
+
+    Parameters
+    ----------
+    nodes : np.ndarray
+        Nodal coordinates where the first two columns are X and Y. shape=(
+        num_nodes,2|3)
+    connect : dict[str,np.ndarray]
+        Element connectivity for each element block as in `mh.SimData`, one
+        indexed with shape=(nodes_per_elem,num_elems).
+    grid_vec_x : np.ndarray
+        Equally spaced X coordinates of the grid in ascending order.
+    grid_vec_y : np.ndarray
+        Equally spaced Y coordinates of the grid in ascending order.
+    node_vals : np.ndarray | None, optional
+        Values at the nodes to interpolate onto the grid, shape=(num_nodes,
+        num_vals). If None then only the coverage is calculated, by default
+        None.
+    chunk_size : int, optional
+        Maximum number of candidate grid points processed in a batch, by
+        default 2**20.
+
+    Returns
+    -------
+    tuple[np.ndarray | None,np.ndarray]
+        The interpolated values with shape=(num_y,num_x,num_vals) which are NaN
+        outside the mesh, None if no nodal values are given. The coverage mask
+        with shape=(num_y,num_x) which is True for grid points inside the mesh.
+
+    Raises
+    ------
+    ValueError
+        An element block has an unsupported number of nodes per element.
+    """
+    grid_shape = (grid_vec_y.shape[0],grid_vec_x.shape[0])
+    coverage = np.zeros(grid_shape,dtype=np.bool_)
+
+    grid_vals = None
+    if node_vals is not None:
+        grid_vals = np.full(grid_shape+(node_vals.shape[1],),np.nan)
+
+    for cc in connect:
+        nodes_per_elem = connect[cc].shape[0]
+        if nodes_per_elem in (3,6):
+            n_corners = 3
+        elif nodes_per_elem in (4,8,9):
+            n_corners = 4
+        else:
+            raise ValueError(f"Element block {cc} with {nodes_per_elem} nodes "
+                             "per element cannot be rasterised.")
+
+        # NOTE: exodus connectivity is 1 indexed, shape=(n_elems,n_corners)
+        elem_nodes = connect[cc][:n_corners,:].T - 1
+        _raster_block(nodes[:,:2],
+                      elem_nodes,
+                      grid_vec_x,
+                      grid_vec_y,
+                      node_vals,
+                      chunk_size,
+                      grid_vals,
+                      coverage)
+
+    return (grid_vals,coverage)
+
+
+def _raster_block(nodes: np.ndarray,
+                  elem_nodes: np.ndarray,
+                  grid_vec_x: np.ndarray,
+                  grid_vec_y: np.ndarray,
+                  node_vals: np.ndarray | None,
+                  chunk_size: int,
+                  grid_vals: np.ndarray | None,
+                  coverage: np.ndarray) -> None:
+    # shape=(n_elems,n_corners,2)
+    elem_coords = nodes[elem_nodes]
+    (inds_lo_x,inds_hi_x) = _get_bound_box_inds(elem_coords[:,:,XI],grid_vec_x)
+    (inds_lo_y,inds_hi_y) = _get_bound_box_inds(elem_coords[:,:,YI],grid_vec_y)
+
+    box_size_x = np.maximum(inds_hi_x - inds_lo_x + 1,0)
+    box_size_y = np.maximum(inds_hi_y - inds_lo_y + 1,0)
+    box_counts = box_size_x*box_size_y
+    box_ends = np.cumsum(box_counts)
+
+    # Everything that only depends on the element is calculated once here so
+    # the candidate points only gather per element coefficients
+    if elem_nodes.shape[1] == 3:
+        elem_consts = _calc_tri_consts(elem_coords)
+        calc_shape_funcs = _calc_shape_funcs_tri
+    else:
+        elem_consts = _calc_quad_consts(elem_coords)
+        calc_shape_funcs = _calc_shape_funcs_quad
+
+    # Batches of whole elements with up to chunk_size candidate points
+    ee_start = 0
+    n_elems = elem_nodes.shape[0]
+    while ee_start < n_elems:
+        count_before = box_ends[ee_start] - box_counts[ee_start]
+        ee_end = np.searchsorted(box_ends,count_before+chunk_size,side="right")
+        ee_end = max(ee_end,ee_start+1)
+
+        elem_inds = np.arange(ee_start,ee_end)
+        counts = box_counts[elem_inds]
+        # Element and position in its bounding box for every candidate point
+        cand_elems = np.repeat(elem_inds,counts)
+        cand_local = (np.arange(count_before,count_before+cand_elems.shape[0])
+                      - np.repeat(box_ends[elem_inds] - counts,counts))
+        (cand_dy,cand_dx) = np.divmod(cand_local,
+                                      np.repeat(box_size_x[elem_inds],counts))
+        cand_x = np.repeat(inds_lo_x[elem_inds],counts) + cand_dx
+        cand_y = np.repeat(inds_lo_y[elem_inds],counts) + cand_dy
+
+        (inside,shape_funcs) = calc_shape_funcs(elem_consts,
+                                                cand_elems,
+                                                grid_vec_x[cand_x],
+                                                grid_vec_y[cand_y])
+
+        (in_y,in_x) = (cand_y[inside],cand_x[inside])
+        coverage[in_y,in_x] = True
+        if grid_vals is not None:
+            in_nodes = elem_nodes[cand_elems[inside]]
+            # Sum over the corners, shape=(n_inside,n_vals)
+            in_vals = shape_funcs[:,0:1]*node_vals[in_nodes[:,0]]
+            for nn in range(1,in_nodes.shape[1]):
+                in_vals += shape_funcs[:,nn:nn+1]*node_vals[in_nodes[:,nn]]
+            grid_vals[in_y,in_x,:] = in_vals
+
+        ee_start = ee_end
+
+
+def _get_bound_box_inds(elem_coords: np.ndarray,
+                        grid_vec: np.ndarray) -> tuple[np.ndarray,np.ndarray]:
+    grid_step = 1.0
+    if grid_vec.shape[0] > 1:
+        grid_step = grid_vec[1] - grid_vec[0]
+
+    scaled_min = (np.min(elem_coords,axis=1) - grid_vec[0])/grid_step
+    scaled_max = (np.max(elem_coords,axis=1) - grid_vec[0])/grid_step
+    inds_lo = np.maximum(np.ceil(scaled_min - _NAT_TOL),0).astype(np.int64)
+    inds_hi = np.minimum(np.floor(scaled_max + _NAT_TOL),
+                         grid_vec.shape[0]-1).astype(np.int64)
+    return (inds_lo,inds_hi)
+
+
+def _calc_edge_consts(elem_coords: np.ndarray) -> np.ndarray:
+    # Edge function of each edge as f = A*x + B*y + C, positive on the inside
+    # of a counter clockwise element, shape=(n_elems,n_corners,3)
+    vert_a = elem_coords
+    vert_b = np.roll(elem_coords,-1,axis=1)
+    return np.stack((vert_a[:,:,YI] - vert_b[:,:,YI],
+                     vert_b[:,:,XI] - vert_a[:,:,XI],
+                     vert_a[:,:,XI]*vert_b[:,:,YI]
+                     - vert_b[:,:,XI]*vert_a[:,:,YI]),axis=2)
+
+
+def _calc_edge_funcs(edge_consts: np.ndarray,
+                     points_x: np.ndarray,
+                     points_y: np.ndarray) -> np.ndarray:
+    # shape=(n_pts,n_edges)
+    return (edge_consts[:,:,0]*points_x[:,np.newaxis]
+            + edge_consts[:,:,1]*points_y[:,np.newaxis]
+            + edge_consts[:,:,2])
+
+
+def _calc_tri_consts(elem_coords: np.ndarray) -> np.ndarray:
+    # Twice the signed area from the edge opposite the first vertex so the
+    # barycentric coordinates do not depend on the orientation of the element
+    edge_consts = _calc_edge_consts(elem_coords)
+    area = (edge_consts[:,1,0]*elem_coords[:,0,XI]
+            + edge_consts[:,1,1]*elem_coords[:,0,YI] + edge_consts[:,1,2])
+    # Degenerate elements have no inside points
+    edge_consts[area == 0.0,:,:] = 0.0
+    edge_consts[area == 0.0,:,2] = -1.0
+    area[area == 0.0] = 1.0
+    # The barycentric coordinate of each vertex is the edge function of the
+    # opposite edge, shape=(n_elems,3,3)
+    return np.roll(edge_consts,-1,axis=1)/area[:,np.newaxis,np.newaxis]
+
+
+def _calc_shape_funcs_tri(bary_consts: np.ndarray,
+                          cand_elems: np.ndarray,
+                          points_x: np.ndarray,
+                          points_y: np.ndarray,
+                          ) -> tuple[np.ndarray,np.ndarray]:
+    bary = _calc_edge_funcs(bary_consts[cand_elems],points_x,points_y)
+    inside = np.all(bary >= -_NAT_TOL,axis=1)
+    return (inside,bary[inside])
+
+
+def _calc_quad_consts(elem_coords: np.ndarray
+                      ) -> tuple[np.ndarray,np.ndarray]:
+    # Edge functions scaled by twice the signed area so the inside test is
+    # exact for convex quads with a tolerance relative to the element size
+    edge_consts = _calc_edge_consts(elem_coords)
+    area = (np.sum(elem_coords[:,:,XI]*np.roll(elem_coords[:,:,YI],-1,axis=1)
+                   - np.roll(elem_coords[:,:,XI],-1,axis=1)*elem_coords[:,:,YI],
+                   axis=1))
+    edge_consts[area == 0.0,:,:] = 0.0
+    edge_consts[area == 0.0,:,2] = -1.0
+    area[area == 0.0] = 1.0
+    edge_consts = edge_consts/area[:,np.newaxis,np.newaxis]
+
+    # Bilinear map as x = a + b*xi + c*eta + d*xi*eta, shape=(n_elems,4,2)
+    map_coeffs = 0.25*np.matmul(_QUAD_NAT_COEFFS,elem_coords)
+    return (edge_consts,map_coeffs)
+
+
+def _calc_shape_funcs_quad(quad_consts: tuple[np.ndarray,np.ndarray],
+                           cand_elems: np.ndarray,
+                           points_x: np.ndarray,
+                           points_y: np.ndarray,
+                           ) -> tuple[np.ndarray,np.ndarray]:
+    (edge_consts,map_coeffs) = quad_consts
+    edges = _calc_edge_funcs(edge_consts[cand_elems],points_x,points_y)
+    inside = np.all(edges >= -_NAT_TOL,axis=1)
+
+    # The natural coordinates of the inside points are found by Newton
+    # iteration with the 2x2 system solved directly, this is exact after one
+    # iteration for parallelograms
+    coeffs = map_coeffs[cand_elems[inside]]
+    (coeff_b,coeff_c,coeff_d) = (coeffs[:,1,:],coeffs[:,2,:],coeffs[:,3,:])
+    offset_x = points_x[inside] - coeffs[:,0,XI]
+    offset_y = points_y[inside] - coeffs[:,0,YI]
+
+    xi = np.zeros(offset_x.shape[0])
+    eta = np.zeros(offset_x.shape[0])
+    for _ in range(_QUAD_NEWTON_ITERS):
+        jac_xi_x = coeff_b[:,XI] + coeff_d[:,XI]*eta
+        jac_xi_y = coeff_b[:,YI] + coeff_d[:,YI]*eta
+        jac_eta_x = coeff_c[:,XI] + coeff_d[:,XI]*xi
+        jac_eta_y = coeff_c[:,YI] + coeff_d[:,YI]*xi
+        resid_x = jac_xi_x*xi + coeff_c[:,XI]*eta - offset_x
+        resid_y = jac_xi_y*xi + coeff_c[:,YI]*eta - offset_y
+
+        det = jac_xi_x*jac_eta_y - jac_eta_x*jac_xi_y
+        delta_xi = (resid_x*jac_eta_y - resid_y*jac_eta_x)/det
+        delta_eta = (jac_xi_x*resid_y - jac_xi_y*resid_x)/det
+        xi -= delta_xi
+        eta -= delta_eta
+
+        if (xi.shape[0] == 0
+            or max(np.max(np.abs(delta_xi)),np.max(np.abs(delta_eta)))
+            < _QUAD_NEWTON_TOL):
+            break
+
+    xi = np.clip(xi,-1.0,1.0)
+    eta = np.clip(eta,-1.0,1.0)
+    shape_funcs = 0.25*((1.0 + _QUAD_NAT[:,0]*xi[:,np.newaxis])
+                        *(1.0 + _QUAD_NAT[:,1]*eta[:,np.newaxis]))
+    return (inside,shape_funcs)
@@ -5,24 +5,37 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
+import os
 import time
+import threading
 import warnings
 from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
 
 import numpy as np
-from shapely.geometry import Point
+import shapely
 from scipy.signal import convolve2d
-from scipy.interpolate import griddata
+from scipy.interpolate import (LinearNDInterpolator,
+                               NearestNDInterpolator,
+                               CloughTocher2DInterpolator)
 from scipy.interpolate import RectBivariateSpline
 from scipy import ndimage
 import matplotlib.image as mplim
 from PIL import Image
 
-from pyvale.imagesim.imagedefopts import ImageDefOpts
+from pyvale.core.diskcache import get_disk_cache
+from pyvale.core.hashtools import hash_array, hash_arrays
+from pyvale.imagesim.imagedefopts import ImageDefOpts, EImageDefBackend
 from pyvale.imagesim.cameradataimagedef import CameraImageDef
 from pyvale.imagesim.alphashape import alphashape
+from pyvale.imagesim.elemraster import raster_elems
 
 (XI,YI) = (0,1)
+# Order of the spline used to deform the image mask
+_MASK_DEF_ORDER = 2
 
 def load_image(im_path) -> np.ndarray:
 
@@ -204,6 +217,33 @@ def get_im_mask_from_sim(camera: CameraImageDef,
                             nodes: np.ndarray
                             ) -> tuple[np.ndarray,np.ndarray]:
 
+    # The mask only depends on the camera pixel grid and the mesh so it is
+    # cached, see `_get_cached_im_mask`
+    im_mask = _get_cached_im_mask(camera,nodes,None)
+
+    # Return the image of the specimen
+    return (_apply_im_mask(camera,image,im_mask),im_mask)
+
+
+def get_im_mask_from_elems(camera: CameraImageDef,
+                           image: np.ndarray,
+                           nodes: np.ndarray,
+                           connect: dict[str,np.ndarray]
+                           ) -> tuple[np.ndarray,np.ndarray]:
+    # Same as `get_im_mask_from_sim` but the pixels covered by the elements are
+    # found with the connectivity so holes and notches do not need an alpha
+    # shape
+    im_mask = _get_cached_im_mask(camera,nodes,connect)
+    return (_apply_im_mask(camera,image,im_mask),im_mask)
+
+
+def clear_im_mask_cache() -> None:
+    with _im_mask_lock:
+        _im_mask_cache.clear()
+
+
+def _calc_im_mask_from_sim(camera: CameraImageDef,
+                           nodes: np.ndarray) -> np.ndarray:
     # Create a mesh of pixel centroid locations
     (px_x_m,px_y_m) = get_pixel_grid_in_m(camera)
 
@@ -216,32 +256,106 @@ def get_im_mask_from_sim(camera: CameraImageDef,
     alpha = elem_edge
 
     # Find the alpha shape based on the list of nodal points
-    # Returns a shapely polygon - use 'within' to find points inside
+    # Returns a shapely polygon - prepared so all pixels are tested at once
     a_shape = alphashape(points, alpha, only_outer=True)
+    shapely.prepare(a_shape)
 
-    # Create an array of nans to fill as the specimen image
-    masked_im = np.empty(image.shape)
-    masked_im[:] = np.nan
-    im_mask = np.zeros([camera.num_px[YI],camera.num_px[XI]])
-
-    # Fill the image based on the pixel being within the polygon (alpha-shape)
-    # If pixel is not within the specimen set to background default colour
-    for yy in range(masked_im.shape[0]):
-        for xx in range(masked_im.shape[1]):
-            if a_shape.contains(Point(px_x_m[yy,xx],px_y_m[yy,xx])):
-                masked_im[yy,xx] = image[yy,xx]
-                im_mask[yy,xx] = 1
-            else:
-                masked_im[yy,xx] = camera.background
-                im_mask[yy,xx] = 0
+    # Pixel is 1 if it is within the polygon (alpha-shape), 0 otherwise
+    im_mask = shapely.contains_xy(a_shape,px_x_m,px_y_m).astype(np.float64)
 
-    # Because arrays fill from top down the loop above effectively flips the
-    # image, so need to flip it back
-    masked_im = masked_im[::-1,:]
-    im_mask = im_mask[::-1,:]
+    # The pixel rows are in ascending Y so need to flip the mask to be top down
+    return im_mask[::-1,:]
 
-    # Return the image of the specimen
-    return (masked_im,im_mask)
+
+def _calc_im_mask_from_elems(camera: CameraImageDef,
+                             nodes: np.ndarray,
+                             connect: dict[str,np.ndarray]) -> np.ndarray:
+    (px_vec_xm,px_vec_ym) = get_pixel_vec_in_m(camera)
+    points = np.array((nodes[:,XI]+camera.roi_loc[XI],
+                       nodes[:,YI]+camera.roi_loc[YI])).T
+    (_,coverage) = raster_elems(points,connect,px_vec_xm,px_vec_ym)
+    return coverage[::-1,:].astype(np.float64)
+
+
+def _apply_im_mask(camera: CameraImageDef,
+                   image: np.ndarray,
+                   im_mask: np.ndarray) -> np.ndarray:
+    # If pixel is not within the specimen set to background default colour.
+    # NOTE: the image is indexed with the pixel rows in ascending Y so the
+    # masked image is flipped along with the mask
+    return np.where(im_mask > 0,image[::-1,:],camera.background
+                    ).astype(np.float64)
+
+
+# NOTE: masks are cached in memory for the most recent camera and mesh pairs
+# and in the disk cache (if set) so repeated runs skip the masking
+_IM_MASK_CACHE_SIZE = 4
+_im_mask_cache = OrderedDict()
+_im_mask_lock = threading.Lock()
+
+
+def _get_cached_im_mask(camera: CameraImageDef,
+                        nodes: np.ndarray,
+                        connect: dict[str,np.ndarray] | None) -> np.ndarray:
+    key = _get_im_mask_key(camera,nodes,connect)
+
+    with _im_mask_lock:
+        if key in _im_mask_cache:
+            _im_mask_cache.move_to_end(key)
+            return _im_mask_cache[key]
+
+    im_mask = _load_im_mask(key)
+    if im_mask is None:
+        if connect is None:
+            im_mask = _calc_im_mask_from_sim(camera,nodes)
+        else:
+            im_mask = _calc_im_mask_from_elems(camera,nodes,connect)
+        _save_im_mask(key,im_mask)
+
+    # Shared by all callers with the same camera and mesh so read only
+    im_mask.flags.writeable = False
+    with _im_mask_lock:
+        _im_mask_cache[key] = im_mask
+        if len(_im_mask_cache) > _IM_MASK_CACHE_SIZE:
+            _im_mask_cache.popitem(last=False)
+
+    return im_mask
+
+
+def _get_im_mask_key(camera: CameraImageDef,
+                     nodes: np.ndarray,
+                     connect: dict[str,np.ndarray] | None) -> str:
+    # The pixel grid is set by the number of pixels and the resolution and the
+    # mesh is shifted by the ROI location
+    camera_key = hash_array(np.concatenate((camera.num_px,
+                                            (camera.m_per_px,),
+                                            camera.roi_loc)))
+    nodes_key = hash_array(nodes[:,(XI,YI)])
+    if connect is None:
+        return f"immask-alpha-{camera_key}-{nodes_key}"
+
+    connect_key = hash_arrays(connect.values())
+    return f"immask-elems-{camera_key}-{nodes_key}-{connect_key}"
+
+
+def _load_im_mask(key: str) -> np.ndarray | None:
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return None
+
+    arrays = disk_cache.load(key)
+    if arrays is None:
+        return None
+
+    return arrays["im_mask"].astype(np.float64)
+
+
+def _save_im_mask(key: str, im_mask: np.ndarray) -> None:
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return
+
+    disk_cache.save(key,{"im_mask": im_mask > 0})
 
 
 def upsample_image(camera: CameraImageDef,
@@ -287,18 +401,86 @@ def average_subpixel_image(subpx_image,subsample):
     return avg_image
 
 
+@dataclass(slots=True)
+class SplineCoeffs:
+    """B-spline coefficients of the upsampled image and the image mask. These
+    are calculated once by `preprocess` so every deformed frame samples them
+    without re-running the spline prefilter, see `calc_spline_coeffs`.
+    """
+
+    image: np.ndarray
+    """Spline coefficients of the upsampled image.
+    """
+
+    image_npad: int
+    """Number of pixels the image was padded by before filtering.
+    """
+
+    mask: np.ndarray | None = None
+    """Spline coefficients of the image mask, None if there is no image mask.
+    """
+
+    mask_npad: int = 0
+    """Number of pixels the mask was padded by before filtering.
+    """
+
+
+def calc_spline_coeffs(image: np.ndarray,
+                       order: int,
+                       mode: str,
+                       cval: float = 0.0) -> tuple[np.ndarray,int]:
+    # NOTE: this reproduces the prefilter of ndimage.map_coordinates, which
+    # pads the image for the 'nearest' and 'grid-constant' modes so the result
+    # near the image edges does not depend on the boundary of the filter
+    npad = 0
+    if order > 1 and mode == 'nearest':
+        npad = 12
+        image = np.pad(image,npad,mode='edge')
+    elif order > 1 and mode == 'grid-constant':
+        npad = 12
+        image = np.pad(image,npad,mode='constant',constant_values=cval)
+
+    if order <= 1:
+        return (np.asarray(image,dtype=np.float64),npad)
+
+    coeffs = ndimage.spline_filter(image,
+                                   order=order,
+                                   output=np.float64,
+                                   mode=mode)
+    return (coeffs,npad)
+
+
+def sample_spline_coeffs(coeffs: np.ndarray,
+                         npad: int,
+                         coords_y: np.ndarray,
+                         coords_x: np.ndarray,
+                         order: int,
+                         mode: str,
+                         cval: float = 0.0) -> np.ndarray:
+    # Same result as ndimage.map_coordinates with prefilter=True on the image
+    return ndimage.map_coordinates(coeffs,
+                                   [[coords_y + npad],
+                                    [coords_x + npad]],
+                                   prefilter=False,
+                                   order=order,
+                                   mode=mode,
+                                   cval=cval)
+
+
 def preprocess(input_im: np.ndarray,
                coords: np.ndarray,
                 disp_x: np.ndarray,
                 disp_y: np.ndarray,
                 camera: CameraImageDef,
                 id_opts: ImageDefOpts,
-                print_on: bool = False
+                print_on: bool = False,
+                connect: dict[str,np.ndarray] | None = None
                 ) -> tuple[np.ndarray,
                            np.ndarray|None,
                            np.ndarray,
                            np.ndarray,
-                           np.ndarray]:
+                           np.ndarray,
+                           SplineCoeffs]:
 
     if print_on:
         print('\n'+'='*80)
@@ -327,9 +509,15 @@ def preprocess(input_im: np.ndarray,
             print('Image masking or complex geometry on, getting image mask.')
             tic = time.perf_counter()
 
-        (masked_im,image_mask) = get_im_mask_from_sim(camera,
-                                                input_im,
-                                                coords) # type: ignore
+        if connect is None:
+            (masked_im,image_mask) = get_im_mask_from_sim(camera,
+                                                    input_im,
+                                                    coords) # type: ignore
+        else:
+            (masked_im,image_mask) = get_im_mask_from_elems(camera,
+                                                            input_im,
+                                                            coords,
+                                                            connect)
         if id_opts.mask_input_image:
             input_im = masked_im
         del masked_im
@@ -353,22 +541,99 @@ def preprocess(input_im: np.ndarray,
         toc = time.perf_counter()
         print(f'Upsampling image with I2D took {toc-tic:.4f} seconds')
 
-    return (upsampled_image,image_mask,input_im,disp_x,disp_y)
+    # Spline prefilter of the images
+    if print_on:
+        print('\n'+'-'*80)
+        print('CALCULATE SPLINE COEFFICIENTS\n')
+        tic = time.perf_counter()
+
+    # NOTE: with the connectivity the deformed mask is the coverage of the
+    # deformed elements so the mask is not deformed with a spline
+    spline_coeffs = prefilter_images(upsampled_image,
+                                     image_mask if connect is None else None,
+                                     id_opts)
+
+    if print_on:
+        toc = time.perf_counter()
+        print(f'Calculating spline coefficients took {toc-tic:.4f} seconds')
+
+    return (upsampled_image,image_mask,input_im,disp_x,disp_y,spline_coeffs)
+
+
+def prefilter_images(upsampled_image: np.ndarray,
+                     image_mask: np.ndarray | None,
+                     id_opts: ImageDefOpts) -> SplineCoeffs:
+    # The reference image and mask are the same for every frame so the spline
+    # prefilter is only run once
+    (image_coeffs,image_npad) = calc_spline_coeffs(upsampled_image,
+                                                   id_opts.image_def_order,
+                                                   id_opts.image_def_extrap,
+                                                   id_opts.image_def_extval)
+    spline_coeffs = SplineCoeffs(image_coeffs,image_npad)
+
+    if image_mask is not None and id_opts.def_complex_geom:
+        (spline_coeffs.mask,spline_coeffs.mask_npad) = calc_spline_coeffs(
+            image_mask,_MASK_DEF_ORDER,'constant')
+
+    return spline_coeffs
+
+
+def interp_disp_to_grid(def_nodes: np.ndarray,
+                        disp: np.ndarray,
+                        grid: tuple[np.ndarray,np.ndarray],
+                        id_opts: ImageDefOpts
+                        ) -> tuple[np.ndarray,np.ndarray]:
+    # Same as griddata for each displacement component but the triangulation
+    # of the deformed nodes is built once and used for both components
+    if id_opts.fe_interp == 'nearest':
+        interp = NearestNDInterpolator(def_nodes,
+                                       disp,
+                                       rescale=id_opts.fe_rescale)
+    elif id_opts.fe_interp == 'linear':
+        interp = LinearNDInterpolator(def_nodes,
+                                      disp,
+                                      fill_value=np.nan,
+                                      rescale=id_opts.fe_rescale)
+    elif id_opts.fe_interp == 'cubic':
+        interp = CloughTocher2DInterpolator(def_nodes,
+                                            disp,
+                                            fill_value=np.nan,
+                                            rescale=id_opts.fe_rescale)
+    else:
+        raise ValueError(f'Unknown interpolation method {id_opts.fe_interp} '+
+                         'for the displacements.\n')
+
+    # shape=(num_subpx_y,num_subpx_x,2)
+    grid_disp = interp(grid[XI],grid[YI])
+    return (grid_disp[...,XI],grid_disp[...,YI])
 
 
-def deform_one_image(upsampled_image: np.ndarray,
+def deform_one_image(upsampled_image: np.ndarray | None,
                  camera: CameraImageDef,
                  id_opts: ImageDefOpts,
                  coords: np.ndarray,
                  disp: np.ndarray,
                  image_mask: np.ndarray | None = None,
-                 print_on: bool = True
+                 print_on: bool = True,
+                 spline_coeffs: SplineCoeffs | None = None,
+                 connect: dict[str,np.ndarray] | None = None,
                  ) -> tuple[np.ndarray,
                             np.ndarray,
                             np.ndarray,
                             np.ndarray,
                             np.ndarray | None]:
 
+    # NOTE: the upsampled image is only used if the spline coefficients from
+    # `preprocess` are not given, in which case the prefilter is run here
+    if spline_coeffs is None:
+        spline_coeffs = SplineCoeffs(*calc_spline_coeffs(
+            upsampled_image,
+            id_opts.image_def_order,
+            id_opts.image_def_extrap,
+            id_opts.image_def_extval))
+
+    (mask_coeffs,mask_npad) = (spline_coeffs.mask,spline_coeffs.mask_npad)
+
     if image_mask is not None:
         if (image_mask.shape[0] != camera.num_px[YI]) or (image_mask.shape[1] != camera.num_px[XI]):
             if image_mask.size == 0:
@@ -376,6 +641,7 @@ def deform_one_image(upsampled_image: np.ndarray,
             else:
                 warnings.warn('Image mask size does not match camera, using default mask of ones.')
             image_mask = np.ones([camera.num_px[YI],camera.num_px[XI]])
+            mask_coeffs = None
 
     # Get grid of pixel centroid locations
     (px_grid_xm,px_grid_ym) = get_pixel_grid_in_m(camera)
@@ -388,22 +654,26 @@ def deform_one_image(upsampled_image: np.ndarray,
         print('Interpolating displacement onto sub-pixel grid.')
         tic = time.perf_counter()
 
+    def_nodes = np.column_stack((coords[:,XI] + disp[:,XI] + camera.roi_loc[XI],
+                                 coords[:,YI] + disp[:,YI] + camera.roi_loc[YI]))
+
     # Interpolate displacements onto sub-pixel locations - nan extrapolation
-    subpx_disp_x = griddata((coords[:,XI] + disp[:,XI] + camera.roi_loc[XI],
-                             coords[:,YI] + disp[:,YI] + camera.roi_loc[YI]),
-                            disp[:,XI],
-                            (subpx_grid_xm,subpx_grid_ym),
-                            method=id_opts.fe_interp,
-                            fill_value=np.nan,
-                            rescale=id_opts.fe_rescale)
-
-    subpx_disp_y = griddata((coords[:,XI] + disp[:,XI] + camera.roi_loc[XI],
-                             coords[:,YI] + disp[:,YI] + camera.roi_loc[YI]),
-                            disp[:,YI],
-                            (subpx_grid_xm,subpx_grid_ym),
-                            method=id_opts.fe_interp,
-                            fill_value=np.nan,
-                            rescale=id_opts.fe_rescale)
+    if connect is None:
+        (subpx_disp_x,subpx_disp_y) = interp_disp_to_grid(
+            def_nodes,
+            disp[:,(XI,YI)],
+            (subpx_grid_xm,subpx_grid_ym),
+            id_opts)
+        subpx_coverage = None
+    else:
+        # Element shape functions on the deformed mesh, NaN outside the
+        # elements so holes and notches are not filled
+        (subpx_disp,subpx_coverage) = raster_elems(
+            def_nodes,
+            connect,
+            *get_subpixel_vec(camera,id_opts.subsample),
+            node_vals=disp[:,(XI,YI)])
+        (subpx_disp_x,subpx_disp_y) = (subpx_disp[...,XI],subpx_disp[...,YI])
 
     # Ndimage interp can't handle nans so force everything outside the specimen
     # to extrapolate outside the FOV - then use ndimage opts to control
@@ -439,14 +709,15 @@ def deform_one_image(upsampled_image: np.ndarray,
     def_subpx_x_in_px = def_subpx_x*(id_opts.subsample/camera.m_per_px)-0.5
     def_subpx_y_in_px = def_subpx_y*(id_opts.subsample/camera.m_per_px)-0.5
     # NOTE: prefilter needs to be on to match griddata and interp2D!
-    # with prefilter on this exactly matches I2D but 10x faster!
-    def_image_subpx = ndimage.map_coordinates(upsampled_image,
-                                            [[def_subpx_y_in_px],
-                                             [def_subpx_x_in_px]],
-                                            prefilter=True,
-                                            order= id_opts.image_def_order,
-                                            mode= id_opts.image_def_extrap,
-                                            cval= id_opts.image_def_extval)
+    # with prefilter on this exactly matches I2D but 10x faster! The prefilter
+    # is applied once to the reference image, see `calc_spline_coeffs`
+    def_image_subpx = sample_spline_coeffs(spline_coeffs.image,
+                                           spline_coeffs.image_npad,
+                                           def_subpx_y_in_px,
+                                           def_subpx_x_in_px,
+                                           id_opts.image_def_order,
+                                           id_opts.image_def_extrap,
+                                           id_opts.image_def_extval)
 
     def_image_subpx = def_image_subpx[0,:,:].squeeze()
     if print_on:
@@ -467,7 +738,14 @@ def deform_one_image(upsampled_image: np.ndarray,
     #--------------------------------------------------------------------------
     # DEFORMING IMAGE MASK
     # Only need to do this if there are holes and notches
-    if id_opts.def_complex_geom:
+    if id_opts.def_complex_geom and subpx_coverage is not None:
+        # Fraction of the sub-pixels of each pixel covered by the deformed
+        # elements, flipped to be consistent with the pixel coords of ndimage
+        def_mask = average_subpixel_image(subpx_coverage.astype(np.float64),
+                                          id_opts.subsample)[::-1,:]
+        def_image[def_mask<0.51] = camera.background # type: ignore
+
+    elif id_opts.def_complex_geom:
         if print_on:
             print('Deforming image mask.')
             tic = time.perf_counter()
@@ -489,13 +767,17 @@ def deform_one_image(upsampled_image: np.ndarray,
         def_px_y_in_px = def_px_y*(1/camera.m_per_px)-0.5
         # NOTE: prefilter needs to be on to match griddata and interp2D!
         # with prefilter on this exactly matches I2D but 10x faster!
-        def_mask = ndimage.map_coordinates(image_mask,
-                                            [[def_px_y_in_px],
-                                             [def_px_x_in_px]],
-                                            prefilter=True,
-                                            order=2,
-                                            mode='constant',
-                                            cval=0)
+        if mask_coeffs is None:
+            (mask_coeffs,mask_npad) = calc_spline_coeffs(image_mask,
+                                                         _MASK_DEF_ORDER,
+                                                         'constant')
+
+        def_mask = sample_spline_coeffs(mask_coeffs,
+                                        mask_npad,
+                                        def_px_y_in_px,
+                                        def_px_x_in_px,
+                                        _MASK_DEF_ORDER,
+                                        'constant')
 
         def_mask = def_mask[0,:,:].squeeze()
         # Use the deformed image mask to mask the deformed image
@@ -522,20 +804,23 @@ def deform_images(input_im: np.ndarray,
                  coords: np.ndarray,
                  disp_x: np.ndarray,
                  disp_y: np.ndarray,
-                 print_on: bool = False) -> None:
+                 print_on: bool = False,
+                 connect: dict[str,np.ndarray] | None = None) -> None:
     #---------------------------------------------------------------------------
     # Image Pre-Processing
-    (upsampled_image,
+    (_,
      image_mask,
      input_im,
      disp_x,
-     disp_y) = preprocess(input_im,
+     disp_y,
+     spline_coeffs) = preprocess(input_im,
                             coords,
                             disp_x,
                             disp_y,
                             camera,
                             id_opts,
-                            print_on = print_on)
+                            print_on = print_on,
+                            connect = connect)
 
     #---------------------------------------------------------------------------
     # Image Deformation Loop
@@ -546,27 +831,29 @@ def deform_images(input_im: np.ndarray,
     num_frames = disp_x.shape[1]
     ticl = time.perf_counter()
 
-    for ff in range(num_frames):
-        if print_on:
-            ticf = time.perf_counter()
-            print(f'\nDEFORMING FRAME: {ff}')
-
-        (def_image,_,_,_,_) = deform_one_image(upsampled_image,
-                                            camera,
-                                            id_opts,
-                                            coords, # type: ignore
-                                            np.array((disp_x[:,ff],disp_y[:,ff])).T,
-                                            image_mask=image_mask,
-                                            print_on=print_on)
-
-        save_file = id_opts.save_path / str(f'{id_opts.save_tag}_'+
-                f'{get_image_num_str(im_num=ff,width=4)}'+
-                '.tiff')
-        save_image(save_file,def_image,camera.bits)
-
-        if print_on:
-            tocf = time.perf_counter()
-            print(f'DEFORMING FRAME: {ff} took {tocf-ticf:.4f} seconds')
+    n_workers = id_opts.def_workers
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    if id_opts.def_backend == EImageDefBackend.PROCESS:
+        _deform_frames_process(spline_coeffs,camera,id_opts,coords,disp_x,
+                               disp_y,image_mask,connect,n_workers,print_on)
+    elif id_opts.def_backend == EImageDefBackend.THREAD:
+        # Frame timings are printed in order by the caller so the workers
+        # do not print their progress
+        with ThreadPoolExecutor(max_workers=n_workers,
+                                initializer=_init_def_worker,
+                                initargs=(spline_coeffs,camera,id_opts,
+                                          coords,disp_x,disp_y,image_mask,
+                                          connect,False)) as pool:
+            _run_frames(pool,num_frames,print_on)
+    else:
+        _init_def_worker(spline_coeffs,camera,id_opts,coords,disp_x,disp_y,
+                         image_mask,connect,print_on)
+        try:
+            _run_frames(None,num_frames,print_on)
+        finally:
+            _clear_def_worker()
 
     if print_on:
         tocl = time.perf_counter()
@@ -577,3 +864,140 @@ def deform_images(input_im: np.ndarray,
         print('\n'+'='*80)
         print('COMPLETE\n')
 
+
+def get_def_image_path(id_opts: ImageDefOpts, frame: int) -> Path:
+    return id_opts.save_path / str(f'{id_opts.save_tag}_'+
+                f'{get_image_num_str(im_num=frame,width=4)}'+
+                '.tiff')
+
+
+# NOTE: each worker thread or process holds the inputs shared by all frames
+# here so they are only sent to the worker once.
+_def_worker = threading.local()
+
+
+def _init_def_worker(spline_coeffs: SplineCoeffs,
+                     camera: CameraImageDef,
+                     id_opts: ImageDefOpts,
+                     coords: np.ndarray,
+                     disp_x: np.ndarray,
+                     disp_y: np.ndarray,
+                     image_mask: np.ndarray | None,
+                     connect: dict[str,np.ndarray] | None,
+                     print_on: bool) -> None:
+    _def_worker.spline_coeffs = spline_coeffs
+    _def_worker.camera = camera
+    _def_worker.id_opts = id_opts
+    _def_worker.coords = coords
+    _def_worker.disp_x = disp_x
+    _def_worker.disp_y = disp_y
+    _def_worker.image_mask = image_mask
+    _def_worker.connect = connect
+    _def_worker.print_on = print_on
+    _def_worker.shm = None
+
+
+def _init_def_worker_shm(shm_name: str,
+                         image_shape: tuple[int,int],
+                         spline_coeffs: SplineCoeffs,
+                         camera: CameraImageDef,
+                         id_opts: ImageDefOpts,
+                         coords: np.ndarray,
+                         disp_x: np.ndarray,
+                         disp_y: np.ndarray,
+                         image_mask: np.ndarray | None,
+                         connect: dict[str,np.ndarray] | None) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    spline_coeffs.image = np.ndarray(image_shape,
+                                     dtype=np.float64,
+                                     buffer=shm.buf)
+    spline_coeffs.image.flags.writeable = False
+    _init_def_worker(spline_coeffs,camera,id_opts,coords,disp_x,disp_y,
+                     image_mask,connect,False)
+    _def_worker.shm = shm
+
+
+def _clear_def_worker() -> None:
+    _def_worker.__dict__.clear()
+
+
+def _deform_frame(frame: int) -> float:
+    tic = time.perf_counter()
+    if _def_worker.print_on:
+        print(f'\nDEFORMING FRAME: {frame}')
+
+    disp = np.array((_def_worker.disp_x[:,frame],
+                     _def_worker.disp_y[:,frame])).T
+    (def_image,_,_,_,_) = deform_one_image(
+        None,
+        _def_worker.camera,
+        _def_worker.id_opts,
+        _def_worker.coords,
+        disp,
+        image_mask=_def_worker.image_mask,
+        print_on=_def_worker.print_on,
+        spline_coeffs=_def_worker.spline_coeffs,
+        connect=_def_worker.connect)
+
+    save_image(get_def_image_path(_def_worker.id_opts,frame),
+               def_image,
+               _def_worker.camera.bits)
+
+    return time.perf_counter() - tic
+
+
+def _run_frames(pool: ThreadPoolExecutor | ProcessPoolExecutor | None,
+                num_frames: int,
+                print_on: bool) -> None:
+    if pool is None:
+        frame_times = (_deform_frame(ff) for ff in range(num_frames))
+    else:
+        futures = [pool.submit(_deform_frame,ff) for ff in range(num_frames)]
+        # Re-raises any exception from the worker
+        frame_times = (ff.result() for ff in futures)
+
+    # Each frame writes its own file so only the progress is reported in order
+    for ff,frame_time in enumerate(frame_times):
+        if print_on:
+            print(f'DEFORMING FRAME: {ff} took {frame_time:.4f} seconds')
+
+
+def _deform_frames_process(spline_coeffs: SplineCoeffs,
+                           camera: CameraImageDef,
+                           id_opts: ImageDefOpts,
+                           coords: np.ndarray,
+                           disp_x: np.ndarray,
+                           disp_y: np.ndarray,
+                           image_mask: np.ndarray | None,
+                           connect: dict[str,np.ndarray] | None,
+                           n_workers: int,
+                           print_on: bool) -> None:
+    # The spline coefficients of the upsampled image are the largest input so
+    # they are shared read only instead of being pickled to every process
+    image_coeffs = spline_coeffs.image
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(image_coeffs.nbytes,1))
+    try:
+        shm_coeffs = np.ndarray(image_coeffs.shape,
+                                dtype=np.float64,
+                                buffer=shm.buf)
+        shm_coeffs[...] = image_coeffs
+        # Only the mask coefficients and padding are pickled to the workers
+        worker_coeffs = SplineCoeffs(np.empty((0,0)),
+                                     spline_coeffs.image_npad,
+                                     spline_coeffs.mask,
+                                     spline_coeffs.mask_npad)
+
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 initializer=_init_def_worker_shm,
+                                 initargs=(shm.name,image_coeffs.shape,
+                                           worker_coeffs,camera,id_opts,
+                                           coords,disp_x,disp_y,
+                                           image_mask,connect)) as pool:
+            _run_frames(pool,disp_x.shape[1],print_on)
+
+        # Release the view so the shared memory block can be closed
+        del shm_coeffs
+    finally:
+        shm.close()
+        shm.unlink()
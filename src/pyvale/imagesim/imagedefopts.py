@@ -5,10 +5,31 @@ License: MIT
 Copyright (C) 2024 The Computer Aided Validation Team
 ================================================================================
 """
+import enum
 from dataclasses import dataclass
 from pathlib import Path
 import numpy as np
 
+
+class EImageDefBackend(enum.Enum):
+    """Enumeration specifying how the frames are deformed by `deform_images`.
+
+    SERIAL
+        All frames are deformed one after the other on the calling thread.
+
+    THREAD
+        Frames are deformed concurrently on a pool of threads sharing the
+        upsampled image.
+
+    PROCESS
+        Frames are deformed concurrently on a pool of processes reading the
+        upsampled image from a shared memory block.
+    """
+    SERIAL = enum.auto()
+    THREAD = enum.auto()
+    PROCESS = enum.auto()
+
+
 @dataclass
 class ImageDefOpts:
     """ _summary_
@@ -71,5 +92,9 @@ class ImageDefOpts:
 
     #----------------------------------------------------------------------
     # PARALLELISATION OPTIONS
-
-
+    # Frames only depend on the upsampled image and their own displacements so
+    # they can be deformed concurrently. Frames are saved with the same file
+    # names whichever backend is used.
+    def_backend: EImageDefBackend = EImageDefBackend.SERIAL
+    # Number of worker threads or processes, if None the number of CPUs is used
+    def_workers: int | None = None
@@ -0,0 +1,52 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+from scipy.interpolate import griddata
+from pyvale.imagesim.elemraster import raster_elems
+
+
+def test_raster_elems_matches_linear_field_and_leaves_holes() -> None:
+    num_nodes = 6
+    node_vec = np.linspace(0.0,1.0,num_nodes)
+    (node_x,node_y) = np.meshgrid(node_vec,node_vec)
+    nodes = np.column_stack((node_x.ravel(),node_y.ravel()))
+    node_vals = np.column_stack((2*nodes[:,0] - nodes[:,1],nodes[:,1]))
+
+    # Quads on the left half and triangles on the right, one indexed
+    ids = np.arange(num_nodes**2).reshape(num_nodes,num_nodes) + 1
+    (corner_0,corner_1) = (ids[:-1,:-1],ids[:-1,1:])
+    (corner_2,corner_3) = (ids[1:,1:],ids[1:,:-1])
+    is_quad = np.zeros(corner_0.shape,dtype=np.bool_)
+    is_quad[:,:2] = True
+    # Remove the element in the middle to make a hole
+    is_hole = np.zeros(corner_0.shape,dtype=np.bool_)
+    is_hole[2,2] = True
+    is_tri = ~is_quad & ~is_hole
+
+    connect = {"quads": np.vstack((corner_0[is_quad],corner_1[is_quad],
+                                   corner_2[is_quad],corner_3[is_quad])),
+               "tris": np.hstack((np.vstack((corner_0[is_tri],corner_1[is_tri],
+                                             corner_2[is_tri])),
+                                  np.vstack((corner_0[is_tri],corner_2[is_tri],
+                                             corner_3[is_tri]))))}
+
+    grid_vec = np.linspace(-0.1,1.1,61)
+    (grid_vals,coverage) = raster_elems(nodes,connect,grid_vec,grid_vec,
+                                        node_vals)
+
+    (grid_x,grid_y) = np.meshgrid(grid_vec,grid_vec)
+    in_hole = ((grid_x > 0.4+1e-6) & (grid_x < 0.6-1e-6)
+               & (grid_y > 0.4+1e-6) & (grid_y < 0.6-1e-6))
+    # Grid points on the boundary are covered within round off
+    in_mesh = ((grid_x > -1e-6) & (grid_x < 1.0+1e-6)
+               & (grid_y > -1e-6) & (grid_y < 1.0+1e-6))
+    assert np.array_equal(coverage,in_mesh & ~in_hole)
+    assert np.all(np.isnan(grid_vals[~coverage]))
+
+    check_vals = griddata(nodes,node_vals,(grid_x,grid_y))
+    assert np.allclose(grid_vals[coverage],check_vals[coverage])
@@ -0,0 +1,156 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+import pyvale
+from tests.experimentsimulator_test import (build_quad_sim,
+                                            build_angled_vector_array)
+
+
+def build_field_err_array() -> pyvale.SensorArrayPoint:
+    field = pyvale.FieldScalar(build_quad_sim(),"temperature",2)
+    sens_data = pyvale.SensorData(
+        positions=pyvale.create_sensor_pos_array((3,2,1),(0.2,0.8),(0.2,0.8),
+                                                 (0.0,0.0)),
+        sample_times=np.linspace(0.0,1.0,4))
+    sens_array = pyvale.SensorArrayPoint(sens_data,field)
+
+    field_err_data = pyvale.ErrFieldData(
+        pos_rand_xyz=(pyvale.GeneratorNormal(std=0.05,seed=1),
+                      pyvale.GeneratorNormal(std=0.05,seed=2),
+                      None),
+        time_rand=pyvale.GeneratorNormal(std=0.05,seed=3))
+    err_chain = [pyvale.ErrSysField(field,field_err_data),
+                 pyvale.ErrRandNormal(0.5,seed=4)]
+    sens_array.set_error_integrator(pyvale.ErrIntegrator(
+        err_chain,sens_data,sens_array.get_measurement_shape()))
+    return sens_array
+
+
+def test_batch_errors_match_repeated_calls() -> None:
+    n_real = 5
+    single_array = build_field_err_array()
+    check_meas = np.stack([single_array.calc_measurements()
+                           for _ in range(n_real)])
+
+    batch_array = build_field_err_array()
+    batch_meas = batch_array.calc_measurements_batch(n_real)
+
+    assert batch_meas.shape == (n_real,6,1,4)
+    assert np.allclose(batch_meas,check_meas)
+    assert np.all(np.std(batch_meas,axis=0) > 0.0)
+
+
+def test_batch_errors_with_sensor_angles_match_repeated_calls() -> None:
+    n_real = 4
+    for spatial_averager in (None,pyvale.EIntSpatialType.QUAD4PT):
+        single_array = build_angled_vector_array(spatial_averager)
+        check_meas = np.stack([single_array.calc_measurements()
+                               for _ in range(n_real)])
+
+        batch_array = build_angled_vector_array(spatial_averager)
+        batch_meas = batch_array.calc_measurements_batch(n_real)
+
+        assert np.array_equal(batch_meas,check_meas)
+
+    # Rotations that do not match the points are not repeated
+    angles = tuple(Rotation.identity() for _ in range(4))
+    with pytest.raises(ValueError):
+        pyvale.stack_trans_matrices(angles,6)
+
+
+def test_valid_masks_of_nominal_and_perturbed_sensors() -> None:
+    field = pyvale.FieldScalar(build_quad_sim(),"temperature",2)
+    # Sensors at x=0.2,0.5,0.8 and the outer column is moved outside the mesh
+    sens_data = pyvale.SensorData(
+        positions=pyvale.create_sensor_pos_array((3,2,1),(0.2,0.8),(0.2,0.8),
+                                                 (0.0,0.0)))
+    sens_array = pyvale.SensorArrayPoint(sens_data,field)
+    assert np.all(sens_array.get_valid_mask())
+
+    pos_offset = np.zeros((6,3))
+    pos_offset[:,0] = 0.3
+    field_err_data = pyvale.ErrFieldData(pos_offset_xyz=pos_offset)
+    err_calc = pyvale.ErrSysField(field,field_err_data)
+    assert err_calc.get_valid_mask() is None
+
+    check_mask = sens_data.positions[:,0] < 0.7
+    err_basis = sens_array.get_truth()
+    err_calc.calc_errs(err_basis,sens_data)
+    assert np.array_equal(err_calc.get_valid_mask(),check_mask)
+
+    err_calc.calc_errs(np.stack((err_basis,err_basis)),sens_data)
+    assert np.array_equal(err_calc.get_valid_mask(),
+                          np.stack((check_mask,check_mask)))
+
+
+def build_err_chain() -> list[pyvale.IErrCalculator]:
+    return [pyvale.ErrSysUniform(-1.0,1.0,seed=1),
+            pyvale.ErrSysNormPercent(1.0,seed=2),
+            pyvale.ErrRandNormal(1.0,seed=3),
+            pyvale.ErrRandUnifPercent(-1.0,1.0,seed=4),
+            pyvale.ErrSysRoundOff()]
+
+
+def test_calc_errs_batch_matches_repeated_calls() -> None:
+    n_real = 4
+    err_basis = np.linspace(1.0,10.0,30).reshape((3,2,5))
+    batch_basis = np.broadcast_to(err_basis,(n_real,)+err_basis.shape)
+    sens_data = pyvale.SensorData()
+
+    for single_calc,batch_calc in zip(build_err_chain(),build_err_chain()):
+        check_errs = np.stack([single_calc.calc_errs(err_basis,sens_data)[0]
+                               for _ in range(n_real)])
+        (batch_errs,_) = batch_calc.calc_errs(batch_basis,sens_data)
+
+        assert batch_errs.shape == batch_basis.shape
+        assert np.allclose(batch_errs,check_errs)
+
+
+def test_reuse_buffers_matches_allocating_integrator() -> None:
+    truth = np.linspace(1.0,10.0,30).reshape((3,2,5))
+    sens_data = pyvale.SensorData()
+    err_int_opts = pyvale.ErrIntOpts(force_dependence=True,store_all_errs=True)
+    check_int = pyvale.ErrIntegrator(build_err_chain(),sens_data,truth.shape,
+                                     err_int_opts)
+    reuse_int = pyvale.ErrIntegrator(build_err_chain(),sens_data,truth.shape,
+                                     pyvale.ErrIntOpts(force_dependence=True,
+                                                       store_all_errs=True,
+                                                       reuse_buffers=True))
+
+    for _ in range(3):
+        check_errs = check_int.calc_errors_from_chain(truth)
+        reuse_errs = reuse_int.calc_errors_from_chain(truth)
+        assert np.array_equal(reuse_errs,check_errs)
+        assert np.array_equal(reuse_int.get_errs_by_chain(),
+                              check_int.get_errs_by_chain())
+
+    # Buffers are owned by the integrator and overwritten in place
+    assert reuse_int.calc_errors_from_chain(truth) is reuse_errs
+
+
+def test_float32_sensor_array_keeps_dtype() -> None:
+    sim_data = build_quad_sim()
+    field = pyvale.FieldScalar(sim_data,"temperature",2)
+    sens_data = pyvale.SensorData(
+        positions=pyvale.create_sensor_pos_array((3,2,1),(0.2,0.8),(0.2,0.8),
+                                                 (0.0,0.0)))
+    sens_array = pyvale.SensorArrayPoint(sens_data,field,dtype=np.float32)
+    sens_array.set_error_integrator(pyvale.ErrIntegrator(
+        build_err_chain(),sens_data,sens_array.get_measurement_shape(),
+        pyvale.ErrIntOpts(reuse_buffers=True)))
+
+    check_truth = pyvale.SensorArrayPoint(sens_data,field).calc_truth_values()
+    measurements = sens_array.calc_measurements()
+
+    assert sens_array.get_truth().dtype == np.float32
+    assert np.allclose(sens_array.get_truth(),check_truth)
+    assert measurements.dtype == np.float32
+    assert sens_array.get_errors_random().dtype == np.float32
+    assert sens_array.calc_measurements_batch(3).dtype == np.float32
@@ -0,0 +1,194 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+from scipy.spatial.transform import Rotation
+import mooseherder as mh
+import pyvale
+
+
+def build_quad_sim(n_elems: int = 4, n_time_steps: int = 5) -> mh.SimData:
+    n_nodes = n_elems + 1
+    coord_vec = np.linspace(0.0,1.0,n_nodes)
+    (coord_x,coord_y) = np.meshgrid(coord_vec,coord_vec,indexing="ij")
+
+    sim_data = mh.SimData()
+    sim_data.coords = np.column_stack((coord_x.flatten(),
+                                       coord_y.flatten(),
+                                       np.zeros(n_nodes**2)))
+    node_nums = np.arange(n_nodes**2).reshape((n_nodes,n_nodes))
+    # NOTE: exodus connectivity is 1 indexed with shape=(nodes_per_elem,n_elems)
+    sim_data.connect = {"connect1": np.vstack((node_nums[:-1,:-1].flatten(),
+                                               node_nums[1:,:-1].flatten(),
+                                               node_nums[1:,1:].flatten(),
+                                               node_nums[:-1,1:].flatten()))+1}
+    sim_data.time = np.linspace(0.0,1.0,n_time_steps)
+    sim_data.node_vars = {"temperature": np.outer(
+        20.0 + 10.0*sim_data.coords[:,0],1.0 + sim_data.time)}
+    return sim_data
+
+
+def build_sensor_array(sim_data: mh.SimData) -> pyvale.SensorArrayPoint:
+    field = pyvale.FieldScalar(sim_data,"temperature",2)
+    sens_data = pyvale.SensorData(
+        positions=pyvale.create_sensor_pos_array((3,2,1),(0.1,0.9),(0.1,0.9),
+                                                 (0.0,0.0)))
+    sens_array = pyvale.SensorArrayPoint(sens_data,field)
+    err_chain = [pyvale.ErrSysUniform(-1.0,1.0,seed=1),
+                 pyvale.ErrRandNormal(0.5,seed=2)]
+    sens_array.set_error_integrator(pyvale.ErrIntegrator(
+        err_chain,sens_data,sens_array.get_measurement_shape()))
+    return sens_array
+
+
+def build_angled_vector_array(spatial_averager: pyvale.EIntSpatialType | None
+                              ) -> pyvale.SensorArrayPoint:
+    sim_data = build_quad_sim()
+    sim_data.node_vars["disp_x"] = np.outer(0.01*sim_data.coords[:,0]**2,
+                                            sim_data.time)
+    sim_data.node_vars["disp_y"] = np.outer(0.02*sim_data.coords[:,1]**2
+                                            + 0.01*sim_data.coords[:,0],
+                                            sim_data.time)
+    field = pyvale.FieldVector(sim_data,"disp",("disp_x","disp_y"),2)
+
+    spatial_dims = None
+    if spatial_averager is not None:
+        spatial_dims = np.array([0.1,0.1,0.0])
+
+    # Every sensor has its own angle and only the positions are perturbed
+    sens_data = pyvale.SensorData(
+        positions=pyvale.create_sensor_pos_array((3,2,1),(0.2,0.8),(0.2,0.8),
+                                                 (0.0,0.0)),
+        angles=tuple(Rotation.from_euler("zyx",(aa,0.0,0.0),degrees=True)
+                     for aa in np.linspace(-60.0,60.0,6)),
+        spatial_averager=spatial_averager,
+        spatial_dims=spatial_dims)
+    sens_array = pyvale.SensorArrayPoint(sens_data,field)
+
+    field_err_data = pyvale.ErrFieldData(
+        pos_rand_xyz=(pyvale.GeneratorNormal(std=0.05,seed=1),
+                      pyvale.GeneratorNormal(std=0.05,seed=2),
+                      None),
+        spatial_averager=spatial_averager,
+        spatial_dims=spatial_dims)
+    sens_array.set_error_integrator(pyvale.ErrIntegrator(
+        [pyvale.ErrSysField(field,field_err_data)],
+        sens_data,
+        sens_array.get_measurement_shape()))
+    return sens_array
+
+
+class GeneratorDictNormal(pyvale.IGeneratorRandom):
+    def __init__(self, seed: int | None = None) -> None:
+        self.rngs = {"normal": np.random.default_rng(seed)}
+
+    def generate(self, size: tuple[int,...]) -> np.ndarray:
+        return self.rngs["normal"].normal(size=size)
+
+    def reseed(self, seed: int | np.random.SeedSequence | None) -> None:
+        self.rngs["normal"] = np.random.default_rng(seed)
+
+    def get_rng_state(self) -> dict:
+        return self.rngs["normal"].bit_generator.state
+
+    def set_rng_state(self, state: dict) -> None:
+        self.rngs["normal"].bit_generator.state = state
+
+
+def run_exp_sim(exp_sim_opts: pyvale.ExpSimOpts | None) -> np.ndarray:
+    sim_data = build_quad_sim()
+    exp_sim = pyvale.ExperimentSimulator([sim_data],
+                                         [build_sensor_array(sim_data)],
+                                         num_exp_per_sim=10,
+                                         exp_sim_opts=exp_sim_opts)
+    return exp_sim.run_experiments()[0]
+
+
+def test_exp_sim_backends_match_for_seed() -> None:
+    serial_data = run_exp_sim(pyvale.ExpSimOpts(seed=3,exps_per_chunk=3))
+    thread_data = run_exp_sim(pyvale.ExpSimOpts(pyvale.EExpSimBackend.THREAD,
+                                                workers=2,
+                                                seed=3,
+                                                exps_per_chunk=3))
+    process_data = run_exp_sim(pyvale.ExpSimOpts(pyvale.EExpSimBackend.PROCESS,
+                                                 workers=2,
+                                                 seed=3,
+                                                 exps_per_chunk=3))
+
+    assert serial_data.shape == (1,10,6,1,5)
+    assert np.all(np.std(serial_data,axis=1) > 0.0)
+    assert np.array_equal(serial_data,thread_data)
+    assert np.array_equal(serial_data,process_data)
+
+
+def test_exp_sim_serial_default_uses_array_rngs() -> None:
+    sim_data = build_quad_sim()
+    sens_array = build_sensor_array(sim_data)
+    check_data = np.stack([sens_array.calc_measurements() for _ in range(10)])
+
+    assert np.array_equal(run_exp_sim(None)[0],check_data)
+
+
+def test_exp_sim_stream_stats_without_exp_data() -> None:
+    sim_data = build_quad_sim()
+    check_sim = pyvale.ExperimentSimulator([sim_data],
+                                           [build_sensor_array(sim_data)],
+                                           num_exp_per_sim=10,
+                                           exp_sim_opts=pyvale.ExpSimOpts(
+                                               seed=3))
+    check_data = check_sim.run_experiments()[0]
+
+    stream_sim = pyvale.ExperimentSimulator([sim_data],
+                                            [build_sensor_array(sim_data)],
+                                            num_exp_per_sim=10,
+                                            exp_sim_opts=pyvale.ExpSimOpts(
+                                                seed=3,
+                                                store_exp_data=False))
+    assert stream_sim.run_experiments()[0] is None
+    stream_stats = stream_sim.calc_stats()[0]
+
+    assert np.allclose(stream_stats.mean,np.mean(check_data,axis=1))
+    assert np.allclose(stream_stats.std,np.std(check_data,axis=1))
+    assert np.array_equal(stream_stats.min,np.min(check_data,axis=1))
+    assert np.array_equal(stream_stats.max,np.max(check_data,axis=1))
+    assert stream_stats.med.shape == (1,6,1,5)
+
+
+def test_exp_sim_seed_reseeds_user_generators() -> None:
+    sim_data = build_quad_sim()
+
+    exp_data = []
+    for gen_seed in (10,20):
+        sens_array = build_sensor_array(sim_data)
+        sens_array.error_integrator.set_error_chain(
+            [pyvale.ErrRandGenerator(GeneratorDictNormal(gen_seed))])
+        exp_sim = pyvale.ExperimentSimulator([sim_data],
+                                             [sens_array],
+                                             num_exp_per_sim=4,
+                                             exp_sim_opts=pyvale.ExpSimOpts(
+                                                seed=3))
+        exp_data.append(exp_sim.run_experiments()[0])
+
+    # The user generator is reseeded from the simulator seed through its own
+    # reseed method so its initial seed has no effect
+    assert np.array_equal(exp_data[0],exp_data[1])
+
+
+def test_serial_exp_sim_matches_loop_with_sensor_angles() -> None:
+    n_exps = 4
+    loop_array = build_angled_vector_array(None)
+    loop_data = np.stack([loop_array.calc_measurements()
+                          for _ in range(n_exps)])
+
+    sens_array = build_angled_vector_array(None)
+    sim_data = sens_array.get_field().get_sim_data()
+    exp_sim = pyvale.ExperimentSimulator([sim_data],
+                                         [sens_array],
+                                         num_exp_per_sim=n_exps)
+    exp_data = exp_sim.run_experiments()[0]
+
+    assert np.array_equal(exp_data[0],loop_data)
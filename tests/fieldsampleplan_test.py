@@ -0,0 +1,482 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pyvista as pv
+from vtkmodules.vtkCommonCore import reference
+import pyvale
+import pyvale.core.fieldsampleplan as fsp
+from tests.experimentsimulator_test import build_quad_sim
+
+
+def build_quad_grid(n_elems: int = 4,
+                    n_time_steps: int = 5) -> tuple[pv.UnstructuredGrid,
+                                                    np.ndarray]:
+    n_nodes = n_elems + 1
+    coord_vec = np.linspace(0.0,1.0,n_nodes)
+    (coord_x,coord_y) = np.meshgrid(coord_vec,coord_vec,indexing="ij")
+    coords = np.column_stack((coord_x.flatten(),
+                              coord_y.flatten(),
+                              np.zeros(n_nodes**2)))
+
+    node_nums = np.arange(n_nodes**2).reshape((n_nodes,n_nodes))
+    connect = np.column_stack((node_nums[:-1,:-1].flatten(),
+                               node_nums[1:,:-1].flatten(),
+                               node_nums[1:,1:].flatten(),
+                               node_nums[:-1,1:].flatten()))
+    cells = np.hstack((4*np.ones((connect.shape[0],1),dtype=np.int64),
+                       connect)).flatten()
+    cell_types = np.full(connect.shape[0],pv.CellType.QUAD)
+    grid = pv.UnstructuredGrid(cells,cell_types,coords)
+
+    time_steps = np.linspace(0.0,1.0,n_time_steps)
+    grid["field_x"] = np.outer(2.0*coords[:,0] + coords[:,1],time_steps)
+    grid["field_y"] = np.outer(coords[:,0] - 3.0*coords[:,1],time_steps)
+
+    return (grid,time_steps)
+
+
+def test_sample_plan_matches_vtk_probe() -> None:
+    (grid,time_steps) = build_quad_grid()
+    # Includes points close to the cell edges which must be found in the same
+    # cell with and without a plan
+    near_edge = np.random.default_rng(0).uniform(-1e-4,1e-4,(20,2))
+    near_edge[:,0] += 0.75
+    near_edge[:,1] += np.linspace(0.1,0.9,20)
+    points = np.vstack(([[0.1,0.2,0.0],
+                         [0.5,0.5,0.0],
+                         [0.93,0.07,0.0]],
+                        np.column_stack((near_edge,np.zeros(20))),
+                        [[2.0,2.0,0.0]]))
+    components = ("field_x","field_y")
+
+    plan = pyvale.build_sample_plan(grid,points)
+    assert plan.cell_ids[-1] == -1
+
+    check_vals = pyvale.sample_pyvista_grid(components,grid,time_steps,points)
+    plan_vals = pyvale.sample_pyvista_grid(components,grid,time_steps,points,
+                                           sample_plan=plan)
+
+    assert plan_vals.shape == (24,2,time_steps.shape[0])
+    assert np.array_equal(plan_vals,check_vals)
+    assert np.allclose(plan_vals[-1,:,:],0.0)
+
+
+def test_numpy_plan_matches_vtk_plan() -> None:
+    (grid,time_steps) = build_quad_grid()
+    points = np.array([[0.1,0.2,0.0],
+                       [0.5,0.5,0.0],
+                       [0.93,0.07,0.0],
+                       [0.5,0.5,0.3],
+                       [2.0,2.0,0.0]])
+    components = ("field_x","field_y")
+
+    vtk_plan = pyvale.build_sample_plan(grid,points)
+    numpy_plan = pyvale.build_sample_plan_numpy(
+        grid,points,pyvale.InterpOpts(pyvale.EInterpBackend.NUMPY,
+                                      workers=2,
+                                      chunk_pairs=2))
+
+    # Points off the plane of the 2D mesh are outside
+    assert np.array_equal(numpy_plan.get_outside_mask(),
+                          [False,False,False,True,True])
+    assert np.array_equal(vtk_plan.get_outside_mask(),
+                          numpy_plan.get_outside_mask())
+
+    vtk_vals = pyvale.sample_pyvista_grid(components,grid,time_steps,points,
+                                          sample_plan=vtk_plan)
+    numpy_vals = pyvale.sample_pyvista_grid(components,grid,time_steps,points,
+                                            sample_plan=numpy_plan)
+    assert np.allclose(numpy_vals,vtk_vals)
+
+
+# Edges of each quadratic cell in the VTK order of the mid edge nodes
+QUAD_EDGES = {
+    pv.CellType.QUADRATIC_TRIANGLE: ((0,1),(1,2),(2,0)),
+    pv.CellType.QUADRATIC_QUAD: ((0,1),(1,2),(2,3),(3,0)),
+    pv.CellType.QUADRATIC_TETRA: ((0,1),(1,2),(2,0),(0,3),(1,3),(2,3)),
+    pv.CellType.QUADRATIC_HEXAHEDRON: ((0,1),(1,2),(2,3),(3,0),(4,5),(5,6),
+                                       (6,7),(7,4),(0,4),(1,5),(2,6),(3,7)),
+}
+
+
+def build_linear_connect(cell_type: pv.CellType,
+                         n_elems: int) -> tuple[np.ndarray,np.ndarray]:
+    dim = 3 if cell_type in (pv.CellType.QUADRATIC_TETRA,
+                             pv.CellType.QUADRATIC_HEXAHEDRON) else 2
+    n_nodes = n_elems + 1
+    coord_vec = np.linspace(0.0,1.0,n_nodes)
+    grids = np.meshgrid(*[coord_vec]*dim,indexing="ij")
+    coords = np.column_stack([gg.ravel() for gg in grids]
+                             + [np.zeros(n_nodes**dim)]*(3-dim))
+
+    # Corner node of each box for each combination of unit offsets
+    node_nums = np.arange(n_nodes**dim).reshape((n_nodes,)*dim)
+    box = np.ix_(*[np.arange(n_elems)]*dim)
+    def corner(*offset: int) -> np.ndarray:
+        return node_nums[tuple(bb+oo for bb,oo in zip(box,offset))].ravel()
+
+    if dim == 2:
+        quads = np.column_stack((corner(0,0),corner(1,0),corner(1,1),
+                                 corner(0,1)))
+        if cell_type == pv.CellType.QUADRATIC_QUAD:
+            return (coords,quads)
+        return (coords,np.vstack((quads[:,[0,1,2]],quads[:,[0,2,3]])))
+
+    hexes = np.column_stack((corner(0,0,0),corner(1,0,0),corner(1,1,0),
+                             corner(0,1,0),corner(0,0,1),corner(1,0,1),
+                             corner(1,1,1),corner(0,1,1)))
+    if cell_type == pv.CellType.QUADRATIC_HEXAHEDRON:
+        return (coords,hexes)
+
+    # Kuhn subdivision of each box into 6 tets along the box diagonal
+    tets = []
+    for axes in ((0,1,2),(0,2,1),(1,0,2),(1,2,0),(2,0,1),(2,1,0)):
+        offset = [0,0,0]
+        path = [corner(*offset)]
+        for aa in axes:
+            offset[aa] = 1
+            path.append(corner(*offset))
+        tets.append(np.column_stack(path))
+    tets = np.vstack(tets)
+    # Swaps two nodes of the negatively oriented tets
+    tet_coords = coords[tets]
+    vols = np.einsum("pk,pk->p",np.cross(tet_coords[:,1]-tet_coords[:,0],
+                                         tet_coords[:,2]-tet_coords[:,0]),
+                     tet_coords[:,3]-tet_coords[:,0])
+    tets[vols < 0.0] = tets[vols < 0.0][:,[0,2,1,3]]
+    return (coords,tets)
+
+
+def build_curved_grid(cell_type: pv.CellType,
+                      n_elems: int = 3) -> pv.UnstructuredGrid:
+    (coords,connect) = build_linear_connect(cell_type,n_elems)
+
+    # Shared mid edge nodes so the quadratic mesh is conforming
+    edges = np.sort(np.stack([connect[:,ee] for ee in QUAD_EDGES[cell_type]],
+                             axis=1),axis=2)
+    (unique_edges,edge_nodes) = np.unique(edges.reshape((-1,2)),axis=0,
+                                          return_inverse=True)
+    mid_coords = 0.5*(coords[unique_edges[:,0]] + coords[unique_edges[:,1]])
+    connect = np.hstack((connect,
+                         coords.shape[0]+edge_nodes.reshape(edges.shape[:2])))
+    coords = np.vstack((coords,mid_coords))
+
+    # Smooth mapping of all nodes gives curved quadratic edges, 2D meshes are
+    # kept in the X-Y plane
+    shift = 0.04*np.sin(np.pi*coords[:,[1,2,0]])
+    if np.all(coords[:,2] == 0.0):
+        shift[:,2] = 0.0
+    coords = coords + shift
+
+    cells = np.hstack((np.full((connect.shape[0],1),connect.shape[1]),
+                       connect)).ravel()
+    grid = pv.UnstructuredGrid(cells,
+                               np.full(connect.shape[0],cell_type),
+                               coords)
+    grid["field"] = (np.sin(2.0*coords[:,0]) + coords[:,1]**2
+                     + coords[:,0]*coords[:,2])[:,np.newaxis]
+    return grid
+
+
+def build_points_in_cells(grid: pv.UnstructuredGrid,
+                          n_points: int,
+                          rng: np.random.Generator,
+                          ) -> tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # NOTE: VTK accepts points up to 0.001 outside quadratic cells in
+    # parametric coordinates so points are kept away from the cell faces
+    cells = rng.integers(0,grid.n_cells,n_points)
+    points = np.empty((n_points,3))
+    check_vals = np.empty((n_points,))
+    for ii,cc in enumerate(cells):
+        cell = grid.GetCell(cc)
+        dim = cell.GetCellDimension()
+        pcoords = np.zeros((3,))
+        if cell.GetCellType() in (pv.CellType.QUADRATIC_TRIANGLE,
+                                  pv.CellType.QUADRATIC_TETRA):
+            pcoords[:dim] = 0.05 + 0.8*rng.dirichlet(np.ones(dim+1))[:dim]
+        else:
+            pcoords[:dim] = rng.uniform(0.05,0.95,dim)
+
+        # VTK shape functions at the parametric coordinates give the point
+        # and the exact interpolated value
+        weights = np.zeros((cell.GetNumberOfPoints(),))
+        cell.EvaluateLocation(reference(0),pcoords,points[ii],weights)
+        node_ids = [cell.GetPointId(nn) for nn in range(weights.shape[0])]
+        check_vals[ii] = weights @ grid["field"][node_ids]
+
+    return (points,cells,check_vals)
+
+
+def test_numpy_plan_matches_vtk_for_quadratic_cells() -> None:
+    rng = np.random.default_rng(3)
+    for cell_type in QUAD_EDGES:
+        grid = build_curved_grid(cell_type)
+        (points,cells,check_vals) = build_points_in_cells(grid,200,rng)
+        # Points outside the mesh away from the boundary
+        points = np.vstack((points,rng.uniform(1.3,1.5,(20,3))))
+
+        vtk_plan = pyvale.build_sample_plan(grid,points)
+        numpy_plan = pyvale.build_sample_plan_numpy(grid,points)
+        assert np.array_equal(numpy_plan.cell_ids[:200],cells), cell_type.name
+        assert np.array_equal(numpy_plan.cell_ids,
+                              vtk_plan.cell_ids), cell_type.name
+
+        # VTK inverts curved quadratic cells approximately so the values are
+        # checked against the VTK shape functions at the known coordinates
+        numpy_vals = numpy_plan.weights @ grid["field"]
+        assert np.allclose(numpy_vals[:200],check_vals,
+                           rtol=0.0,atol=1e-10), cell_type.name
+        assert np.all(numpy_vals[200:] == 0.0), cell_type.name
+
+
+def test_numpy_locator_on_graded_mesh() -> None:
+    # Cell widths are graded over three orders of magnitude
+    node_vec_x = np.concatenate(((0.0,),np.geomspace(1e-3,1.0,60)))
+    node_vec_y = np.linspace(0.0,1.0,11)
+    grid = pv.StructuredGrid(*np.meshgrid(node_vec_x,node_vec_y,[0.0],
+                                          indexing="ij")
+                             ).cast_to_unstructured_grid()
+    grid["field"] = np.sin(3.0*grid.points[:,0]) + grid.points[:,1]
+
+    # Points are concentrated in the small cells, those outside the mesh are
+    # kept away from the boundary of the small cells
+    rng = np.random.default_rng(4)
+    points = np.column_stack((rng.uniform(0.0,1.02,1000)**3,
+                              rng.uniform(-0.05,1.05,1000),
+                              np.zeros(1000)))
+
+    locator = pyvale.create_numpy_locator(grid)
+    # Only the cells of similar size to those around each point are searched
+    (pair_points,_) = locator._find_candidates(points)
+    assert pair_points.shape[0] <= 8*points.shape[0]
+
+    vtk_plan = pyvale.build_sample_plan(grid,points)
+    numpy_plan = pyvale.build_sample_plan_numpy(
+        grid,points,pyvale.InterpOpts(pyvale.EInterpBackend.NUMPY,
+                                      chunk_pairs=256),
+        locator)
+    assert np.array_equal(numpy_plan.get_outside_mask(),
+                          vtk_plan.get_outside_mask())
+    assert np.allclose(numpy_plan.weights @ grid["field"],
+                       vtk_plan.weights @ grid["field"],
+                       rtol=0.0,atol=1e-12)
+
+
+def test_outside_policies_share_point_location() -> None:
+    sim_data = build_quad_sim()
+    rng = np.random.default_rng(5)
+    points = np.vstack(([[0.5,0.5,0.0],[1.2,0.5,0.0]],
+                        np.column_stack((rng.uniform(-0.5,1.5,(50,2)),
+                                         np.zeros(50)))))
+    field = pyvale.FieldScalar(sim_data,"temperature",2)
+
+    try:
+        outside_vals = {}
+        for pp in pyvale.EOutsidePolicy:
+            pyvale.set_interp_opts(pyvale.InterpOpts(outside_policy=pp))
+            (vals,valid) = field.sample_field_with_mask(points)
+            assert np.array_equal(valid[:2],[True,False])
+            outside_vals[pp] = vals[1,0,:]
+
+            # The first request is probed directly and the repeat uses a plan
+            (plan_vals,plan_valid) = field.sample_field_with_mask(points)
+            assert np.array_equal(plan_valid,valid)
+            assert np.array_equal(plan_vals,vals,equal_nan=True)
+    finally:
+        pyvale.set_interp_opts(pyvale.InterpOpts())
+
+    # Temperature is linear in x: T = (20 + 10x)(1 + t)
+    time_factor = 1.0 + sim_data.time
+    assert np.allclose(outside_vals[pyvale.EOutsidePolicy.ZERO],0.0)
+    assert np.all(np.isnan(outside_vals[pyvale.EOutsidePolicy.NAN]))
+    assert np.allclose(outside_vals[pyvale.EOutsidePolicy.NEAREST],
+                       32.0*time_factor)
+    assert np.allclose(outside_vals[pyvale.EOutsidePolicy.CLAMP],
+                       30.0*time_factor)
+
+
+def test_sample_plan_cache_builds_on_repeat() -> None:
+    (grid,_) = build_quad_grid()
+    mesh_key = pyvale.hash_pyvista_grid(grid)
+    points = np.array([[0.1,0.2,0.0],[0.5,0.5,0.0]])
+
+    plan_cache = pyvale.SamplePlanCache(max_plans=1)
+    assert plan_cache.get_plan(mesh_key,grid,points) is None
+
+    plan = plan_cache.get_plan(mesh_key,grid,points)
+    assert plan is not None
+    assert plan_cache.get_plan(mesh_key,grid,points.copy()) is plan
+
+
+def test_sample_plan_cache_builds_once_across_threads(monkeypatch) -> None:
+    (grid,_) = build_quad_grid()
+    mesh_key = pyvale.hash_pyvista_grid(grid)
+    points = np.array([[0.1,0.2,0.0],[0.5,0.5,0.0]])
+
+    build_count = []
+    def count_builds(*args,**kwargs) -> pyvale.SamplePlan:
+        build_count.append(None)
+        return pyvale.build_sample_plan_numpy(*args,**kwargs)
+    monkeypatch.setattr(fsp,"build_sample_plan_numpy",count_builds)
+
+    plan_cache = pyvale.SamplePlanCache()
+    try:
+        pyvale.set_interp_opts(pyvale.InterpOpts(pyvale.EInterpBackend.NUMPY))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            plans = list(executor.map(
+                lambda _: plan_cache.get_plan(mesh_key,grid,points),
+                range(32)))
+        stored_plan = plan_cache.get_plan(mesh_key,grid,points)
+    finally:
+        pyvale.set_interp_opts(pyvale.InterpOpts())
+
+    # One unstored plan for the first request then one stored plan that all
+    # other threads wait for and reuse
+    assert len(build_count) == 2
+    assert sum(pp is stored_plan for pp in plans) == 31
+
+
+def test_time_plan_matches_numpy_interp() -> None:
+    sim_time_steps = np.array([0.0,0.5,1.5,2.0,4.0])
+    sample_times = np.array([-1.0,0.0,0.25,1.5,1.9,4.0,5.0])
+    sample_data = np.random.default_rng(0).normal(size=(3,2,5))
+
+    time_plan = pyvale.build_time_plan(sim_time_steps,sample_times)
+    interp_vals = pyvale.interp_with_time_plan(time_plan,sample_data)
+
+    check_vals = np.apply_along_axis(
+        lambda vals: np.interp(sample_times,sim_time_steps,vals),
+        -1,sample_data)
+
+    assert interp_vals.shape == (3,2,sample_times.shape[0])
+    assert np.allclose(interp_vals,check_vals)
+
+
+def test_fields_on_same_mesh_share_grid_and_plans() -> None:
+    sim_data = build_quad_sim()
+    sim_data.node_vars["temp_2"] = 2.0*sim_data.node_vars["temperature"]
+    pyvale.get_mesh_registry().clear()
+
+    field_1 = pyvale.FieldScalar(sim_data,"temperature",2)
+    field_2 = pyvale.FieldScalar(sim_data,"temp_2",2)
+
+    # Shallow copies of the shared mesh so the points are not duplicated
+    assert np.shares_memory(field_1.get_visualiser().points,
+                            field_2.get_visualiser().points)
+
+    points = np.array([[0.1,0.2,0.0],[0.5,0.5,0.0]])
+    assert np.allclose(2.0*field_1.sample_field(points),
+                       field_2.sample_field(points))
+
+    # The second field's request builds the plan in the shared cache
+    mesh_entry = pyvale.get_mesh_registry().get_mesh(sim_data,2)
+    assert mesh_entry.sample_plans.get_plan(mesh_entry.mesh_key,
+                                            mesh_entry.grid,
+                                            points) is not None
+
+
+def test_disk_cache_reloads_mesh_and_plans(tmp_path) -> None:
+    sim_data = build_quad_sim()
+    points = np.array([[0.1,0.2,0.0],[0.5,0.5,0.0]])
+    pyvale.get_mesh_registry().clear()
+    pyvale.set_disk_cache(pyvale.DiskCache(tmp_path))
+
+    try:
+        field = pyvale.FieldScalar(sim_data,"temperature",2)
+        check_vals = field.sample_field(points)
+        field.sample_field(points)
+        assert len(list(tmp_path.glob("*.npz"))) == 2
+
+        # New registry as in a new process so the mesh and plan come from disk
+        pyvale.get_mesh_registry().clear()
+        field = pyvale.FieldScalar(sim_data,"temperature",2)
+        mesh_entry = pyvale.get_mesh_registry().get_mesh(sim_data,2)
+        assert mesh_entry.sample_plans.get_plan(mesh_entry.mesh_key,
+                                                mesh_entry.grid,
+                                                points) is not None
+        assert np.allclose(field.sample_field(points),check_vals)
+
+        disk_cache = pyvale.DiskCache(tmp_path,max_bytes=0)
+        disk_cache.save("evict",{"arr": np.zeros(10)})
+        assert disk_cache.get_size() == 0
+    finally:
+        pyvale.set_disk_cache(None)
+        pyvale.get_mesh_registry().clear()
+
+
+def test_sample_plan_cache_keyed_by_interp_opts(tmp_path) -> None:
+    (grid,_) = build_quad_grid()
+    mesh_key = pyvale.hash_pyvista_grid(grid)
+    # Outside the VTK tolerance of the boundary but inside the default
+    # tolerance of the NumPy backend
+    points = np.array([[1.0+1e-9,0.3,0.0],[0.5,0.5,0.0]])
+    pyvale.set_disk_cache(pyvale.DiskCache(tmp_path))
+
+    try:
+        plan_cache = pyvale.SamplePlanCache()
+        found_cells = []
+        for interp_opts in (pyvale.InterpOpts(),
+                            pyvale.InterpOpts(pyvale.EInterpBackend.NUMPY),
+                            pyvale.InterpOpts(pyvale.EInterpBackend.NUMPY,
+                                              pcoord_tol=1e-12)):
+            pyvale.set_interp_opts(interp_opts)
+            plan_cache.get_plan(mesh_key,grid,points)
+            found_cells.append(plan_cache.get_plan(mesh_key,grid,points)
+                               .cell_ids[0])
+
+        assert found_cells == [-1,13,-1]
+        # Plans on disk are also kept apart by the options
+        assert len(list(tmp_path.glob("plan-*.npz"))) == 3
+    finally:
+        pyvale.set_interp_opts(pyvale.InterpOpts())
+        pyvale.set_disk_cache(None)
+
+
+def test_hash_arrays_keeps_dtypes_and_boundaries() -> None:
+    # Integers that round to the same double must give different keys
+    big_ints = np.array([2**53,2**53+1],dtype=np.int64)
+    assert (pyvale.hash_arrays((big_ints[:1],))
+            != pyvale.hash_arrays((big_ints[1:],)))
+    assert (pyvale.hash_array(np.arange(3,dtype=np.int64))
+            != pyvale.hash_array(np.arange(3,dtype=np.float64)))
+
+    # Same bytes split differently between the arrays
+    assert (pyvale.hash_arrays((np.arange(4),np.arange(2)))
+            != pyvale.hash_arrays((np.arange(3),np.array([3,0,1]))))
+    # Non contiguous arrays hash their values
+    assert (pyvale.hash_array(np.arange(8)[::2])
+            == pyvale.hash_array(2*np.arange(4)))
+
+
+def test_disk_cache_ignores_invalid_plans(tmp_path) -> None:
+    (grid,_) = build_quad_grid()
+    mesh_key = pyvale.hash_pyvista_grid(grid)
+    points = np.array([[0.1,0.2,0.0],[0.5,0.5,0.0]])
+    pyvale.set_disk_cache(pyvale.DiskCache(tmp_path))
+
+    try:
+        plan_cache = pyvale.SamplePlanCache()
+        plan_cache.get_plan(mesh_key,grid,points)
+        check_plan = plan_cache.get_plan(mesh_key,grid,points)
+        (plan_file,) = tmp_path.glob("plan-*.npz")
+
+        # Plan on disk that does not match the requested points is ignored
+        with np.load(plan_file) as plan_arrays:
+            bad_arrays = dict(plan_arrays)
+        bad_arrays["cell_ids"] = bad_arrays["cell_ids"][:1]
+        np.savez(plan_file,**bad_arrays)
+
+        plan_cache = pyvale.SamplePlanCache()
+        assert plan_cache.get_plan(mesh_key,grid,points) is None
+        plan = plan_cache.get_plan(mesh_key,grid,points)
+        assert np.array_equal(plan.cell_ids,check_plan.cell_ids)
+        assert np.array_equal(plan.weights.toarray(),
+                              check_plan.weights.toarray())
+    finally:
+        pyvale.set_disk_cache(None)
@@ -0,0 +1,56 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+from scipy.spatial.transform import Rotation
+import pyvale
+from tests.experimentsimulator_test import build_quad_sim
+
+
+def test_transform_stack_matches_per_sensor() -> None:
+    n_sens = 5
+    n_time_steps = 4
+    rng = np.random.default_rng(0)
+    angles = tuple(Rotation.from_euler("zyx",rng.uniform(-30,30,3),
+                                       degrees=True) for _ in range(n_sens))
+    trans_mats = pyvale.stack_trans_matrices(angles,n_sens)
+
+    vec_3d = rng.normal(size=(n_sens,3,n_time_steps))
+    ten_3d = rng.normal(size=(n_sens,6,n_time_steps))
+    ten_2d = rng.normal(size=(n_sens,3,n_time_steps))
+
+    vec_3d_stack = pyvale.transform_vector_3d_stack(trans_mats,vec_3d)
+    ten_3d_stack = pyvale.transform_tensor_3d_stack(trans_mats,ten_3d)
+    ten_2d_stack = pyvale.transform_tensor_2d_stack(trans_mats[:,:2,:2],
+                                                    ten_2d)
+
+    for ii,rr in enumerate(angles):
+        trans_mat = rr.as_matrix().T
+        assert np.allclose(vec_3d_stack[ii],
+                           pyvale.transform_vector_3d(trans_mat,vec_3d[ii]))
+        assert np.allclose(ten_3d_stack[ii],
+                           pyvale.transform_tensor_3d(trans_mat,ten_3d[ii]))
+        assert np.allclose(ten_2d_stack[ii],
+                           pyvale.transform_tensor_2d(trans_mat[:2,:2],
+                                                      ten_2d[ii]))
+
+
+def test_fields_accept_single_rotation() -> None:
+    sim_data = build_quad_sim()
+    for key in ("disp_x","disp_y","strain_xx","strain_yy","strain_xy"):
+        sim_data.node_vars[key] = sim_data.node_vars["temperature"]*(
+            1.0 + sim_data.coords[:,1:2])
+    points = np.array([[0.2,0.3,0.0],[0.6,0.7,0.0]])
+    angle = Rotation.from_euler("z",30.0,degrees=True)
+
+    fields = (pyvale.FieldVector(sim_data,"disp",("disp_x","disp_y"),2),
+              pyvale.FieldTensor(sim_data,"strain",("strain_xx","strain_yy"),
+                                 ("strain_xy",),2))
+    for field in fields:
+        # A single rotation is the same as a tuple with one rotation
+        assert np.allclose(field.sample_field(points,angles=angle),
+                           field.sample_field(points,angles=(angle,)))
@@ -0,0 +1,142 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+from scipy import ndimage
+from scipy.interpolate import griddata
+from PIL import Image
+import pyvale
+from pyvale.imagesim.cameradataimagedef import CameraImageDef
+from pyvale.imagesim.imagedefopts import ImageDefOpts, EImageDefBackend
+import pyvale.imagesim.imagedef as sid
+
+
+def test_image_mask_cached_per_camera_and_mesh(tmp_path) -> None:
+    camera = CameraImageDef(num_px=np.array((40,30)),m_per_px=1e-3)
+    node_vec_x = np.linspace(0.005,0.035,7)
+    node_vec_y = np.linspace(0.005,0.025,5)
+    (node_x,node_y) = np.meshgrid(node_vec_x,node_vec_y)
+    nodes = np.column_stack((node_x.ravel(),node_y.ravel()))
+    image = np.arange(30*40,dtype=np.float64).reshape(30,40)
+
+    (px_x,px_y) = sid.get_pixel_grid_in_m(camera)
+    in_mesh = ((px_x > 0.005) & (px_x < 0.035)
+               & (px_y > 0.005) & (px_y < 0.025))[::-1,:]
+    check_im = np.where(in_mesh,image[::-1,:],camera.background)
+
+    sid.clear_im_mask_cache()
+    pyvale.set_disk_cache(pyvale.DiskCache(tmp_path))
+    try:
+        (masked_im,im_mask) = sid.get_im_mask_from_sim(camera,image,nodes)
+        assert np.array_equal(im_mask,in_mesh)
+        assert np.array_equal(masked_im,check_im)
+        assert sid.get_im_mask_from_sim(camera,image,nodes)[1] is im_mask
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+
+        # Cleared memory cache as in a new process so the mask is from disk
+        sid.clear_im_mask_cache()
+        assert np.array_equal(sid.get_im_mask_from_sim(camera,image,nodes)[1],
+                              in_mesh)
+
+        # Moving the mesh changes the mask
+        moved_nodes = nodes + np.array((0.002,0.0))
+        assert not np.array_equal(
+            sid.get_im_mask_from_sim(camera,image,moved_nodes)[1],in_mesh)
+    finally:
+        pyvale.set_disk_cache(None)
+        sid.clear_im_mask_cache()
+
+
+def build_imagedef_case(num_frames: int = 3
+                        ) -> tuple[np.ndarray,CameraImageDef,np.ndarray,
+                                   np.ndarray,np.ndarray]:
+    num_px = 40
+    camera = CameraImageDef(num_px=np.array((num_px,num_px)),m_per_px=1e-3)
+    rng = np.random.default_rng(0)
+    image = ndimage.gaussian_filter(rng.uniform(0,255,(num_px,num_px)),2)
+
+    node_vec = np.linspace(0.005,0.035,9)
+    (node_x,node_y) = np.meshgrid(node_vec,node_vec)
+    coords = np.column_stack((node_x.ravel(),node_y.ravel(),
+                              np.zeros(node_x.size)))
+    disp_x = np.outer(0.02*coords[:,0],np.arange(num_frames))
+    disp_y = np.outer(0.01*coords[:,1],np.arange(num_frames))
+    return (image,camera,coords,disp_x,disp_y)
+
+
+def test_deform_images_backends_match_serial(tmp_path) -> None:
+    (image,camera,coords,disp_x,disp_y) = build_imagedef_case()
+
+    def_images = {}
+    for backend in EImageDefBackend:
+        id_opts = ImageDefOpts()
+        id_opts.save_path = tmp_path / backend.name
+        # Masks the input image and the deformed images with the mask
+        id_opts.mask_input_image = True
+        id_opts.def_complex_geom = True
+        id_opts.def_backend = backend
+        id_opts.def_workers = 2
+        sid.deform_images(image,camera,id_opts,coords,disp_x,disp_y)
+
+        def_files = sorted(id_opts.save_path.glob("*.tiff"))
+        def_images[backend] = {ff.name: np.array(Image.open(ff))
+                               for ff in def_files}
+
+    serial_images = def_images[EImageDefBackend.SERIAL]
+    assert len(serial_images) == disp_x.shape[1]
+    for backend in def_images:
+        assert def_images[backend].keys() == serial_images.keys()
+        for name in serial_images:
+            assert np.array_equal(def_images[backend][name],
+                                  serial_images[name])
+
+
+def test_spline_coeffs_match_map_coordinates() -> None:
+    rng = np.random.default_rng(1)
+    image = rng.uniform(0,255,(12,15))
+    # Includes points outside the image to check the boundary modes
+    coords_y = rng.uniform(-3.0,15.0,(6,7))
+    coords_x = rng.uniform(-3.0,18.0,(6,7))
+    cval = 17.0
+
+    for mode in ("reflect","grid-mirror","constant","grid-constant",
+                 "nearest","mirror","grid-wrap","wrap"):
+        for order in range(6):
+            (coeffs,npad) = sid.calc_spline_coeffs(image,order,mode,cval)
+            check = ndimage.map_coordinates(image,
+                                            [[coords_y],[coords_x]],
+                                            prefilter=True,
+                                            order=order,
+                                            mode=mode,
+                                            cval=cval)
+            assert np.array_equal(
+                sid.sample_spline_coeffs(coeffs,npad,coords_y,coords_x,order,
+                                         mode,cval),
+                check), (mode,order)
+
+
+def test_interp_disp_to_grid_matches_griddata() -> None:
+    rng = np.random.default_rng(2)
+    def_nodes = rng.uniform(0.0,1.0,(60,2))
+    disp = np.column_stack((np.sin(def_nodes[:,0]),def_nodes[:,1]**2))
+    grid = np.meshgrid(np.linspace(-0.1,1.1,23),np.linspace(-0.1,1.1,19))
+
+    id_opts = ImageDefOpts()
+    for method in ("linear","cubic","nearest"):
+        id_opts.fe_interp = method
+        (grid_disp_x,grid_disp_y) = sid.interp_disp_to_grid(def_nodes,
+                                                            disp,
+                                                            grid,
+                                                            id_opts)
+        for (grid_disp,comp) in ((grid_disp_x,0),(grid_disp_y,1)):
+            check = griddata(def_nodes,
+                             disp[:,comp],
+                             (grid[0],grid[1]),
+                             method=method,
+                             fill_value=np.nan,
+                             rescale=id_opts.fe_rescale)
+            assert np.array_equal(grid_disp,check,equal_nan=True), method
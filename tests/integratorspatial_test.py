@@ -0,0 +1,74 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+import pyvale
+from tests.experimentsimulator_test import build_quad_sim
+
+
+def test_spatial_averager_reused_until_sensors_move() -> None:
+    field = pyvale.FieldScalar(build_quad_sim(),"temperature",2)
+    sens_data = pyvale.SensorData(
+        positions=pyvale.create_sensor_pos_array((3,2,1),(0.2,0.8),(0.2,0.8),
+                                                 (0.0,0.0)),
+        spatial_averager=pyvale.EIntSpatialType.QUAD4PT,
+        spatial_dims=np.array([0.1,0.1,0.0]))
+    sens_array = pyvale.SensorArrayPoint(sens_data,field)
+    averager = pyvale.SpatialAveragerCache()
+
+    integrator = averager.get_integrator(field,sens_data)
+    check_truth = pyvale.sample_field_with_sensor_data(field,sens_data)
+    assert np.allclose(sens_array.calc_truth_values(),check_truth)
+    assert np.allclose(integrator.calc_averages(sens_data),check_truth)
+
+    # New sample times reuse the integrator
+    window_data = pyvale.SensorData(positions=sens_data.positions,
+                                    sample_times=np.array([0.3,0.6]),
+                                    spatial_averager=sens_data.spatial_averager,
+                                    spatial_dims=sens_data.spatial_dims.copy())
+    assert averager.get_integrator(field,window_data) is integrator
+    assert np.allclose(integrator.calc_averages(window_data),
+                       pyvale.sample_field_with_sensor_data(field,window_data))
+
+    # Moving the sensors in place relocates the integration points
+    sens_data.positions[:,0] += 0.05
+    assert np.allclose(sens_array.calc_truth_values(),
+                       pyvale.sample_field_with_sensor_data(field,sens_data))
+    assert not np.allclose(sens_array.get_truth(),check_truth)
+
+    # Changing the sensor size rebuilds the integrator
+    sens_data.spatial_dims = np.array([0.2,0.2,0.0])
+    assert averager.get_integrator(field,sens_data) is not integrator
+
+
+def test_gauss_rules_match_quadrature_and_adapt_order() -> None:
+    for int_type in (pyvale.EIntSpatialType.GAUSSBOX,
+                     pyvale.EIntSpatialType.GAUSSCYL):
+        rule = pyvale.get_quadrature_rule(int_type,3)
+        # Average of z**4 over a unit length along the axis is 1/80
+        assert np.isclose(np.sum(rule.weights),1.0)
+        assert np.isclose(rule.weights @ rule.pt_offsets[:,2]**4,1/80)
+
+    field = pyvale.FieldScalar(build_quad_sim(),"temperature",2)
+    positions = pyvale.create_sensor_pos_array((3,2,1),(0.2,0.8),(0.2,0.8),
+                                               (0.0,0.0))
+    # Existing 2D quadrature uses half of the sensor size as spatial dims
+    quad_data = pyvale.SensorData(
+        positions=positions,
+        spatial_averager=pyvale.EIntSpatialType.QUAD9PT,
+        spatial_dims=np.array([0.05,0.05,0.0]))
+    gauss_data = pyvale.SensorData(
+        positions=positions,
+        spatial_averager=pyvale.EIntSpatialType.GAUSSRECT,
+        spatial_dims=np.array([0.1,0.1,0.0]),
+        spatial_tol=1e-8)
+
+    integrator = pyvale.build_spatial_averager(field,gauss_data)
+    averages = integrator.calc_averages(gauss_data)
+    assert integrator.get_order() == 1
+    assert np.allclose(averages,
+                       pyvale.sample_field_with_sensor_data(field,quad_data))
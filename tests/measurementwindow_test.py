@@ -0,0 +1,79 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+import pyvale
+from tests.experimentsimulator_test import build_quad_sim
+
+
+def build_drift_array(rand_err: bool = False,
+                      time_offset: np.ndarray | None = None,
+                      ) -> pyvale.SensorArrayPoint:
+    field = pyvale.FieldScalar(build_quad_sim(n_time_steps=11),"temperature",2)
+    sens_data = pyvale.SensorData(
+        positions=pyvale.create_sensor_pos_array((3,2,1),(0.1,0.9),(0.1,0.9),
+                                                 (0.0,0.0)),
+        sample_times=np.linspace(0.0,1.0,23))
+    sens_array = pyvale.SensorArrayPoint(sens_data,field)
+
+    field_err_data = pyvale.ErrFieldData(
+        pos_rand_xyz=(pyvale.GeneratorNormal(std=0.05,seed=1),None,None),
+        time_offset=time_offset,
+        time_drift=pyvale.DriftLinear(0.05))
+    err_chain = [pyvale.ErrSysUniform(-1.0,1.0,seed=2),
+                 pyvale.ErrSysField(field,field_err_data),
+                 pyvale.ErrSysNormPercent(1.0,seed=3)]
+    if rand_err:
+        err_chain.append(pyvale.ErrRandNormal(0.5,seed=4))
+    sens_array.set_error_integrator(pyvale.ErrIntegrator(
+        err_chain,sens_data,sens_array.get_measurement_shape()))
+    return sens_array
+
+
+def test_iter_measurements_matches_full_experiment() -> None:
+    check_array = build_drift_array()
+    window_array = build_drift_array()
+
+    for chunk_steps in (5,7):
+        check_meas = check_array.calc_measurements()
+        windows = list(window_array.iter_measurements(chunk_steps))
+
+        assert windows[-1].time_stop == 23
+        assert all(ww.truth.shape[-1] <= chunk_steps for ww in windows)
+        assert np.allclose(np.concatenate([ww.measurements for ww in windows],
+                                          axis=-1),
+                           check_meas)
+
+
+def test_iter_measurements_with_time_offset_matches_full_experiment() -> None:
+    # One offset per sample time so each window must use its own offsets
+    time_offset = np.linspace(0.0,0.02,23)
+    check_array = build_drift_array(time_offset=time_offset)
+    window_array = build_drift_array(time_offset=time_offset)
+
+    check_meas = check_array.calc_measurements()
+    windows = list(window_array.iter_measurements(5))
+    assert np.allclose(np.concatenate([ww.measurements for ww in windows],
+                                      axis=-1),
+                       check_meas)
+
+
+def test_iter_measurements_with_random_errs_matches_systematic() -> None:
+    check_array = build_drift_array(rand_err=True)
+    window_array = build_drift_array(rand_err=True)
+
+    check_array.calc_measurements()
+    windows = list(window_array.iter_measurements(5))
+    (errs_sys,errs_rand) = [np.concatenate([getattr(ww,aa) for ww in windows],
+                                           axis=-1)
+                            for aa in ("errs_systematic","errs_random")]
+
+    # Only the systematic errors are reproduced, random errors are drawn per
+    # window so they are different draws from the same distribution
+    assert np.allclose(errs_sys,check_array.get_errors_systematic())
+    assert errs_rand.shape == check_array.get_errors_random().shape
+    assert not np.allclose(errs_rand,check_array.get_errors_random())
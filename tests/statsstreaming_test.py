@@ -0,0 +1,43 @@
+"""
+================================================================================
+pyvale: the python validation engine
+License: MIT
+Copyright (C) 2024 The Computer Aided Validation Team
+================================================================================
+"""
+import numpy as np
+import pyvale
+
+
+def test_stream_stats_match_numpy() -> None:
+    rng = np.random.default_rng(0)
+    values = rng.normal(loc=2.0,scale=3.0,size=(4000,3,2))
+
+    stream_stats = pyvale.StreamStats((3,2))
+    for ii in range(0,values.shape[0],128):
+        stream_stats.update(values[ii:ii+128])
+
+    assert stream_stats.get_count() == values.shape[0]
+    assert np.allclose(stream_stats.get_mean(),np.mean(values,axis=0))
+    assert np.allclose(stream_stats.get_std(),np.std(values,axis=0))
+    assert np.array_equal(stream_stats.get_min(),np.min(values,axis=0))
+    assert np.array_equal(stream_stats.get_max(),np.max(values,axis=0))
+
+    # P² quantiles are estimates so only check within a fraction of the std
+    assert np.allclose(stream_stats.get_median(),
+                       np.median(values,axis=0),atol=0.1)
+    assert np.allclose(stream_stats.get_q25(),
+                       np.quantile(values,0.25,axis=0),atol=0.1)
+    assert np.allclose(stream_stats.get_q75(),
+                       np.quantile(values,0.75,axis=0),atol=0.1)
+
+
+def test_p2_quantile_exact_for_few_values() -> None:
+    values = np.array([[3.0,1.0],[1.0,4.0],[2.0,0.0],[5.0,2.0]])
+
+    quantiles = pyvale.P2Quantile((0.25,0.5),(2,))
+    for vv in values:
+        quantiles.update(vv)
+
+    assert np.allclose(quantiles.get_quantiles(),
+                       np.quantile(values,(0.25,0.5),axis=0))